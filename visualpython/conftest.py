@@ -0,0 +1,66 @@
+"""
+Shared fixtures for the top-level integration suites
+(test_unified_integration.py and test_live_functionality.py).
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+# Fixture contents are ASCII, kept as bytes so writing skips the text layer
+_SCRIPT_BYTES = b'''
+# Test script for live reloading
+x = 100
+y = 50
+print(f"Position: ({x}, {y})")
+print("Test script executed successfully!")
+'''
+
+_CSV_BYTES = b'''frame,op,x,y,w,h,r,g,b,text
+0,CLEAR,,,,,,0,10,20,
+0,RECT,50,25,100,50,255,0,0,
+0,TEXT,55,35,,,,255,255,255,TEST
+0,COMMIT,,,,,,,,
+'''
+
+
+def _write_bytes(path, data):
+    with open(path, 'wb', buffering=0) as f:
+        f.write(data)
+
+
+@pytest.fixture(scope="session")
+def vp_fixtures(tmp_path_factory):
+    """Test script and CSV written once per session and shared by every test"""
+    base = tmp_path_factory.mktemp("vp")
+    
+    script = base / "test_script.py"
+    csv = base / "test.csv"
+    # The GIL is released during write(), so the two files go out together
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        list(pool.map(_write_bytes, (script, csv), (_SCRIPT_BYTES, _CSV_BYTES)))
+    return SimpleNamespace(base=base, script=script, csv=csv)
+
+
+@pytest.fixture
+def ppm_frames(monkeypatch):
+    """Simulator frames are only counted or compared, so skip PNG encoding"""
+    monkeypatch.setenv("VP_FRAME_FORMAT", "ppm")
+
+
+@pytest.fixture
+def frames_dir(tmp_path):
+    """Per-test output directory for simulator frames"""
+    return tmp_path / "frames"
+
+
+def _count_frames(d):
+    return sum(1 for n in os.listdir(d) if n.endswith((".png", ".ppm")))
+
+
+@pytest.fixture
+def count_frames():
+    """Number of PNG/PPM frames in a directory, counted from bare directory names"""
+    return _count_frames
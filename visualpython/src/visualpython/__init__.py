@@ -59,6 +59,7 @@ from .backends import (
 # Signal export for hardware integration
 from .signals import (
     SignalData,
+    SignalBuffer,
     AnalogSignalExporter,
     HardwareSignalController,
     export_signals,
@@ -281,6 +282,7 @@ __all__ = [
     
     # Signal export
     'SignalData',
+    'SignalBuffer',
     'AnalogSignalExporter',
     'HardwareSignalController', 
     'export_signals',
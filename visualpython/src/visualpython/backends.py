@@ -5,19 +5,22 @@ This module provides different rendering backends for displaying
 Python execution as visual operations.
 """
 
+import atexit
 import time
 import threading
 import csv
-from typing import List, Dict, Any, Optional
+import mmap
+import os
+import queue
+from collections import deque
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, TextIO, Tuple, Union
 from abc import ABC, abstractmethod
+from importlib.util import find_spec
 from pathlib import Path
 
-# Optional PIL import for PNG support
-try:
-    from PIL import Image
-    PILLOW_AVAILABLE = True
-except ImportError:
-    PILLOW_AVAILABLE = False
+# Optional PIL support for PNG frames; probed only, the simulator imports it
+PILLOW_AVAILABLE = find_spec('PIL') is not None
 
 # Import visual element class
 try:
@@ -44,8 +47,30 @@ class VisualBackend(ABC):
         pass
     
     @abstractmethod
-    def clear(self):
-        """Clear the display"""
+    def render_text(self, text: str, x: int, y: int, color: str = '#00ff88'):
+        """Draw a single text primitive"""
+        pass
+    
+    @abstractmethod
+    def render_rect(self, x: int, y: int, width: int, height: int, color: str = '#00ff88'):
+        """Draw a single filled rectangle primitive"""
+        pass
+    
+    def render_texts(self, items):
+        """Draw many text primitives given as (text, x, y, color) tuples"""
+        render_text = self.render_text
+        for text, x, y, color in items:
+            render_text(text, x, y, color=color)
+    
+    def render_rects(self, items):
+        """Draw many rectangles given as (x, y, width, height, color) tuples"""
+        render_rect = self.render_rect
+        for x, y, width, height, color in items:
+            render_rect(x, y, width, height, color=color)
+    
+    @abstractmethod
+    def clear(self, color: str = '#001100'):
+        """Clear the display (to color, where the backend paints a background)"""
         pass
     
     @abstractmethod
@@ -134,8 +159,36 @@ class ConsoleBackend(VisualBackend):
         else:
             print(f"{indicator} {content}")
     
-    def clear(self):
-        """Clear console display"""
+    def _colorize(self, text: str, color: str) -> str:
+        if self.color_mode == 'ansi' and color in self.colors:
+            return f"{self.colors[color]}{text}{self.reset_color}"
+        return text
+    
+    def render_text(self, text: str, x: int, y: int, color: str = '#00ff88'):
+        """Print a text primitive to the console"""
+        if self.show_positions:
+            text = f"[{x},{y}] {text}"
+        print(self._colorize(text, color))
+    
+    def render_rect(self, x: int, y: int, width: int, height: int, color: str = '#00ff88'):
+        """Print a rectangle as a scaled-down bar of block characters"""
+        bar = '█' * max(1, int(width / 5))
+        if self.show_positions:
+            bar = f"[{x},{y}] {bar}"
+        print(self._colorize(bar, color))
+    
+    def render_texts(self, items):
+        """Print many text primitives with a single write"""
+        lines = []
+        for text, x, y, color in items:
+            if self.show_positions:
+                text = f"[{x},{y}] {text}"
+            lines.append(self._colorize(text, color))
+        if lines:
+            print("\n".join(lines))
+    
+    def clear(self, color: str = '#001100'):
+        """Clear console display; the terminal keeps its own colors"""
         import os
         os.system('cls' if os.name == 'nt' else 'clear')
         self.last_elements = []
@@ -153,12 +206,23 @@ class ConsoleBackend(VisualBackend):
         print("🔥 VisualPython execution complete")
 
 
-try:
-    import tkinter as tk
-    from tkinter import ttk
-    TKINTER_AVAILABLE = True
-except ImportError:
-    TKINTER_AVAILABLE = False
+# Optional tkinter support; probed here and imported by the first
+# TkinterBackend, so console and simulator runs never load Tk
+TKINTER_AVAILABLE = find_spec('tkinter') is not None
+tk = None
+
+
+def _load_tkinter() -> bool:
+    """Import tkinter on first use; False if that fails."""
+    global tk, TKINTER_AVAILABLE
+    if tk is None:
+        try:
+            import tkinter as tkinter_module
+        except ImportError:
+            TKINTER_AVAILABLE = False
+            return False
+        tk = tkinter_module
+    return True
 
 
 class TkinterBackend(VisualBackend):
@@ -170,7 +234,7 @@ class TkinterBackend(VisualBackend):
     """
     
     def __init__(self, width=800, height=600, **kwargs):
-        if not TKINTER_AVAILABLE:
+        if not TKINTER_AVAILABLE or not _load_tkinter():
             raise ImportError("Tkinter not available")
         
         self.width = width
@@ -369,8 +433,42 @@ class TkinterBackend(VisualBackend):
             
             current_x += 6 * scale  # Move to next character position
     
-    def clear(self):
-        """Clear the display"""
+    def render_text(self, text: str, x: int, y: int, color: str = '#00ff88'):
+        """Draw a text primitive with the bitmap font"""
+        self._render_bitmap_text(text, int(x), int(y), scale=1, color=color)
+    
+    def render_rect(self, x: int, y: int, width: int, height: int, color: str = '#00ff88'):
+        """Draw a filled rectangle primitive"""
+        x, y = int(x), int(y)
+        self.canvas.create_rectangle(
+            x, y, x + int(width), y + int(height),
+            fill=color,
+            outline='',
+            tags="visual_element"
+        )
+    
+    def render_texts(self, items):
+        """Draw many text primitives, flushing Tk once at the end"""
+        render_bitmap_text = self._render_bitmap_text
+        for text, x, y, color in items:
+            render_bitmap_text(text, int(x), int(y), scale=1, color=color)
+        self.canvas.update_idletasks()
+    
+    def render_rects(self, items):
+        """Draw many rectangles, flushing Tk once at the end"""
+        create_rectangle = self.canvas.create_rectangle
+        for x, y, width, height, color in items:
+            x, y = int(x), int(y)
+            create_rectangle(
+                x, y, x + int(width), y + int(height),
+                fill=color,
+                outline='',
+                tags="visual_element"
+            )
+        self.canvas.update_idletasks()
+    
+    def clear(self, color: str = '#001100'):
+        """Clear the display; the canvas keeps its configured background"""
         try:
             self.canvas.delete("all")
         except:
@@ -379,7 +477,9 @@ class TkinterBackend(VisualBackend):
     def update(self):
         """Update display"""
         try:
-            self.root.update()
+            # Only flush pending redraws; draining the whole event queue
+            # with update() is far more expensive per frame
+            self.root.update_idletasks()
         except:
             pass
     
@@ -397,7 +497,9 @@ class SimulatorBackend(VisualBackend):
     Headless simulator backend that wraps the SimRenderer from mock_backend.
     
     This provides the same visual API as other backends but saves frames
-    as PNG/PPM files instead of displaying them in a GUI.
+    as PNG/PPM files instead of displaying them in a GUI. The renderer-level
+    primitives (set_pixel, rect, text, commit, clear(color), w, h) are also
+    available, so RecordRenderer and csv_play can drive it directly.
     """
     
     def __init__(self, width=800, height=600, **kwargs):
@@ -408,6 +510,8 @@ class SimulatorBackend(VisualBackend):
         file_prefix = kwargs.get('file_prefix', 'vp_sim_')
         start_index = kwargs.get('start_index', 0)
         bg_color = kwargs.get('bg_color', '#001100')
+        encode_workers = kwargs.get('encode_workers', 0)
+        frames_per_dir = kwargs.get('frames_per_dir', 0)
         
         # Create the simulator renderer
         self.sim_renderer = SimRenderer(
@@ -418,7 +522,9 @@ class SimulatorBackend(VisualBackend):
             out_dir=out_dir,
             file_prefix=file_prefix,
             start_index=start_index,
-            bg=bg_color
+            bg=bg_color,
+            encode_workers=encode_workers,
+            frames_per_dir=frames_per_dir
         )
         
         self.draw_api = SimDrawAPI(self.sim_renderer)
@@ -446,16 +552,19 @@ class SimulatorBackend(VisualBackend):
         
         self.last_elements = elements.copy()
     
+    @staticmethod
+    def _parse_color(color: str):
+        """Parse '#rrggbb' into an (r, g, b) tuple"""
+        color_hex = color.lstrip('#')
+        try:
+            return int(color_hex[0:2], 16), int(color_hex[2:4], 16), int(color_hex[4:6], 16)
+        except (ValueError, IndexError):
+            return 0, 255, 136  # Default green
+    
     def _render_element(self, element: VisualElement):
         """Render a single visual element using the simulator API"""
         # Parse color from hex to RGB
-        color_hex = element.color.lstrip('#')
-        try:
-            r = int(color_hex[0:2], 16)
-            g = int(color_hex[2:4], 16)
-            b = int(color_hex[4:6], 16)
-        except (ValueError, IndexError):
-            r, g, b = 0, 255, 136  # Default green
+        r, g, b = self._parse_color(element.color)
         
         if element.element_type == 'variable':
             # Render variable text
@@ -479,14 +588,29 @@ class SimulatorBackend(VisualBackend):
             # Default text rendering for other elements
             self.draw_api.text(element.x, element.y, element.content, r, g, b)
     
-    def clear(self):
+    def render_text(self, text: str, x: int, y: int, color: str = '#00ff88'):
+        """Draw a text primitive into the current frame"""
+        r, g, b = self._parse_color(color)
+        self.draw_api.text(int(x), int(y), text, r, g, b)
+    
+    def render_rect(self, x: int, y: int, width: int, height: int, color: str = '#00ff88'):
+        """Draw a filled rectangle into the current frame"""
+        r, g, b = self._parse_color(color)
+        self.draw_api.rect(int(x), int(y), int(width), int(height), r, g, b)
+    
+    def clear(self, color: str = '#001100'):
         """Clear the simulator display"""
-        self.draw_api.clear('#001100')
+        self.draw_api.clear(color)
         self.last_elements = []
     
     def update(self):
-        """Update display (no-op for simulator)"""
-        pass
+        """Save the frame drawn since the last clear"""
+        self.draw_api.commit()
+    
+    def reset(self, out_dir=None, clear_color: Optional[str] = None):
+        """Reuse this backend for a new run, writing frames to out_dir"""
+        self.sim_renderer.reset(out_dir=out_dir, bg=clear_color or '#001100')
+        self.last_elements = []
     
     def cleanup(self):
         """Clean up simulator resources"""
@@ -495,26 +619,52 @@ class SimulatorBackend(VisualBackend):
                 self.sim_renderer.close()
         except Exception:
             pass
+    
+    def __getattr__(self, name):
+        """Forward renderer primitives (rect, text, commit, w, h, ...) to SimRenderer."""
+        if name == 'sim_renderer':
+            # Not constructed yet; avoid recursing through __getattr__
+            raise AttributeError(name)
+        return getattr(self.sim_renderer, name)
+
+
+# Write buffer for recorded CSV files; rows reach the disk in large writes
+RECORD_BUFFER_SIZE = 1 << 20
+
+# Recorded rows are formatted with one writerows() call per this many ops
+RECORD_BATCH_ROWS = 256
 
 
 class RecordRenderer:
     """
     CSV recording wrapper for any renderer (TkRenderer, SimRenderer, etc.).
     Records all draw operations to CSV with frame batching.
+    
+    csv_path is a file path, or an open text stream (opened with
+    newline="") which is flushed but left open by close().
+    
+    With keep > 0 the last keep draw calls are also held in memory as
+    typed (frame, op, args) tuples, so a consumer in the same process can
+    use get_recorded() instead of parsing the CSV back.
     """
     
-    def __init__(self, wrapped, csv_path="vp_record.csv", start_frame=0):
+    def __init__(self, wrapped, csv_path="vp_record.csv", start_frame=0, keep=0):
         self.wrapped = wrapped
         self.csv_path = csv_path
         self.frame = start_frame
+        self._recorded = deque(maxlen=keep) if keep > 0 else None
         
         # Open CSV file and write header
-        self._fh = open(csv_path, "w", newline="", encoding="utf-8")
-        self._writer = csv.DictWriter(
-            self._fh, 
-            fieldnames=["frame", "op", "x", "y", "w", "h", "r", "g", "b", "text"]
-        )
-        self._writer.writeheader()
+        self._owns_fh = not hasattr(csv_path, "write")
+        if self._owns_fh:
+            self._fh = open(csv_path, "w", newline="", encoding="utf-8",
+                            buffering=RECORD_BUFFER_SIZE)
+        else:
+            self._fh = csv_path
+        self._writer = csv.writer(self._fh)
+        self._writer.writerow(["frame", "op", "x", "y", "w", "h", "r", "g", "b", "text"])
+        # Rows wait here as tuples and are written a batch at a time
+        self._pending: List[tuple] = []
     
     def _hex_to_rgb(self, hx):
         """Convert hex color to RGB tuple."""
@@ -524,22 +674,31 @@ class RecordRenderer:
         except (ValueError, IndexError):
             return (0, 0, 0)
     
-    def _write_row(self, op, **kwargs):
-        """Write a row to the CSV file."""
-        row = {
-            "frame": self.frame,
-            "op": op,
-            "x": kwargs.get("x", ""),
-            "y": kwargs.get("y", ""),
-            "w": kwargs.get("w", ""),
-            "h": kwargs.get("h", ""),
-            "r": kwargs.get("r", ""),
-            "g": kwargs.get("g", ""),
-            "b": kwargs.get("b", ""),
-            "text": kwargs.get("text", ""),
-        }
-        self._writer.writerow(row)
-        self._fh.flush()
+    def _write_row(self, op, x="", y="", w="", h="", r="", g="", b="", text=""):
+        """Queue a row for the CSV file, writing the batch once it is full."""
+        pending = self._pending
+        pending.append((self.frame, op, x, y, w, h, r, g, b, text))
+        if len(pending) >= RECORD_BATCH_ROWS:
+            self._drain()
+    
+    def _drain(self):
+        """Write all queued rows in one go."""
+        if self._pending:
+            self._writer.writerows(self._pending)
+            self._pending.clear()
+    
+    def _keep(self, op, args):
+        if self._recorded is not None:
+            self._recorded.append((self.frame, op, args))
+    
+    def get_recorded(self) -> List[Tuple[int, str, tuple]]:
+        """
+        Draw calls held in memory, oldest first, as (frame, op, args).
+        
+        args are the arguments of the renderer method named op.lower(),
+        e.g. (x, y, w, h, r, g, b) for RECT. Empty unless keep was given.
+        """
+        return list(self._recorded) if self._recorded is not None else []
     
     # Forward properties
     @property
@@ -557,35 +716,96 @@ class RecordRenderer:
     def clear(self, color="#001100"):
         r, g, b = self._hex_to_rgb(color)
         self._write_row("CLEAR", r=r, g=g, b=b)
+        self._keep("CLEAR", (color,))
         self.wrapped.clear(color)
     
     def set_pixel(self, x, y, r, g, b):
         self._write_row("PIXEL", x=int(x), y=int(y), r=int(r), g=int(g), b=int(b))
+        self._keep("SET_PIXEL", (x, y, r, g, b))
         self.wrapped.set_pixel(x, y, r, g, b)
     
     def rect(self, x, y, w, h, r, g, b):
         self._write_row("RECT", x=int(x), y=int(y), w=int(w), h=int(h), r=int(r), g=int(g), b=int(b))
+        self._keep("RECT", (x, y, w, h, r, g, b))
         self.wrapped.rect(x, y, w, h, r, g, b)
     
     def text(self, x, y, msg, r=144, g=238, b=144):
         self._write_row("TEXT", x=int(x), y=int(y), r=int(r), g=int(g), b=int(b), text=str(msg))
+        self._keep("TEXT", (x, y, msg, r, g, b))
         self.wrapped.text(x, y, msg, r, g, b)
     
     def commit(self):
-        self._write_row("COMMIT")
+        self._end_frame()
         self.wrapped.commit()
         self.frame += 1
     
-    def close(self):
+    def _end_frame(self):
+        self._write_row("COMMIT")
+        # Frame boundary: hand the frame's rows to the file
+        self._drain()
+        self._keep("COMMIT", ())
+    
+    # VisualBackend calls from the engine, recorded as TEXT/RECT/COMMIT rows
+    def render_text(self, text, x, y, color='#00ff88'):
+        self._record_text(text, x, y, color)
+        self.wrapped.render_text(text, x, y, color=color)
+    
+    def render_rect(self, x, y, width, height, color='#00ff88'):
+        self._record_rect(x, y, width, height, color)
+        self.wrapped.render_rect(x, y, width, height, color=color)
+    
+    def render_texts(self, items):
+        for text, x, y, color in items:
+            self._record_text(text, x, y, color)
+        self.wrapped.render_texts(items)
+    
+    def render_rects(self, items):
+        for x, y, width, height, color in items:
+            self._record_rect(x, y, width, height, color)
+        self.wrapped.render_rects(items)
+    
+    def _record_text(self, text, x, y, color):
+        r, g, b = self._hex_to_rgb(color)
+        self._write_row("TEXT", x=int(x), y=int(y), r=r, g=g, b=b, text=str(text))
+        self._keep("TEXT", (x, y, text, r, g, b))
+    
+    def _record_rect(self, x, y, width, height, color):
+        r, g, b = self._hex_to_rgb(color)
+        self._write_row("RECT", x=int(x), y=int(y), w=int(width), h=int(height), r=r, g=g, b=b)
+        self._keep("RECT", (x, y, width, height, r, g, b))
+    
+    def update(self):
+        self._end_frame()
+        self.wrapped.update()
+        self.frame += 1
+    
+    def flush(self):
+        """Push buffered rows to the CSV file."""
+        self._drain()
+        self._fh.flush()
+    
+    def _close_file(self):
         try:
-            self._fh.close()
+            self._drain()
+            if self._owns_fh:
+                self._fh.close()
+            else:
+                self._fh.flush()
         except Exception:
             pass
+    
+    def close(self):
+        self._close_file()
         try:
             self.wrapped.close()
         except Exception:
             pass
     
+    def cleanup(self):
+        # Engines clean up their backend; make sure buffered rows land too
+        self._close_file()
+        self.wrapped.cleanup()
+    
     def __getattr__(self, name):
         """Forward any other attributes to the wrapped renderer."""
         return getattr(self.wrapped, name)
@@ -608,10 +828,51 @@ def _rgb_hex(r, g, b):
     return f"#{_as_int(r, 0):02x}{_as_int(g, 0):02x}{_as_int(b, 0):02x}"
 
 
-def csv_play(renderer, csv_path: str, frame_delay: float = 0.0):
+# csv_play(prefetch=N) reads rows ahead in batches of this many
+_PREFETCH_BATCH = 256
+
+# Optional pyarrow support for parsing playback CSVs in C; probed here,
+# imported by the first csv_play(use_arrow=True)
+PYARROW_AVAILABLE = find_spec('pyarrow') is not None
+pa = None
+
+# Bytes pyarrow parses per record batch
+ARROW_BLOCK_SIZE = 4 << 20
+
+
+def _load_pyarrow() -> bool:
+    """Import pyarrow on first use; False if that fails."""
+    global pa, PYARROW_AVAILABLE
+    if pa is None:
+        try:
+            import pyarrow as pyarrow_module
+            import pyarrow.csv
+        except ImportError:
+            PYARROW_AVAILABLE = False
+            return False
+        pa = pyarrow_module
+    return True
+
+
+def csv_play(renderer, csv_path: Union[str, Path, TextIO], frame_delay: float = 0.0,
+             prefetch: int = 0, use_mmap: bool = False, use_arrow: bool = False):
     """
     Play a sparse CSV file frame by frame.
     
+    csv_path is a file path, or an open text stream such as io.StringIO
+    which is read as-is and left open.
+    
+    With prefetch > 0 a reader thread parses rows ahead of rendering, at
+    most prefetch batches in flight, so file reading overlaps frame
+    encoding and writing instead of alternating with it.
+    
+    With use_mmap a file path is memory-mapped read-only and lines are
+    decoded straight from the mapping, skipping the read buffer copy.
+    
+    With use_arrow and pyarrow installed a file path is parsed in C, a
+    few MB per batch; rows must then have exactly one field per header
+    column. Without pyarrow the csv module is used as usual.
+    
     CSV format (frame-batched):
     frame,op,x,y,w,h,r,g,b,text
     1,CLEAR,,,,0,17,0,
@@ -620,68 +881,264 @@ def csv_play(renderer, csv_path: str, frame_delay: float = 0.0):
     2,PIXEL,100,50,,,255,0,0,
     2,COMMIT,,,,,,,
     
-    All operations with the same frame number are applied together,
-    then commit() is called once per frame.
+    Rows are streamed: consecutive rows with the same frame number are
+    applied together, then commit() is called once for that frame before
+    the next frame's rows are read, so memory stays flat and the first
+    frame renders without parsing the rest of the file.
     """
-    # Read and group rows by frame
-    with open(csv_path, "r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        rows = list(reader)
+    if hasattr(csv_path, "read"):
+        _play_rows(renderer, _rows(csv_path, prefetch), frame_delay)
+    elif use_arrow and PYARROW_AVAILABLE and _load_pyarrow():
+        _play_rows(renderer, _read_ahead(_arrow_rows(csv_path), prefetch), frame_delay)
+    elif use_mmap:
+        _play_mapped(renderer, csv_path, frame_delay, prefetch)
+    else:
+        with open(csv_path, "r", newline="", encoding="utf-8", buffering=1 << 20) as f:
+            _play_rows(renderer, _rows(f, prefetch), frame_delay)
+
+
+def _play_mapped(renderer, csv_path, frame_delay: float, prefetch: int):
+    """csv_play over a read-only memory map of csv_path."""
+    with open(csv_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # mmap cannot map an empty file, and there is nothing to play
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            lines = _mapped_lines(mm)
+            rows = _rows(lines, prefetch)
+            try:
+                _play_rows(renderer, rows, frame_delay)
+            finally:
+                # Stop any reader thread, then release the view before the map closes
+                if hasattr(rows, "close"):
+                    rows.close()
+                lines.close()
+
+
+def _mapped_lines(mm):
+    """Decode mm line by line, newline included, from a memoryview."""
+    view = memoryview(mm)
+    try:
+        start, end = 0, len(mm)
+        while start < end:
+            line_end = mm.find(b"\n", start)
+            line_end = end if line_end < 0 else line_end + 1
+            yield str(view[start:line_end], "utf-8")
+            start = line_end
+    finally:
+        view.release()
+
+
+def _arrow_rows(csv_path):
+    """Rows of csv_path as dicts of str, parsed by pyarrow one record batch at a time."""
+    reader = pa.csv.open_csv(
+        str(csv_path),
+        read_options=pa.csv.ReadOptions(block_size=ARROW_BLOCK_SIZE),
+        parse_options=pa.csv.ParseOptions(newlines_in_values=True),
+        # Keep every known field as text, empty fields as '', like csv.DictReader
+        convert_options=pa.csv.ConvertOptions(
+            column_types={name: pa.string() for name in CSV_COLS},
+            strings_can_be_null=False,
+            quoted_strings_can_be_null=False,
+        ),
+    )
+    for batch in reader:
+        names = batch.schema.names
+        # to_pylist() converts each column in C; only row assembly is Python
+        for values in zip(*(column.to_pylist() for column in batch.columns)):
+            yield dict(zip(names, values))
+
+
+def _rows(lines, prefetch: int):
+    """CSV rows of a stream or other iterable of lines, read ahead on a thread when prefetch > 0."""
+    return _read_ahead(csv.DictReader(lines), prefetch)
+
+
+def _read_ahead(rows, prefetch: int):
+    """rows, read ahead on a thread when prefetch > 0."""
+    if prefetch <= 0:
+        return rows
+    return _prefetched(rows, prefetch)
+
+
+class _ReaderFailed:
+    """Carries an exception from the reader thread to the consumer."""
     
-    by_frame = {}
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def _prefetched(rows, depth: int):
+    """Yield rows parsed on a reader thread through a bounded queue."""
+    batches: 'queue.Queue' = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    
+    def put(item) -> bool:
+        # Time out now and then so an abandoned consumer never strands us
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+    
+    def read():
+        batch = []
+        try:
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= _PREFETCH_BATCH:
+                    if not put(batch):
+                        return
+                    batch = []
+        except Exception as e:
+            put(_ReaderFailed(e))
+            return
+        if batch and not put(batch):
+            return
+        put(None)
+    
+    reader = threading.Thread(target=read, name='visualpython-csv-reader', daemon=True)
+    reader.start()
+    try:
+        while True:
+            batch = batches.get()
+            if batch is None:
+                return
+            if batch.__class__ is _ReaderFailed:
+                raise batch.error
+            yield from batch
+    finally:
+        stop.set()
+        reader.join()
+
+
+def _play_rows(renderer, rows, frame_delay: float):
+    """Apply streamed CSV rows, committing whenever the frame number changes."""
+    pacer = _Pacer(frame_delay)
+    current_frame = None
     for row in rows:
         frame_num = _as_int(row.get("frame", 0))
-        by_frame.setdefault(frame_num, []).append(row)
-    
-    # Process frames in order
-    for frame_num in sorted(by_frame.keys()):
-        print(f"Processing frame {frame_num}...")
+        if frame_num != current_frame:
+            if current_frame is not None:
+                _end_frame(renderer, pacer)
+            current_frame = frame_num
+            print(f"Processing frame {frame_num}...")
         
-        # Apply all operations for this frame
-        for row in by_frame[frame_num]:
-            op = (row.get("op") or "").strip().upper()
-            
-            if op in ("CLEAR", "BG", "BACKGROUND"):
-                color = _rgb_hex(row.get("r", 0), row.get("g", 0), row.get("b", 0))
-                renderer.clear(color)
-            
-            elif op in ("RECT", "BOX"):
-                x = _as_int(row.get("x", 0))
-                y = _as_int(row.get("y", 0))
-                w = _as_int(row.get("w", 0))
-                h = _as_int(row.get("h", 0))
-                r = _as_int(row.get("r", 0))
-                g = _as_int(row.get("g", 0))
-                b = _as_int(row.get("b", 0))
-                renderer.rect(x, y, w, h, r, g, b)
-            
-            elif op in ("PIXEL", "SET", "SET_PIXEL"):
-                x = _as_int(row.get("x", 0))
-                y = _as_int(row.get("y", 0))
-                r = _as_int(row.get("r", 0))
-                g = _as_int(row.get("g", 0))
-                b = _as_int(row.get("b", 0))
-                renderer.set_pixel(x, y, r, g, b)
-            
-            elif op in ("TEXT", "LABEL"):
-                x = _as_int(row.get("x", 0))
-                y = _as_int(row.get("y", 0))
-                text = row.get("text", "")
-                r = _as_int(row.get("r", 144))
-                g = _as_int(row.get("g", 238))
-                b = _as_int(row.get("b", 144))
-                renderer.text(x, y, text, r, g, b)
-            
-            elif op in ("COMMIT", "SHOW"):
-                # No-op; we commit once at end of frame
-                pass
+        op = (row.get("op") or "").strip().upper()
+        
+        if op in ("CLEAR", "BG", "BACKGROUND"):
+            color = _rgb_hex(row.get("r", 0), row.get("g", 0), row.get("b", 0))
+            renderer.clear(color)
+        
+        elif op in ("RECT", "BOX"):
+            x = _as_int(row.get("x", 0))
+            y = _as_int(row.get("y", 0))
+            w = _as_int(row.get("w", 0))
+            h = _as_int(row.get("h", 0))
+            r = _as_int(row.get("r", 0))
+            g = _as_int(row.get("g", 0))
+            b = _as_int(row.get("b", 0))
+            renderer.rect(x, y, w, h, r, g, b)
+        
+        elif op in ("PIXEL", "SET", "SET_PIXEL"):
+            x = _as_int(row.get("x", 0))
+            y = _as_int(row.get("y", 0))
+            r = _as_int(row.get("r", 0))
+            g = _as_int(row.get("g", 0))
+            b = _as_int(row.get("b", 0))
+            renderer.set_pixel(x, y, r, g, b)
         
-        # Commit the frame (saves PNG/PPM)
-        renderer.commit()
+        elif op in ("TEXT", "LABEL"):
+            x = _as_int(row.get("x", 0))
+            y = _as_int(row.get("y", 0))
+            text = row.get("text", "")
+            r = _as_int(row.get("r", 144))
+            g = _as_int(row.get("g", 238))
+            b = _as_int(row.get("b", 144))
+            renderer.text(x, y, text, r, g, b)
         
-        # Optional delay between frames
-        if frame_delay > 0.0:
-            time.sleep(frame_delay)
+        # COMMIT/SHOW rows are no-ops; each frame is committed once at its end
+    
+    if current_frame is not None:
+        _end_frame(renderer, pacer)
+
+
+def _end_frame(renderer, pacer: '_Pacer'):
+    """Commit the frame (saves PNG/PPM), then wait for its deadline."""
+    renderer.commit()
+    pacer.wait()
+
+
+class _Pacer:
+    """
+    Frame pacing against fixed deadlines: frame n ends n * frame_delay
+    after playback started, however long rendering took, so render time
+    does not accumulate the way a plain sleep(frame_delay) per frame does.
+    """
+    
+    def __init__(self, frame_delay: float, clock=time.monotonic_ns, sleep=time.sleep):
+        self._step_ns = int(frame_delay * 1e9)
+        self._clock = clock
+        self._sleep = sleep
+        # Integer nanoseconds, so deadlines do not drift over long playbacks
+        self._deadline_ns = clock() if self._step_ns > 0 else 0
+    
+    def wait(self):
+        """Sleep until the current frame's deadline, if it is still ahead."""
+        if self._step_ns <= 0:
+            return
+        self._deadline_ns += self._step_ns
+        remaining_ns = self._deadline_ns - self._clock()
+        if remaining_ns > 0:
+            self._sleep(remaining_ns / 1e9)
+
+
+# Idle simulator backends by (width, height, options); per process, so xdist-safe
+_sim_pool: Dict[Tuple[int, int, tuple], List[SimulatorBackend]] = {}
+
+
+@atexit.register
+def _close_pooled_backends():
+    """Close idle pooled backends, which may own a frame-encoding process pool."""
+    for idle in _sim_pool.values():
+        for backend in idle:
+            backend.cleanup()
+    _sim_pool.clear()
+
+
+@contextmanager
+def acquire_backend(width: int, height: int, out_dir, **kwargs):
+    """
+    Borrow a simulator backend of the given size, writing frames to out_dir.
+    
+    A backend released earlier with the same size and options is reset and
+    reused, which skips reallocating its frame buffer; otherwise a new one
+    is created. The backend goes back to the pool when the with-block exits.
+    """
+    key = (width, height, tuple(sorted(kwargs.items())))
+    idle = _sim_pool.get(key)
+    if idle:
+        backend = idle.pop()
+        backend.reset(out_dir=out_dir, clear_color=kwargs.get('bg_color'))
+    else:
+        backend = create_backend('simulator', width=width, height=height,
+                                 out_dir=str(out_dir), **kwargs)
+        backend._pool_key = key
+    try:
+        yield backend
+    finally:
+        release_backend(backend)
+
+
+def release_backend(backend):
+    """Return a simulator backend to the pool; other backends are ignored"""
+    if isinstance(backend, SimulatorBackend):
+        key = getattr(backend, '_pool_key', (backend.width, backend.height, ()))
+        _sim_pool.setdefault(key, []).append(backend)
 
 
 # Backend factory function
@@ -6,28 +6,326 @@ by parsing AST directly and rendering as visual operations.
 """
 
 import ast
+import atexit
+import functools
 import time
+import weakref
 import math
+import operator
+from array import array
 from typing import Dict, Any, List, Optional, Union
 from dataclasses import dataclass
 
 from .backends import create_backend
-from .signals import SignalData
+from .signals import SignalData, SignalBuffer, clamp_coord
+from .core_numba import NUMBA_AVAILABLE, JIT_MIN_ITERATIONS, plan_loop, get_compiled_loop
+
+
+def _safe_div(left, right):
+    return left / right if right != 0 else 0
+
+
+def _safe_mod(left, right):
+    return left % right if right != 0 else 0
+
+
+def _safe_floordiv(left, right):
+    return left // right if right != 0 else 0
+
+
+# Operator dispatch tables - resolved once per AST node instead of
+# walking an isinstance chain on every evaluation
+_BINOP = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: _safe_div,
+    ast.Mod: _safe_mod,
+    ast.Pow: operator.pow,
+    ast.FloorDiv: _safe_floordiv,
+}
+
+_UNOP = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+    ast.Not: operator.not_,
+}
+
+_CMPOP = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.In: lambda a, b: a in b,
+    ast.NotIn: lambda a, b: a not in b,
+    ast.Is: operator.is_,
+    ast.IsNot: operator.is_not,
+}
+
+# Source symbols used by _ast_to_string
+_BINOP_SYMBOLS = {
+    ast.Add: '+', ast.Sub: '-', ast.Mult: '*', ast.Div: '/',
+    ast.Mod: '%', ast.Pow: '**', ast.FloorDiv: '//'
+}
+_CMPOP_SYMBOLS = {
+    ast.Eq: '==', ast.NotEq: '!=', ast.Lt: '<',
+    ast.LtE: '<=', ast.Gt: '>', ast.GtE: '>=',
+    ast.In: 'in', ast.NotIn: 'not in', ast.Is: 'is', ast.IsNot: 'is not'
+}
+
+# Element types drawn as text vs. filled rects by _render_operations
+_TEXT_ELEMENTS = frozenset(
+    ('variable', 'output', 'loop_start', 'loop_iteration', 'loop_summary', 'if_condition')
+)
+_RECT_ELEMENTS = frozenset(('variable_bar', 'loop_tick'))
+
+# Interned color palette: operations store small integer ids and the hex
+# strings are only looked up at the backend boundary
+_PALETTE: List[str] = []
+_PALETTE_IDS: Dict[str, int] = {}
+
+
+def _palette_id(color: str) -> int:
+    """Return the palette id for a color, registering it on first use."""
+    palette_id = _PALETTE_IDS.get(color)
+    if palette_id is None:
+        palette_id = len(_PALETTE)
+        _PALETTE_IDS[color] = palette_id
+        _PALETTE.append(color)
+    return palette_id
+
+
+_COLOR_DEFAULT = _palette_id('#00ff88')
+_COLOR_VARIABLE = _palette_id('#ffff00')
+_COLOR_POSITIVE = _palette_id('#00ff00')
+_COLOR_NEGATIVE = _palette_id('#ff0000')
+_COLOR_OUTPUT = _palette_id('#00ffff')
+_COLOR_LOOP = _palette_id('#ff88ff')
+_COLOR_ITERATION = _palette_id('#88ff88')
+_COLOR_TRUE = _palette_id('#ffff88')
+_COLOR_FALSE = _palette_id('#ff8888')
+_COLOR_ERROR = _palette_id('#ff4444')
+
+# Content templates for hot-path elements; the string is only built
+# (via _format_content) when an element is rendered or viewed
+_FMT_VARIABLE = '{} = {}'
+_FMT_ITERATION = '  {} = {}'
+_FMT_WHILE_ITERATION = '  iteration {}'
+
+
+def _format_content(content: tuple) -> str:
+    """Build the text of a deferred (template, *args) content entry."""
+    return content[0].format(*content[1:])
+
+
+# Loops longer than this emit a downsampled set of ticks plus a summary
+MAX_VISIBLE_TICKS = 256
+
+# Marks variable slots not yet assigned in the current execution
+_UNSET = object()
+
+# Loops with a non-drawing body above this size emit ticks in bulk
+_BULK_TICK_THRESHOLD = 32
+
+# Shared metadata for every loop tick (read-only)
+_TICK_META = {'tick_size': 10}
+
+# Bound on distinct sources kept in the process-wide parse cache
+_TREE_CACHE_SIZE = 256
+
+
+# FormattedValue.conversion code -> conversion function (-1 means none)
+_CONVERSIONS = {ord('s'): str, ord('r'): repr, ord('a'): ascii}
+
+
+def _split_joinedstr(node: ast.JoinedStr) -> List[Union[str, tuple]]:
+    """
+    Split f-string values into literal strings and (expr, conversion, spec)
+    tuples. conversion is None or str/repr/ascii; spec is a literal format
+    spec ('' when absent) or a JoinedStr node for nested fields like {x:{w}}.
+    """
+    parts = []
+    for value in node.values:
+        if isinstance(value, ast.Constant):
+            parts.append(str(value.value))
+        elif isinstance(value, ast.FormattedValue):
+            spec = value.format_spec
+            if spec is None:
+                spec = ''
+            elif all(isinstance(piece, ast.Constant) for piece in spec.values):
+                spec = ''.join(str(piece.value) for piece in spec.values)
+            parts.append((value.value, _CONVERSIONS.get(value.conversion), spec))
+    return parts
+
+
+def _const_range(node: ast.For) -> Optional[range]:
+    """Return the range object for ``for x in range(<constants>)``, else None."""
+    iter_node = node.iter
+    if not (isinstance(iter_node, ast.Call) and isinstance(iter_node.func, ast.Name)
+            and iter_node.func.id == 'range' and 1 <= len(iter_node.args) <= 3):
+        return None
+    values = []
+    for arg in iter_node.args:
+        if not (isinstance(arg, ast.Constant) and type(arg.value) is int):
+            return None
+        values.append(arg.value)
+    try:
+        return range(*values)
+    except ValueError:
+        # range() step of zero
+        return None
+
+
+def _decorate_tree(tree: ast.AST):
+    """
+    Annotate AST nodes with resolved handlers and precomputed constants.
+    
+    Runs once per parsed tree so repeated executions of the same source
+    skip dispatch-table lookups, f-string splitting and constant range setup.
+    Variable names are mapped to list slots, recorded on the tree as
+    ``_vp_var_names`` / ``_vp_var_index``.
+    """
+    var_names = []
+    var_index = {}
+    
+    for node in ast.walk(tree):
+        node_type = type(node)
+        
+        if node_type is ast.Name:
+            # Each distinct name gets a slot in the engine's variable list
+            index = var_index.get(node.id)
+            if index is None:
+                index = var_index[node.id] = len(var_names)
+                var_names.append(node.id)
+            node._vp_var_idx = index
+            node._vp_eval = VisualPythonEngine._eval_indexed_name
+            continue
+        
+        handler = _EXPR_HANDLERS.get(node_type)
+        if handler is not None:
+            node._vp_eval = handler
+        else:
+            handler = _STMT_HANDLERS.get(node_type)
+            if handler is not None:
+                node._vp_exec = handler
+        
+        if node_type is ast.BinOp:
+            op = _BINOP.get(type(node.op))
+            if op is not None:
+                node._vp_op = op
+        elif node_type is ast.UnaryOp:
+            op = _UNOP.get(type(node.op))
+            if op is not None:
+                node._vp_op = op
+        elif node_type is ast.JoinedStr:
+            node._vp_parts = _split_joinedstr(node)
+        elif node_type is ast.For:
+            const_range = _const_range(node)
+            if const_range is not None:
+                node._vp_range = const_range
+            if NUMBA_AVAILABLE:
+                jit_plan = plan_loop(node)
+                if jit_plan is not None:
+                    node._vp_jit_plan = jit_plan
+    
+    tree._vp_var_names = var_names
+    tree._vp_var_index = var_index
+
+
+# Engines not yet cleaned up; whatever remains at exit is cleaned up then
+_live_engines: 'weakref.WeakSet[VisualPythonEngine]' = weakref.WeakSet()
+
+
+@atexit.register
+def _cleanup_engines():
+    """Clean up every engine still alive when the interpreter exits."""
+    for engine in list(_live_engines):
+        try:
+            engine.cleanup()
+        except Exception:
+            pass
+
+
+@functools.lru_cache(maxsize=_TREE_CACHE_SIZE)
+def _parse_cached(code: str) -> ast.Module:
+    """
+    Parse and decorate code once per distinct source, for every engine.
+    
+    Decorated trees are never mutated during execution (variable values
+    live in the engine), so engines can share them.
+    """
+    tree = ast.parse(code)
+    _decorate_tree(tree)
+    return tree
+
+
+class Keyframe:
+    """A Timeline OS keyframe; supports dict-style access for compatibility."""
+    
+    __slots__ = ('time', 'type', 'text', 'color', 'x', 'y')
+    
+    def __init__(self, time: float, type: str, text: str, color: str, x: int, y: int):
+        self.time = time
+        self.type = type
+        self.text = text
+        self.color = color
+        self.x = x
+        self.y = y
+    
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self.__slots__ else default
+    
+    def __repr__(self):
+        return (f"Keyframe(time={self.time!r}, type={self.type!r}, text={self.text!r}, "
+                f"color={self.color!r}, x={self.x!r}, y={self.y!r})")
 
 
-@dataclass
 class VisualElement:
     """Represents a visual element in the VisualPython display."""
-    element_type: str  # 'variable', 'variable_bar', 'output', 'loop_tick', etc.
-    content: str
-    x: int
-    y: int
-    color: str = '#00ff88'
-    metadata: Optional[Dict[str, Any]] = None
-
-    def __post_init__(self):
-        if self.metadata is None:
-            self.metadata = {}
+    
+    __slots__ = ('element_type', 'content', 'x', 'y', 'color', '_metadata')
+    
+    def __init__(self, element_type: str, content: str, x: int, y: int,
+                 color: str = '#00ff88', metadata: Optional[Dict[str, Any]] = None):
+        self.element_type = element_type  # 'variable', 'variable_bar', 'output', 'loop_tick', etc.
+        self.content = content
+        self.x = x
+        self.y = y
+        self.color = color
+        self._metadata = metadata
+    
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        # Allocated on first access so metadata-free elements stay dict-free
+        if self._metadata is None:
+            self._metadata = {}
+        return self._metadata
+    
+    @metadata.setter
+    def metadata(self, value: Optional[Dict[str, Any]]):
+        self._metadata = value
+    
+    def _fields(self) -> tuple:
+        return (self.element_type, self.content, self.x, self.y, self.color,
+                self._metadata or {})
+    
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._fields() == other._fields()
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        return (f"VisualElement(element_type={self.element_type!r}, content={self.content!r}, "
+                f"x={self.x!r}, y={self.y!r}, color={self.color!r}, metadata={self.metadata!r})")
 
 
 @dataclass
@@ -49,19 +347,40 @@ class VisualPythonEngine:
     """
     
     def __init__(self, backend='tkinter', width=800, height=600, **kwargs):
+        # Run loop bodies only on sampled iterations of downsampled loops
+        self.fast_loops = kwargs.pop('fast_loops', False)
+        # Defer backend.update() to flush() so several renders share one flush
+        self.animation_mode = kwargs.pop('animation_mode', False)
+        self._deferred_flush = False
+        
         self.backend_name = backend
         self.width = width
         self.height = height
         self.kwargs = kwargs
         
         # Core state
-        self.variables: Dict[str, Any] = {}
-        self.operations: List[VisualElement] = []
-        self.signals: List[SignalData] = []
+        # Variables live in a list indexed by the per-tree name slots assigned
+        # in _decorate_tree; ``variables`` builds a dict snapshot
+        self._var_names: List[str] = []
+        self._var_index: Dict[str, int] = {}
+        self._var_vals: List[Any] = []
+        self._signals = SignalBuffer()  # columnar; ``signals`` builds views
+        
+        # Visual operations, stored column-wise (struct of arrays); the
+        # ``operations`` property builds VisualElement views on demand
+        self._op_type: List[str] = []
+        self._op_x = array('q')
+        self._op_y = array('q')
+        self._op_color = array('H')  # palette ids, see _palette_id
+        self._op_content: List[Union[str, tuple]] = []  # str or deferred (template, *args)
+        self._op_meta: List[Optional[Dict[str, Any]]] = []
         
         # Timeline and keyframes
+        self.keyframes: List[Keyframe] = []
+        self._active_keyframes: Optional[List[tuple]] = None  # rebuilt lazily
+        self._active_keyframe_count = 0
+        self._active_keyframe_hash = 0
         self.current_time = 5.0  # Start at keyframe 5 (font foundation)
-        self.keyframes: List[Dict[str, Any]] = []
         
         # Execution state
         self.y_offset = 80  # Starting Y position for visual elements
@@ -71,62 +390,132 @@ class VisualPythonEngine:
         
         # Performance tracking
         self.execution_count = 0
-        self.total_execution_time = 0
+        self._total_execution_ns = 0
+        self._jit_compile_ns = 0  # excluded from measured execution time
+        
+        # Signals share one clock read per execute, offset 1us apart to keep order
+        self._frame_timestamp = 0.0
+        self._signal_counter = 0
+        
+        # Fingerprint of the last frame drawn by _render_operations
+        self._last_render_fingerprint: Optional[tuple] = None
         
         # Initialize backend
         self.backend = create_backend(backend, width=width, height=height, **kwargs)
         
         # Setup Timeline OS boot sequence
         self._setup_timeline_os()
+        
+        _live_engines.add(self)
+    
+    @property
+    def current_time(self) -> float:
+        """Timeline position; keyframes at or before it are rendered."""
+        return self._current_time
+    
+    @current_time.setter
+    def current_time(self, value: float):
+        self._current_time = value
+        self._active_keyframes = None
+    
+    def _get_active_keyframes(self) -> List[tuple]:
+        """Render items for keyframes visible at current_time, in time order."""
+        if self._active_keyframes is None or self._active_keyframe_count != len(self.keyframes):
+            keyframes = [
+                keyframe if isinstance(keyframe, Keyframe) else Keyframe(**keyframe)
+                for keyframe in self.keyframes
+            ]
+            keyframes.sort(key=lambda keyframe: keyframe.time)
+            self._active_keyframes = [
+                (keyframe.text, keyframe.x, keyframe.y, keyframe.color)
+                for keyframe in keyframes
+                if keyframe.time <= self._current_time
+                and keyframe.type in ('boot_message', 'font_system')
+            ]
+            self._active_keyframe_count = len(self.keyframes)
+            self._active_keyframe_hash = hash(tuple(self._active_keyframes))
+        return self._active_keyframes
     
     def _setup_timeline_os(self):
         """Initialize Timeline OS boot sequence and font system."""
-        # Timeline OS boot keyframes (0-3)
+        # Timeline OS boot keyframes (0-3): time, type, text, color, x, y
         boot_keyframes = [
-            {
-                'time': 0.0,
-                'type': 'boot_message',
-                'text': 'TIMELINE OS v1.0',
-                'color': '#00ffff',
-                'x': 20,
-                'y': 30
-            },
-            {
-                'time': 1.0,
-                'type': 'boot_message', 
-                'text': 'INITIALIZING ANALOG CORE',
-                'color': '#ffff00',
-                'x': 20,
-                'y': 45
-            },
-            {
-                'time': 2.0,
-                'type': 'boot_message',
-                'text': 'LOADING SIGNAL DRIVERS',
-                'color': '#ff8800',
-                'x': 20,
-                'y': 60
-            },
-            {
-                'time': 3.0,
-                'type': 'boot_message',
-                'text': 'BOOT SEQUENCE COMPLETE',
-                'color': '#00ff00',
-                'x': 20,
-                'y': 75
-            },
-            {
-                'time': 5.0,
-                'type': 'font_system',
-                'text': 'FONT SYSTEM LOADED',
-                'color': '#ffffff',
-                'x': 20,
-                'y': 20
-            }
+            Keyframe(0.0, 'boot_message', 'TIMELINE OS v1.0', '#00ffff', 20, 30),
+            Keyframe(1.0, 'boot_message', 'INITIALIZING ANALOG CORE', '#ffff00', 20, 45),
+            Keyframe(2.0, 'boot_message', 'LOADING SIGNAL DRIVERS', '#ff8800', 20, 60),
+            Keyframe(3.0, 'boot_message', 'BOOT SEQUENCE COMPLETE', '#00ff00', 20, 75),
+            Keyframe(5.0, 'font_system', 'FONT SYSTEM LOADED', '#ffffff', 20, 20)
         ]
         
         self.keyframes.extend(boot_keyframes)
     
+    @property
+    def operations(self) -> List[VisualElement]:
+        """
+        Visual operations from the last execution, as VisualElements.
+        
+        Elements are built from the operation columns on each access, so
+        lists kept by a caller are unaffected by later executions.
+        """
+        return [
+            VisualElement(element_type,
+                          content if content.__class__ is str else _format_content(content),
+                          x, y, _PALETTE[color], meta)
+            for element_type, content, x, y, color, meta in zip(
+                self._op_type, self._op_content, self._op_x,
+                self._op_y, self._op_color, self._op_meta)
+        ]
+    
+    def operations_of_type(self, element_type: str) -> List[VisualElement]:
+        """
+        Visual operations of one element type from the last execution.
+        
+        Only the type column is scanned; elements are built for matches alone.
+        """
+        contents, xs, ys, colors, metas = (
+            self._op_content, self._op_x, self._op_y, self._op_color, self._op_meta)
+        return [
+            VisualElement(element_type,
+                          contents[i] if contents[i].__class__ is str else _format_content(contents[i]),
+                          xs[i], ys[i], _PALETTE[colors[i]], metas[i])
+            for i, op_type in enumerate(self._op_type) if op_type == element_type
+        ]
+    
+    @property
+    def variables(self) -> Dict[str, Any]:
+        """Snapshot of the variables assigned by the last execution."""
+        return {
+            name: value
+            for name, value in zip(self._var_names, self._var_vals)
+            if value is not _UNSET
+        }
+    
+    @property
+    def signals(self) -> List[SignalData]:
+        """Signals from the last execution, as SignalData views."""
+        return list(self._signals)
+    
+    def _emit(self, element_type: str, content: Union[str, tuple], x: int, y: int,
+              color: int = _COLOR_DEFAULT, meta: Optional[Dict[str, Any]] = None):
+        """Append one visual operation to the operation columns (color is a palette id)."""
+        # Convert before touching any column so a bad coordinate leaves them aligned
+        x, y = clamp_coord(x), clamp_coord(y)
+        self._op_type.append(element_type)
+        self._op_content.append(content)
+        self._op_x.append(x)
+        self._op_y.append(y)
+        self._op_color.append(color)
+        self._op_meta.append(meta)
+    
+    def _clear_operations(self):
+        """Drop all visual operations from the previous execution."""
+        del self._op_type[:]
+        del self._op_content[:]
+        del self._op_x[:]
+        del self._op_y[:]
+        del self._op_color[:]
+        del self._op_meta[:]
+    
     def execute(self, code: str) -> float:
         """
         Execute Python code directly as visual operations.
@@ -140,17 +529,25 @@ class VisualPythonEngine:
         Returns:
             Execution time in milliseconds
         """
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
         try:
             # Clear previous state
-            self.operations.clear()
-            self.signals.clear()
-            self.variables.clear()
+            self._clear_operations()
+            self._jit_compile_ns = 0
+            self._frame_timestamp = time.time()
+            self._signal_counter = 0
+            self._signals.clear()
+            self._var_names = []
+            self._var_index = {}
+            self._var_vals = []
             self.y_offset = 80
             
             # Parse code to AST - no compilation!
-            tree = ast.parse(code)
+            tree = self._parse(code)
+            self._var_names = tree._vp_var_names
+            self._var_index = tree._vp_var_index
+            self._var_vals = [_UNSET] * len(self._var_names)
             
             # Process each top-level statement
             for node in tree.body:
@@ -160,35 +557,108 @@ class VisualPythonEngine:
             self._render_operations()
             
             # Calculate execution time
-            execution_time = (time.time() - start_time) * 1000
+            elapsed_ns = time.perf_counter_ns() - start_ns - self._jit_compile_ns
+            execution_time = elapsed_ns / 1e6
             
             # Update statistics
             self.execution_count += 1
-            self.total_execution_time += execution_time
+            self._total_execution_ns += elapsed_ns
             
             return execution_time
             
         except Exception as e:
-            error_time = (time.time() - start_time) * 1000
+            error_time = (time.perf_counter_ns() - start_ns) / 1e6
             self._render_error(str(e))
             return error_time
     
+    def reset(self):
+        """
+        Forget earlier executions: variables, operations, signals and
+        statistics. Keyframes, the backend and settings are kept.
+        """
+        self._clear_operations()
+        self._signals.clear()
+        self._var_names = []
+        self._var_index = {}
+        self._var_vals = []
+        self.y_offset = 80
+        self.execution_count = 0
+        self._total_execution_ns = 0
+        self._jit_compile_ns = 0
+        self._deferred_flush = False
+        self._last_render_fingerprint = None
+    
+    def snapshot(self) -> tuple:
+        """
+        Copy of the state left by the last execution: variables, operations,
+        signals and layout position. Pass it to ``restore`` to bring it back.
+        """
+        return (
+            self._var_names, self._var_index, self._var_vals[:],
+            self._op_type[:], self._op_content[:], self._op_x[:], self._op_y[:],
+            self._op_color[:], self._op_meta[:],
+            self._signals.copy(), self.y_offset,
+        )
+    
+    def restore(self, snapshot: tuple):
+        """Reinstate a ``snapshot`` and render it as ``execute`` would have."""
+        (self._var_names, self._var_index, var_vals,
+         op_type, op_content, op_x, op_y, op_color, op_meta,
+         signals, self.y_offset) = snapshot
+        # Copied again so the next execute, which clears columns in place,
+        # leaves the snapshot intact
+        self._var_vals = var_vals[:]
+        self._op_type = op_type[:]
+        self._op_content = op_content[:]
+        self._op_x = op_x[:]
+        self._op_y = op_y[:]
+        self._op_color = op_color[:]
+        self._op_meta = op_meta[:]
+        self._signals = signals.copy()
+        self._render_operations()
+    
+    def flush(self):
+        """Push any deferred render to the display."""
+        if self._deferred_flush:
+            self._deferred_flush = False
+            self.backend.update()
+    
+    def run_frame(self, codes: List[str]) -> List[float]:
+        """
+        Execute several code snippets as one frame with a single display flush.
+        
+        Args:
+            codes: Python source snippets, executed in order
+            
+        Returns:
+            Execution time in milliseconds for each snippet
+        """
+        animation_mode = self.animation_mode
+        self.animation_mode = True
+        try:
+            times = [self.execute(code) for code in codes]
+        finally:
+            self.animation_mode = animation_mode
+        self.flush()
+        return times
+    
+    def _parse(self, code: str) -> ast.Module:
+        """Parse and decorate code, reusing the tree for repeated source."""
+        return _parse_cached(code)
+    
     def _process_ast_node(self, node: ast.AST):
         """Process a single AST node as a direct visual operation."""
-        if isinstance(node, ast.Assign):
-            self._process_assignment(node)
-            
-        elif isinstance(node, ast.Expr) and isinstance(node.value, ast.Call):
+        handler = getattr(node, '_vp_exec', None)
+        if handler is None:
+            handler = _STMT_HANDLERS.get(type(node))
+            if handler is None:
+                return
+        handler(self, node)
+    
+    def _process_expr_statement(self, node: ast.Expr):
+        """Process a bare expression statement (only calls are visual)."""
+        if isinstance(node.value, ast.Call):
             self._process_function_call(node.value)
-            
-        elif isinstance(node, ast.For):
-            self._process_for_loop(node)
-            
-        elif isinstance(node, ast.If):
-            self._process_if_statement(node)
-            
-        elif isinstance(node, ast.While):
-            self._process_while_loop(node)
     
     def _process_assignment(self, node: ast.Assign):
         """Process variable assignment as immediate visual operation."""
@@ -196,54 +666,50 @@ class VisualPythonEngine:
             var_name = node.targets[0].id
             value = self._evaluate_expression(node.value)
             
-            # Store variable
-            self.variables[var_name] = value
-            
-            # Create visual element for variable
-            element = VisualElement(
-                element_type='variable',
-                content=f"{var_name} = {value}",
-                x=350,
-                y=self.y_offset,
-                color='#ffff00'
-            )
-            self.operations.append(element)
-            
-            # Create visual bar for numeric values
-            if isinstance(value, (int, float)):
-                bar_width = min(abs(value) * 2, 200)
-                bar_color = '#00ff00' if value >= 0 else '#ff0000'
-                
-                bar_element = VisualElement(
-                    element_type='variable_bar',
-                    content='',
-                    x=self.bar_start_x,
-                    y=self.y_offset - 5,
-                    color=bar_color,
-                    metadata={
-                        'bar_width': bar_width,
-                        'bar_height': 15,
-                        'value': value
-                    }
-                )
-                self.operations.append(bar_element)
+            self._emit_assignment(node.targets[0]._vp_var_idx, var_name, value)
+    
+    def _emit_assignment(self, var_idx: int, var_name: str, value: Any):
+        """Store a variable and emit its visual element, bar and signal."""
+        # Store variable
+        self._var_vals[var_idx] = value
+        
+        # Create visual element for variable
+        self._emit(
+            'variable',
+            (_FMT_VARIABLE, var_name, value),
+            350,
+            self.y_offset,
+            _COLOR_VARIABLE
+        )
+        
+        # Create visual bar for numeric values
+        if isinstance(value, (int, float)):
+            bar_width = min(abs(value) * 2, 200)
+            bar_color = _COLOR_POSITIVE if value >= 0 else _COLOR_NEGATIVE
             
-            # Add to signals for hardware export
-            timestamp = time.time()
-            signal = SignalData(
-                timestamp=timestamp,
-                operation='assign',
-                x=350,
-                y=self.y_offset,
-                r=255 if isinstance(value, (int, float)) and value > 0 else 0,
-                g=255,
-                b=0,
-                variable=var_name,
-                value=value
+            self._emit(
+                'variable_bar',
+                '',
+                self.bar_start_x,
+                self.y_offset - 5,
+                bar_color,
+                meta={
+                    'bar_width': bar_width,
+                    'bar_height': 15,
+                    'value': value
+                }
             )
-            self.signals.append(signal)
-            
-            self.y_offset += self.line_height
+        
+        # Add to signals for hardware export
+        timestamp = self._frame_timestamp + self._signal_counter * 1e-6
+        self._signal_counter += 1
+        self._signals.append(
+            timestamp, 'assign', 350, self.y_offset,
+            255 if isinstance(value, (int, float)) and value > 0 else 0, 255, 0,
+            var_name, value
+        )
+        
+        self.y_offset += self.line_height
     
     def _process_function_call(self, node: ast.Call):
         """Process function calls, especially print statements."""
@@ -252,29 +718,22 @@ class VisualPythonEngine:
                 output = str(self._evaluate_expression(node.args[0]))
                 
                 # Create visual element for print output
-                element = VisualElement(
-                    element_type='output',
-                    content=output,
-                    x=self.print_start_x,
-                    y=self.y_offset,
-                    color='#00ffff'
+                self._emit(
+                    'output',
+                    output,
+                    self.print_start_x,
+                    self.y_offset,
+                    _COLOR_OUTPUT
                 )
-                self.operations.append(element)
                 
                 # Add to signals
-                timestamp = time.time()
-                signal = SignalData(
-                    timestamp=timestamp,
-                    operation='print',
-                    x=self.print_start_x,
-                    y=self.y_offset,
-                    r=0,
-                    g=255,
-                    b=255,
-                    variable='output',
-                    value=output
+                timestamp = self._frame_timestamp + self._signal_counter * 1e-6
+                self._signal_counter += 1
+                self._signals.append(
+                    timestamp, 'print', self.print_start_x, self.y_offset,
+                    0, 255, 255,
+                    'output', output
                 )
-                self.signals.append(signal)
                 
                 self.y_offset += self.line_height
     
@@ -285,56 +744,180 @@ class VisualPythonEngine:
                 var_name = node.target.id
                 
                 # Get range parameters
-                args = [self._evaluate_expression(arg) for arg in node.iter.args]
-                if len(args) == 1:
-                    start, stop, step = 0, args[0], 1
-                elif len(args) == 2:
-                    start, stop, step = args[0], args[1], 1
+                # All-constant ranges are precomputed by _decorate_tree
+                const_range = getattr(node, '_vp_range', None)
+                if const_range is not None:
+                    start, stop, step = const_range.start, const_range.stop, const_range.step
                 else:
-                    start, stop, step = args[0], args[1], args[2]
+                    # Constant args are read directly; only the rest go
+                    # through the evaluator
+                    args = [
+                        arg.value if arg.__class__ is ast.Constant else self._evaluate_expression(arg)
+                        for arg in node.iter.args
+                    ]
+                    if len(args) == 1:
+                        start, stop, step = 0, args[0], 1
+                    elif len(args) == 2:
+                        start, stop, step = args[0], args[1], 1
+                    else:
+                        start, stop, step = args[0], args[1], args[2]
                 
                 # Create loop header
-                loop_header = VisualElement(
-                    element_type='loop_start',
-                    content=f"for {var_name} in range({start}, {stop}):",
-                    x=self.print_start_x,
-                    y=self.y_offset,
-                    color='#ff88ff'
+                self._emit(
+                    'loop_start',
+                    f"for {var_name} in range({start}, {stop}):",
+                    self.print_start_x,
+                    self.y_offset,
+                    _COLOR_LOOP
                 )
-                self.operations.append(loop_header)
                 self.y_offset += self.line_height
                 
-                # Execute loop iterations
-                tick_x = self.print_start_x + 20
-                for i in range(start, stop, step):
-                    self.variables[var_name] = i
-                    
-                    # Create tick mark for iteration
-                    tick_element = VisualElement(
-                        element_type='loop_iteration',
-                        content=f"  {var_name} = {i}",
-                        x=tick_x,
-                        y=self.y_offset,
-                        color='#88ff88'
-                    )
-                    self.operations.append(tick_element)
-                    
-                    # Add visual tick mark
-                    tick_mark = VisualElement(
-                        element_type='loop_tick',
-                        content='',
-                        x=tick_x + 150 + i * 15,
-                        y=self.y_offset - 5,
-                        color='#00ff00',
-                        metadata={'tick_size': 10}
+                # Large loops show at most MAX_VISIBLE_TICKS sampled iterations
+                loop_range = range(start, stop, step)
+                iterations = len(loop_range)
+                stride = -(-iterations // MAX_VISIBLE_TICKS) if iterations > MAX_VISIBLE_TICKS else 1
+                
+                # Pure-numeric bodies run compiled when Numba is available
+                # (trees are shared, so availability is checked per run too)
+                if not (NUMBA_AVAILABLE and hasattr(node, '_vp_jit_plan')
+                        and self._try_jit_loop(node, var_name, loop_range, stride)):
+                    self._run_range_loop(node, var_name, loop_range, stride)
+                
+                if stride > 1:
+                    self._emit(
+                        'loop_summary',
+                        f"  ... {iterations} iterations rendered as {-(-iterations // stride)} ticks",
+                        self.print_start_x + 20,
+                        self.y_offset,
+                        _COLOR_LOOP
                     )
-                    self.operations.append(tick_mark)
-                    
                     self.y_offset += self.line_height
-                    
-                    # Process loop body
-                    for body_node in node.body:
-                        self._process_ast_node(body_node)
+    
+    def _run_range_loop(self, node: ast.For, var_name: str, loop_range: range, stride: int):
+        """Interpret a range loop, emitting ticks for every stride-th iteration."""
+        # Hot attributes are hoisted into locals and body handlers
+        # resolved once up front
+        var_vals = self._var_vals
+        var_idx = node.target._vp_var_idx
+        emit = self._emit
+        line_height = self.line_height
+        body = self._resolve_body(node.body)
+        if not body and len(loop_range) > _BULK_TICK_THRESHOLD:
+            # Nothing in the body draws, so ticks are pure data
+            self._emit_ticks_bulk(var_idx, var_name, loop_range, stride)
+            return
+        
+        skip_unsampled = self.fast_loops and stride > 1
+        tick_x = self.print_start_x + 20
+        tick_base_x = tick_x + 150
+        index = -1
+        for i in loop_range:
+            index += 1
+            var_vals[var_idx] = i
+            if index % stride == 0:
+                y = self.y_offset
+                
+                # Create tick mark for iteration
+                emit('loop_iteration', (_FMT_ITERATION, var_name, i), tick_x, y, _COLOR_ITERATION)
+                
+                # Add visual tick mark
+                emit('loop_tick', '', tick_base_x + i * 15, y - 5, _COLOR_POSITIVE, _TICK_META)
+                
+                self.y_offset = y + line_height
+            elif skip_unsampled:
+                continue
+            
+            # Process loop body
+            for handler, body_node in body:
+                handler(self, body_node)
+    
+    def _emit_ticks_bulk(self, var_idx: int, var_name: str, loop_range: range, stride: int):
+        """Append iteration/tick pairs for a whole loop column by column."""
+        if not loop_range:
+            return
+        sampled = loop_range[::stride]
+        count = len(sampled)
+        line_height = self.line_height
+        tick_x = self.print_start_x + 20
+        tick_base_x = tick_x + 150
+        xs = [clamp_coord(tick_base_x + i * 15) for i in sampled]
+        ys = [clamp_coord(self.y_offset + n * line_height) for n in range(count)]
+        
+        # Columns interleave (loop_iteration, loop_tick) per sampled iteration
+        self._op_type.extend(('loop_iteration', 'loop_tick') * count)
+        for i in sampled:
+            self._op_content.append((_FMT_ITERATION, var_name, i))
+            self._op_content.append('')
+        for x in xs:
+            self._op_x.append(tick_x)
+            self._op_x.append(x)
+        for y in ys:
+            self._op_y.append(y)
+            self._op_y.append(clamp_coord(y - 5))
+        self._op_color.extend(array('H', (_COLOR_ITERATION, _COLOR_POSITIVE)) * count)
+        self._op_meta.extend((None, _TICK_META) * count)
+        
+        self._var_vals[var_idx] = loop_range[-1]
+        self.y_offset += count * line_height
+    
+    def _try_jit_loop(self, node: ast.For, var_name: str, loop_range: range, stride: int) -> bool:
+        """Run a planned loop through its compiled body; False to interpret instead."""
+        # With fast_loops the interpreter skips the body on unsampled
+        # iterations, so only the sampled ones are run compiled
+        skip_unsampled = self.fast_loops and stride > 1
+        run_range = loop_range[::stride] if skip_unsampled else loop_range
+        start, stop, step = run_range.start, run_range.stop, run_range.step
+        iterations = len(run_range)
+        if iterations < JIT_MIN_ITERATIONS:
+            return False
+        
+        variables = self.variables
+        loop, compile_ns = get_compiled_loop(node, variables, loop_range)
+        self._jit_compile_ns += compile_ns
+        if loop is None:
+            return False
+        values = loop.run(start, stop, step, iterations, variables)
+        if values is None:
+            return False
+        
+        # Replay the recorded values as the interpreter would have emitted them
+        var_vals = self._var_vals
+        var_idx = node.target._vp_var_idx
+        emit = self._emit
+        emit_assignment = self._emit_assignment
+        line_height = self.line_height
+        targets = [(self._var_index[target], target) for target in loop.targets]
+        width = len(targets)
+        if skip_unsampled:
+            stride = 1
+        tick_x = self.print_start_x + 20
+        tick_base_x = tick_x + 150
+        index = -1
+        for i in run_range:
+            index += 1
+            var_vals[var_idx] = i
+            if index % stride == 0:
+                y = self.y_offset
+                emit('loop_iteration', (_FMT_ITERATION, var_name, i), tick_x, y, _COLOR_ITERATION)
+                emit('loop_tick', '', tick_base_x + i * 15, y - 5, _COLOR_POSITIVE, _TICK_META)
+                self.y_offset = y + line_height
+            
+            offset = index * width
+            for column, (target_idx, target) in enumerate(targets):
+                emit_assignment(target_idx, target, values[offset + column])
+        if skip_unsampled:
+            # The interpreter still advances the loop variable to the end
+            var_vals[var_idx] = loop_range[-1]
+        return True
+    
+    def _resolve_body(self, statements: List[ast.stmt]) -> List[tuple]:
+        """Pair each statement with its handler, dropping unsupported ones."""
+        body = []
+        for statement in statements:
+            handler = getattr(statement, '_vp_exec', None) or _STMT_HANDLERS.get(type(statement))
+            if handler is not None:
+                body.append((handler, statement))
+        return body
     
     def _process_if_statement(self, node: ast.If):
         """Process if/elif/else statements."""
@@ -343,14 +926,13 @@ class VisualPythonEngine:
         # Show condition evaluation
         condition_text = f"if {self._ast_to_string(node.test)}: → {bool(condition_result)}"
         
-        condition_element = VisualElement(
-            element_type='if_condition',
-            content=condition_text,
-            x=self.print_start_x,
-            y=self.y_offset,
-            color='#ffff88' if condition_result else '#ff8888'
+        self._emit(
+            'if_condition',
+            condition_text,
+            self.print_start_x,
+            self.y_offset,
+            _COLOR_TRUE if condition_result else _COLOR_FALSE
         )
-        self.operations.append(condition_element)
         self.y_offset += self.line_height
         
         # Execute appropriate branch
@@ -366,26 +948,24 @@ class VisualPythonEngine:
         loop_count = 0
         max_iterations = 1000  # Safety limit
         
-        while_header = VisualElement(
-            element_type='loop_start',
-            content=f"while {self._ast_to_string(node.test)}:",
-            x=self.print_start_x,
-            y=self.y_offset,
-            color='#ff88ff'
+        self._emit(
+            'loop_start',
+            f"while {self._ast_to_string(node.test)}:",
+            self.print_start_x,
+            self.y_offset,
+            _COLOR_LOOP
         )
-        self.operations.append(while_header)
         self.y_offset += self.line_height
         
         while self._evaluate_expression(node.test) and loop_count < max_iterations:
             # Show iteration
-            iter_element = VisualElement(
-                element_type='loop_iteration',
-                content=f"  iteration {loop_count}",
-                x=self.print_start_x + 20,
-                y=self.y_offset,
-                color='#88ff88'
+            self._emit(
+                'loop_iteration',
+                (_FMT_WHILE_ITERATION, loop_count),
+                self.print_start_x + 20,
+                self.y_offset,
+                _COLOR_ITERATION
             )
-            self.operations.append(iter_element)
             self.y_offset += self.line_height
             
             # Process loop body
@@ -395,220 +975,269 @@ class VisualPythonEngine:
             loop_count += 1
         
         if loop_count >= max_iterations:
-            warning_element = VisualElement(
-                element_type='error',
-                content="  (loop stopped - max iterations reached)",
-                x=self.print_start_x + 20,
-                y=self.y_offset,
-                color='#ff4444'
+            self._emit(
+                'error',
+                "  (loop stopped - max iterations reached)",
+                self.print_start_x + 20,
+                self.y_offset,
+                _COLOR_ERROR
             )
-            self.operations.append(warning_element)
             self.y_offset += self.line_height
     
     def _evaluate_expression(self, node: ast.AST) -> Any:
         """Safely evaluate an AST expression node."""
-        if isinstance(node, ast.Constant):
-            return node.value
-            
-        elif isinstance(node, ast.Name):
-            return self.variables.get(node.id, 0)
-            
-        elif isinstance(node, ast.BinOp):
-            left = self._evaluate_expression(node.left)
-            right = self._evaluate_expression(node.right)
-            
-            if isinstance(node.op, ast.Add):
-                return left + right
-            elif isinstance(node.op, ast.Sub):
-                return left - right
-            elif isinstance(node.op, ast.Mult):
-                return left * right
-            elif isinstance(node.op, ast.Div):
-                return left / right if right != 0 else 0
-            elif isinstance(node.op, ast.Mod):
-                return left % right if right != 0 else 0
-            elif isinstance(node.op, ast.Pow):
-                return left ** right
-            elif isinstance(node.op, ast.FloorDiv):
-                return left // right if right != 0 else 0
-                
-        elif isinstance(node, ast.UnaryOp):
-            operand = self._evaluate_expression(node.operand)
-            if isinstance(node.op, ast.UAdd):
-                return +operand
-            elif isinstance(node.op, ast.USub):
-                return -operand
-            elif isinstance(node.op, ast.Not):
-                return not operand
-                
-        elif isinstance(node, ast.Compare):
-            left = self._evaluate_expression(node.left)
-            for op, comparator in zip(node.ops, node.comparators):
-                right = self._evaluate_expression(comparator)
-                if isinstance(op, ast.Eq):
-                    if not (left == right):
-                        return False
-                elif isinstance(op, ast.NotEq):
-                    if not (left != right):
-                        return False
-                elif isinstance(op, ast.Lt):
-                    if not (left < right):
-                        return False
-                elif isinstance(op, ast.LtE):
-                    if not (left <= right):
-                        return False
-                elif isinstance(op, ast.Gt):
-                    if not (left > right):
-                        return False
-                elif isinstance(op, ast.GtE):
-                    if not (left >= right):
-                        return False
-                left = right
-            return True
-            
-        elif isinstance(node, ast.BoolOp):
-            if isinstance(node.op, ast.And):
-                for value in node.values:
-                    if not self._evaluate_expression(value):
-                        return False
-                return True
-            elif isinstance(node.op, ast.Or):
-                for value in node.values:
-                    if self._evaluate_expression(value):
-                        return True
+        handler = getattr(node, '_vp_eval', None)
+        if handler is None:
+            handler = _EXPR_HANDLERS.get(type(node))
+            if handler is None:
+                # Default fallback
+                return 0
+        return handler(self, node)
+    
+    def _eval_constant(self, node: ast.Constant) -> Any:
+        return node.value
+    
+    def _eval_name(self, node: ast.Name) -> Any:
+        # Fallback for nodes without a slot index
+        index = self._var_index.get(node.id)
+        if index is None:
+            return 0
+        value = self._var_vals[index]
+        return 0 if value is _UNSET else value
+    
+    def _eval_indexed_name(self, node: ast.Name) -> Any:
+        value = self._var_vals[node._vp_var_idx]
+        return 0 if value is _UNSET else value
+    
+    def _eval_binop(self, node: ast.BinOp) -> Any:
+        left = self._evaluate_expression(node.left)
+        right = self._evaluate_expression(node.right)
+        
+        # Resolved operator is stashed on the node so re-executions
+        # of the same tree skip the table lookup
+        op = getattr(node, '_vp_op', None)
+        if op is None:
+            op = _BINOP.get(type(node.op))
+            if op is None:
+                return 0
+            node._vp_op = op
+        return op(left, right)
+    
+    def _eval_unaryop(self, node: ast.UnaryOp) -> Any:
+        operand = self._evaluate_expression(node.operand)
+        op = getattr(node, '_vp_op', None)
+        if op is None:
+            op = _UNOP.get(type(node.op))
+            if op is None:
+                return 0
+            node._vp_op = op
+        return op(operand)
+    
+    def _eval_compare(self, node: ast.Compare) -> bool:
+        ops = getattr(node, '_vp_ops', None)
+        if ops is None:
+            ops = [_CMPOP.get(type(op)) for op in node.ops]
+            if None in ops:
                 return False
-                
-        elif isinstance(node, ast.JoinedStr):
-            # f-string support
-            result = ""
+            node._vp_ops = ops
+        
+        left = self._evaluate_expression(node.left)
+        for op, comparator in zip(ops, node.comparators):
+            right = self._evaluate_expression(comparator)
+            if not op(left, right):
+                return False
+            left = right
+        return True
+    
+    def _eval_list(self, node: ast.List) -> list:
+        # List/tuple literals, e.g. the right side of a membership test
+        return [self._evaluate_expression(elt) for elt in node.elts]
+    
+    def _eval_tuple(self, node: ast.Tuple) -> tuple:
+        return tuple(self._evaluate_expression(elt) for elt in node.elts)
+    
+    def _eval_boolop(self, node: ast.BoolOp) -> Any:
+        if isinstance(node.op, ast.And):
             for value in node.values:
-                if isinstance(value, ast.Constant):
-                    result += str(value.value)
-                elif isinstance(value, ast.FormattedValue):
-                    result += str(self._evaluate_expression(value.value))
-            return result
-            
-        elif isinstance(node, ast.Call):
-            # Handle built-in functions
-            if isinstance(node.func, ast.Name):
-                func_name = node.func.id
-                if func_name == 'len' and node.args:
-                    arg = self._evaluate_expression(node.args[0])
-                    return len(arg) if hasattr(arg, '__len__') else 0
-                elif func_name == 'abs' and node.args:
-                    return abs(self._evaluate_expression(node.args[0]))
-                elif func_name == 'min' and node.args:
-                    return min(self._evaluate_expression(arg) for arg in node.args)
-                elif func_name == 'max' and node.args:
-                    return max(self._evaluate_expression(arg) for arg in node.args)
-                elif func_name == 'round' and node.args:
-                    value = self._evaluate_expression(node.args[0])
-                    digits = self._evaluate_expression(node.args[1]) if len(node.args) > 1 else 0
-                    return round(value, digits)
-        
-        # Default fallback
+                if not self._evaluate_expression(value):
+                    return False
+            return True
+        elif isinstance(node.op, ast.Or):
+            for value in node.values:
+                if self._evaluate_expression(value):
+                    return True
+            return False
+        return 0
+    
+    def _eval_joinedstr(self, node: ast.JoinedStr) -> str:
+        # f-string support
+        parts = getattr(node, '_vp_parts', None)
+        if parts is None:
+            parts = _split_joinedstr(node)
+        pieces = []
+        for part in parts:
+            if part.__class__ is str:
+                pieces.append(part)
+                continue
+            expr, conversion, spec = part
+            value = self._evaluate_expression(expr)
+            if conversion is not None:
+                value = conversion(value)
+            if spec == '':
+                pieces.append(str(value))
+            else:
+                if spec.__class__ is not str:
+                    spec = self._evaluate_expression(spec)
+                pieces.append(format(value, spec))
+        return "".join(pieces)
+    
+    def _eval_call(self, node: ast.Call) -> Any:
+        # Handle built-in functions
+        if isinstance(node.func, ast.Name):
+            func_name = node.func.id
+            if func_name == 'len' and node.args:
+                arg = self._evaluate_expression(node.args[0])
+                return len(arg) if hasattr(arg, '__len__') else 0
+            elif func_name == 'abs' and node.args:
+                return abs(self._evaluate_expression(node.args[0]))
+            elif func_name == 'min' and node.args:
+                return min(self._evaluate_expression(arg) for arg in node.args)
+            elif func_name == 'max' and node.args:
+                return max(self._evaluate_expression(arg) for arg in node.args)
+            elif func_name == 'round' and node.args:
+                value = self._evaluate_expression(node.args[0])
+                digits = self._evaluate_expression(node.args[1]) if len(node.args) > 1 else 0
+                return round(value, digits)
         return 0
     
     def _ast_to_string(self, node: ast.AST) -> str:
         """Convert AST node back to readable string."""
+        # Trees are reused across executions, so the text is cached on the node
+        cached = getattr(node, '_vp_str', None)
+        if cached is not None:
+            return cached
+        
         if isinstance(node, ast.Name):
-            return node.id
+            result = node.id
         elif isinstance(node, ast.Constant):
-            return str(node.value)
+            result = str(node.value)
         elif isinstance(node, ast.BinOp):
             left = self._ast_to_string(node.left)
             right = self._ast_to_string(node.right)
-            op_map = {
-                ast.Add: '+', ast.Sub: '-', ast.Mult: '*', ast.Div: '/',
-                ast.Mod: '%', ast.Pow: '**', ast.FloorDiv: '//'
-            }
-            op = op_map.get(type(node.op), '?')
-            return f"{left} {op} {right}"
+            op = _BINOP_SYMBOLS.get(type(node.op), '?')
+            result = f"{left} {op} {right}"
         elif isinstance(node, ast.Compare):
-            left = self._ast_to_string(node.left)
-            result = left
+            result = self._ast_to_string(node.left)
             for op, comparator in zip(node.ops, node.comparators):
-                op_map = {
-                    ast.Eq: '==', ast.NotEq: '!=', ast.Lt: '<',
-                    ast.LtE: '<=', ast.Gt: '>', ast.GtE: '>='
-                }
-                op_str = op_map.get(type(op), '?')
+                op_str = _CMPOP_SYMBOLS.get(type(op), '?')
                 right = self._ast_to_string(comparator)
                 result += f" {op_str} {right}"
-            return result
         else:
-            return str(type(node).__name__)
+            result = str(type(node).__name__)
+        
+        node._vp_str = result
+        return result
+    
+    def _render_fingerprint(self) -> tuple:
+        """Snapshot of everything _render_operations would draw.
+
+        Deferred content tuples carry the raw values, so each one is tagged with
+        the value types: 1, 1.0 and True compare equal but format differently.
+        """
+        self._get_active_keyframes()
+        # Rect sizes derive from the variable values held in the content column
+        contents = tuple(
+            content if content.__class__ is str else (content, tuple(map(type, content)))
+            for content in self._op_content
+        )
+        return (id(self.backend), self._active_keyframe_hash, tuple(self._op_type),
+                self._op_x.tobytes(), self._op_y.tobytes(), self._op_color.tobytes(),
+                contents)
+    
+    def _same_render(self, fingerprint: tuple) -> bool:
+        """Whether fingerprint matches the frame already on the backend."""
+        try:
+            return fingerprint == self._last_render_fingerprint
+        except (TypeError, ValueError):
+            # Values without a plain boolean equality (e.g. arrays): always redraw
+            return False
     
     def _render_operations(self):
         """Render all operations to the visual backend."""
+        # Re-executing code that produces the same frame skips the redraw
+        fingerprint = self._render_fingerprint()
+        if self._same_render(fingerprint):
+            return
+        self._last_render_fingerprint = fingerprint
+        
         self.backend.clear()
         
         # Render Timeline OS boot sequence
-        for keyframe in self.keyframes:
-            if keyframe['time'] <= self.current_time:
-                if keyframe['type'] == 'boot_message':
-                    self.backend.render_text(
-                        keyframe['text'],
-                        keyframe['x'],
-                        keyframe['y'],
-                        color=keyframe['color']
-                    )
-                elif keyframe['type'] == 'font_system':
-                    self.backend.render_text(
-                        keyframe['text'],
-                        keyframe['x'],
-                        keyframe['y'],
-                        color=keyframe['color']
-                    )
+        self._render_texts(self._get_active_keyframes())
         
-        # Render all visual operations
-        for operation in self.operations:
-            if operation.element_type == 'variable':
-                self.backend.render_text(
-                    operation.content,
-                    operation.x,
-                    operation.y,
-                    color=operation.color
-                )
-            elif operation.element_type == 'variable_bar':
-                bar_width = operation.metadata.get('bar_width', 0)
-                bar_height = operation.metadata.get('bar_height', 15)
-                self.backend.render_rect(
-                    operation.x,
-                    operation.y,
-                    bar_width,
-                    bar_height,
-                    color=operation.color
-                )
-            elif operation.element_type == 'output':
-                self.backend.render_text(
-                    operation.content,
-                    operation.x,
-                    operation.y,
-                    color=operation.color
-                )
-            elif operation.element_type in ['loop_start', 'loop_iteration', 'if_condition']:
-                self.backend.render_text(
-                    operation.content,
-                    operation.x,
-                    operation.y,
-                    color=operation.color
-                )
-            elif operation.element_type == 'loop_tick':
-                tick_size = operation.metadata.get('tick_size', 10)
-                self.backend.render_rect(
-                    operation.x,
-                    operation.y,
-                    tick_size,
-                    tick_size,
-                    color=operation.color
-                )
+        # Bucket operation indices by primitive in a single pass
+        text_idx = []
+        rect_idx = []
+        for i, element_type in enumerate(self._op_type):
+            if element_type in _TEXT_ELEMENTS:
+                text_idx.append(i)
+            elif element_type in _RECT_ELEMENTS:
+                rect_idx.append(i)
+        
+        # Render all visual operations, one batch per primitive
+        contents, xs, ys, colors = self._op_content, self._op_x, self._op_y, self._op_color
+        palette = _PALETTE
+        self._render_texts([
+            (contents[i] if contents[i].__class__ is str else _format_content(contents[i]),
+             xs[i], ys[i], palette[colors[i]])
+            for i in text_idx
+        ])
+        
+        rects = []
+        for i in rect_idx:
+            width, height = self._rect_size(i)
+            rects.append((xs[i], ys[i], width, height, palette[colors[i]]))
+        self._render_rects(rects)
         
         # Update display
-        self.backend.update()
+        if self.animation_mode:
+            self._deferred_flush = True
+        else:
+            self.backend.update()
+    
+    def _render_texts(self, items: List[tuple]):
+        """Send (text, x, y, color) items to the backend in one call if supported."""
+        if not items:
+            return
+        render_texts = getattr(self.backend, 'render_texts', None)
+        if render_texts is not None:
+            render_texts(items)
+        else:
+            for text, x, y, color in items:
+                self.backend.render_text(text, x, y, color=color)
+    
+    def _render_rects(self, items: List[tuple]):
+        """Send (x, y, width, height, color) items to the backend in one call if supported."""
+        if not items:
+            return
+        render_rects = getattr(self.backend, 'render_rects', None)
+        if render_rects is not None:
+            render_rects(items)
+        else:
+            for x, y, width, height, color in items:
+                self.backend.render_rect(x, y, width, height, color=color)
+    
+    def _rect_size(self, index: int) -> tuple:
+        """Width/height of a rect operation from its metadata."""
+        meta = self._op_meta[index] or {}
+        if self._op_type[index] == 'loop_tick':
+            tick_size = meta.get('tick_size', 10)
+            return tick_size, tick_size
+        return meta.get('bar_width', 0), meta.get('bar_height', 15)
     
     def _render_error(self, error_message: str):
         """Render error message to display."""
+        self._last_render_fingerprint = None
         self.backend.clear()
         self.backend.render_text(
             "❌ EXECUTION ERROR:",
@@ -624,18 +1253,24 @@ class VisualPythonEngine:
         )
         self.backend.update()
     
+    @property
+    def total_execution_time(self) -> float:
+        """Total successful execution time in milliseconds."""
+        return self._total_execution_ns / 1e6
+    
     def get_statistics(self) -> Dict[str, Any]:
         """Get execution statistics."""
         avg_time = (self.total_execution_time / self.execution_count) if self.execution_count > 0 else 0
+        variables = self.variables
         
         return {
             'execution_count': self.execution_count,
             'total_execution_time_ms': self.total_execution_time,
             'average_execution_time_ms': avg_time,
-            'variable_count': len(self.variables),
-            'operation_count': len(self.operations),
-            'signal_count': len(self.signals),
-            'current_variables': dict(self.variables),
+            'variable_count': len(variables),
+            'operation_count': len(self._op_type),
+            'signal_count': len(self._signals),
+            'current_variables': variables,
             'backend': self.backend_name,
             'display_size': (self.width, self.height)
         }
@@ -643,9 +1278,34 @@ class VisualPythonEngine:
     def export_signals(self, filename: str = "signals.csv") -> bool:
         """Export signals to CSV for hardware integration."""
         from .signals import export_signals
-        return export_signals(self.signals, filename)
+        return export_signals(self._signals, filename)
     
     def cleanup(self):
         """Clean up resources."""
+        _live_engines.discard(self)
         if self.backend:
-            self.backend.cleanup()
\ No newline at end of file
+            self.backend.cleanup()
+
+
+# AST node type -> engine handler, used by _decorate_tree and as the
+# fallback dispatch for undecorated nodes
+_STMT_HANDLERS = {
+    ast.Assign: VisualPythonEngine._process_assignment,
+    ast.Expr: VisualPythonEngine._process_expr_statement,
+    ast.For: VisualPythonEngine._process_for_loop,
+    ast.If: VisualPythonEngine._process_if_statement,
+    ast.While: VisualPythonEngine._process_while_loop,
+}
+
+_EXPR_HANDLERS = {
+    ast.Constant: VisualPythonEngine._eval_constant,
+    ast.Name: VisualPythonEngine._eval_name,
+    ast.BinOp: VisualPythonEngine._eval_binop,
+    ast.UnaryOp: VisualPythonEngine._eval_unaryop,
+    ast.Compare: VisualPythonEngine._eval_compare,
+    ast.BoolOp: VisualPythonEngine._eval_boolop,
+    ast.List: VisualPythonEngine._eval_list,
+    ast.Tuple: VisualPythonEngine._eval_tuple,
+    ast.JoinedStr: VisualPythonEngine._eval_joinedstr,
+    ast.Call: VisualPythonEngine._eval_call,
+}
\ No newline at end of file
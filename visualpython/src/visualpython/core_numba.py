@@ -0,0 +1,373 @@
+"""
+Optional Numba acceleration for VisualPython range loops.
+
+Loops whose body is nothing but numeric assignments are translated to a
+plain Python function, compiled with ``numba.njit`` and run in one call.
+The engine then replays the recorded per-iteration values as visual
+elements, so output is identical to the interpreted path.
+
+Everything here is optional: without Numba installed ``plan_loop`` is
+never consulted and the engine interprets loops as before. Numba is only
+imported when the first loop is compiled, so code without eligible loops
+never pays for importing it.
+
+Generated loop sources are written to a content-addressed module under
+``VP_JIT_CACHE_DIR`` (default ``~/.cache/visualpython/loops``) and compiled
+with ``cache=True``, so Numba's machine code survives process restarts.
+"""
+
+import ast
+import hashlib
+import os
+import time
+from importlib.util import find_spec, module_from_spec, spec_from_file_location
+from typing import Dict, Any, List, Optional, Tuple
+
+# Optional numba support for loop compilation; probed here, imported lazily
+NUMBA_AVAILABLE = find_spec('numba') is not None and find_spec('numpy') is not None
+numba = None
+np = None
+
+
+def _load_numba() -> bool:
+    """Import numba and numpy on first use; False if that fails."""
+    global numba, np, NUMBA_AVAILABLE
+    if numba is None:
+        try:
+            import numba as numba_module
+            import numpy as numpy_module
+        except ImportError:
+            NUMBA_AVAILABLE = False
+            return False
+        numba, np = numba_module, numpy_module
+    return True
+
+# Loops shorter than this are cheaper to interpret than to compile
+JIT_MIN_ITERATIONS = 64
+
+# Integers are computed as float64; beyond this they are no longer exact
+_INT_LIMIT = 2.0 ** 53
+
+# Compiled loops shared across trees, keyed by (ast.dump(loop), input kinds),
+# so re-parsing unchanged source on a live reload never recompiles
+_LOOP_CACHE: Dict[Tuple[str, tuple], Optional['CompiledLoop']] = {}
+_LOOP_CACHE_SIZE = 128
+
+_ARITH = {
+    ast.Add: '+',
+    ast.Sub: '-',
+    ast.Mult: '*',
+    ast.Div: '/',
+    ast.FloorDiv: '//',
+    ast.Mod: '%',
+}
+_DIVIDING = (ast.Div, ast.FloorDiv, ast.Mod)
+_UNARY = {
+    ast.UAdd: '+',
+    ast.USub: '-',
+}
+
+
+def _is_pure(expr: ast.expr) -> bool:
+    """True if expr only uses numeric constants, names and arithmetic."""
+    if isinstance(expr, ast.Constant):
+        return type(expr.value) in (int, float)
+    if isinstance(expr, ast.Name):
+        return True
+    if isinstance(expr, ast.BinOp):
+        return type(expr.op) in _ARITH and _is_pure(expr.left) and _is_pure(expr.right)
+    if isinstance(expr, ast.UnaryOp):
+        return type(expr.op) in _UNARY and _is_pure(expr.operand)
+    return False
+
+
+def plan_loop(node: ast.For) -> Optional[List[Tuple[str, ast.expr]]]:
+    """
+    Return the body as [(target, value_expr)] if it can be compiled.
+
+    Only single-name assignments of pure arithmetic are accepted, and the
+    loop variable itself must not be reassigned.
+    """
+    if not isinstance(node.target, ast.Name) or not node.body or node.orelse:
+        return None
+
+    loop_var = node.target.id
+    plan = []
+    for statement in node.body:
+        if not (isinstance(statement, ast.Assign) and len(statement.targets) == 1
+                and isinstance(statement.targets[0], ast.Name)):
+            return None
+        target = statement.targets[0].id
+        if target == loop_var or not _is_pure(statement.value):
+            return None
+        plan.append((target, statement.value))
+    return plan
+
+
+def _plan_names(plan: List[Tuple[str, ast.expr]], loop_var: str) -> List[str]:
+    """Variables read or written by the plan, in first-seen order."""
+    names = []
+    for target, expr in plan:
+        for sub in ast.walk(expr):
+            if isinstance(sub, ast.Name) and sub.id != loop_var and sub.id not in names:
+                names.append(sub.id)
+        if target not in names:
+            names.append(target)
+    return names
+
+
+def _kind(expr: ast.expr, kinds: Dict[str, str]) -> str:
+    """Python result type of expr: 'i' for int, 'f' for float."""
+    if isinstance(expr, ast.Constant):
+        return 'f' if type(expr.value) is float else 'i'
+    if isinstance(expr, ast.Name):
+        return kinds[expr.id]
+    if isinstance(expr, ast.UnaryOp):
+        return _kind(expr.operand, kinds)
+    if isinstance(expr.op, ast.Div):
+        return 'f'
+    left = _kind(expr.left, kinds)
+    right = _kind(expr.right, kinds)
+    return 'f' if 'f' in (left, right) else 'i'
+
+
+def _infer_kinds(plan, kinds: Dict[str, str]) -> Optional[List[str]]:
+    """
+    Result kind of each assignment, or None if kinds drift between
+    iterations (the first pass would then format values differently).
+    """
+    state = dict(kinds)
+    assign_kinds = []
+    for target, expr in plan:
+        kind = _kind(expr, state)
+        state[target] = kind
+        assign_kinds.append(kind)
+    if state != kinds:
+        return None
+    return assign_kinds
+
+
+class _LoopCodegen:
+    """Translate a loop plan into the source of a flat Python function."""
+
+    def __init__(self, kinds: Dict[str, str]):
+        self.kinds = kinds
+        self.lines: List[str] = []
+        self._temp_count = 0
+
+    def _temp(self) -> str:
+        self._temp_count += 1
+        return f"t{self._temp_count}"
+
+    def expr(self, node: ast.expr) -> Tuple[str, str]:
+        """Return (source, kind), emitting guard statements as needed."""
+        if isinstance(node, ast.Constant):
+            return repr(float(node.value)), _kind(node, self.kinds)
+        if isinstance(node, ast.Name):
+            return f"v_{node.id}", self.kinds[node.id]
+        if isinstance(node, ast.UnaryOp):
+            source, kind = self.expr(node.operand)
+            return f"({_UNARY[type(node.op)]}{source})", kind
+
+        left, left_kind = self.expr(node.left)
+        right, right_kind = self.expr(node.right)
+        kind = 'f' if isinstance(node.op, ast.Div) or 'f' in (left_kind, right_kind) else 'i'
+
+        if isinstance(node.op, _DIVIDING):
+            # The interpreter maps x/0 to int 0; hand that case back to it
+            divisor = self._temp()
+            self.lines.append(f"{divisor} = {right}")
+            self.lines.append(f"if {divisor} == 0.0:")
+            self.lines.append("    return hist, True")
+            right = divisor
+        source = f"({left} {_ARITH[type(node.op)]} {right})"
+
+        if kind == 'i':
+            # Bail out before float64 stops representing the int exactly
+            result = self._temp()
+            self.lines.append(f"{result} = {source}")
+            self.lines.append(f"if abs({result}) > {_INT_LIMIT!r}:")
+            self.lines.append("    return hist, True")
+            source = result
+        return source, kind
+
+
+def _loop_source(plan, loop_var: str, names: List[str], kinds: Dict[str, str]) -> str:
+    params = ", ".join(["start", "stop", "step", "n"] + [f"v_{name}" for name in names])
+    codegen = _LoopCodegen(kinds)
+
+    body = [f"v_{loop_var} = float(i)"]
+    for target, expr in plan:
+        codegen.lines = []
+        source, _ = codegen.expr(expr)
+        body.extend(codegen.lines)
+        body.append(f"v_{target} = {source}")
+        body.append(f"hist[k] = v_{target}")
+        body.append("k += 1")
+
+    lines = [
+        f"def _vp_loop({params}):",
+        f"    hist = np.empty(n * {len(plan)}, dtype=np.float64)",
+        "    k = 0",
+        "    for i in range(start, stop, step):",
+    ]
+    lines.extend("        " + line for line in body)
+    lines.append("    return hist, False")
+    return "\n".join(lines) + "\n"
+
+
+def _jit_cache_dir() -> Optional[str]:
+    """Directory for persisted loop modules, or None if it cannot be created."""
+    directory = os.environ.get('VP_JIT_CACHE_DIR') or os.path.join(
+        os.path.expanduser('~'), '.cache', 'visualpython', 'loops')
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError:
+        return None
+    return directory
+
+
+def _read_cached_source(path: str) -> Optional[str]:
+    """Content of a cached loop module, or None when it is missing or unreadable."""
+    try:
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _load_loop_function(source: str) -> Tuple[Any, bool]:
+    """
+    Return (plain _vp_loop function, loaded from a file).
+
+    Numba can only cache functions defined in a real source file, so the
+    source is written once to a module named after its digest and imported
+    from there. An existing file whose content differs (truncated, edited,
+    or a digest collision) is rewritten. Falls back to exec() when the cache
+    directory is unusable.
+    """
+    directory = _jit_cache_dir()
+    if directory is not None:
+        name = "vp_loop_" + hashlib.blake2b(source.encode(), digest_size=16).hexdigest()
+        path = os.path.join(directory, name + ".py")
+        module_source = "import numpy as np\n\n\n" + source
+        try:
+            if _read_cached_source(path) != module_source:
+                temp_path = f"{path}.{os.getpid()}.tmp"
+                with open(temp_path, 'w', encoding='utf-8', newline='') as f:
+                    f.write(module_source)
+                os.replace(temp_path, path)
+            spec = spec_from_file_location(name, path)
+            module = module_from_spec(spec)
+            spec.loader.exec_module(module)
+            return module._vp_loop, True
+        except (OSError, SyntaxError):
+            pass
+
+    namespace = {'np': np}
+    exec(compile(source, '<visualpython-loop>', 'exec'), namespace)
+    return namespace['_vp_loop'], False
+
+
+class CompiledLoop:
+    """A compiled pure-numeric loop body for one set of variable types."""
+
+    def __init__(self, plan, loop_var: str, names: List[str],
+                 kinds: Dict[str, str], assign_kinds: List[str]):
+        self.targets = [target for target, _ in plan]
+        self.names = names
+        self.assign_kinds = assign_kinds
+        self.source = _loop_source(plan, loop_var, names, kinds)
+
+        func, from_file = _load_loop_function(self.source)
+        self._func = numba.njit(cache=from_file)(func)
+
+        # Warm up with an empty range so compilation happens here,
+        # not inside the first measured run
+        self._func(0, 0, 1, 0, *([0.0] * len(names)))
+
+    def run(self, start: int, stop: int, step: int, n: int,
+            variables: Dict[str, Any]) -> Optional[List[Any]]:
+        """
+        Run the loop and return every assigned value in execution order,
+        or None if the interpreter must handle this run instead.
+        """
+        args = [float(variables.get(name, 0)) for name in self.names]
+        hist, bailed = self._func(start, stop, step, n, *args)
+        if bailed:
+            return None
+
+        values = hist.tolist()
+        width = len(self.targets)
+        for column, kind in enumerate(self.assign_kinds):
+            if kind == 'i':
+                values[column::width] = [int(v) for v in values[column::width]]
+        return values
+
+
+def get_compiled_loop(node: ast.For, variables: Dict[str, Any],
+                      loop_range: Optional[range] = None) -> Tuple[Optional[CompiledLoop], int]:
+    """
+    Return (compiled loop, nanoseconds spent compiling) for a planned loop node.
+
+    Compiled loops are cached per combination of input types, both on the
+    node and process-wide by the loop's ast.dump(), so a fresh parse of
+    the same loop reuses the kernel compiled for an earlier one. The loop
+    is None when the current variables are not all int/float, when value
+    types would change between iterations, when an int input or a bound of
+    loop_range is too large to be exact as float64, or when Numba cannot
+    compile the body.
+    """
+    # The kernel computes in float64: larger ints would silently lose precision
+    if loop_range is not None and max(abs(loop_range.start), abs(loop_range.stop)) >= _INT_LIMIT:
+        return None, 0
+
+    plan = node._vp_jit_plan
+    loop_var = node.target.id
+    names = getattr(node, '_vp_jit_names', None)
+    if names is None:
+        names = node._vp_jit_names = _plan_names(plan, loop_var)
+
+    kinds = {loop_var: 'i'}
+    for name in names:
+        value = variables.get(name, 0)
+        if type(value) is int:
+            if abs(value) >= _INT_LIMIT:
+                return None, 0
+            kinds[name] = 'i'
+        elif type(value) is float:
+            kinds[name] = 'f'
+        else:
+            return None, 0
+
+    cache = getattr(node, '_vp_jit_cache', None)
+    if cache is None:
+        cache = node._vp_jit_cache = {}
+    key = tuple(kinds[name] for name in names)
+    if key in cache:
+        return cache[key], 0
+
+    dump = getattr(node, '_vp_jit_dump', None)
+    if dump is None:
+        dump = node._vp_jit_dump = ast.dump(node)
+    shared_key = (dump, key)
+    if shared_key in _LOOP_CACHE:
+        loop = cache[key] = _LOOP_CACHE[shared_key]
+        return loop, 0
+
+    compile_start = time.perf_counter_ns()
+    if not _load_numba():
+        return None, 0
+    assign_kinds = _infer_kinds(plan, kinds)
+    loop = None
+    if assign_kinds is not None:
+        try:
+            loop = CompiledLoop(plan, loop_var, names, kinds, assign_kinds)
+        except Exception:
+            # Numba rejected the body (or its warm-up run failed): interpret it
+            loop = None
+    cache[key] = loop
+    if len(_LOOP_CACHE) >= _LOOP_CACHE_SIZE:
+        _LOOP_CACHE.pop(next(iter(_LOOP_CACHE)))
+    _LOOP_CACHE[shared_key] = loop
+    return loop, time.perf_counter_ns() - compile_start
@@ -6,19 +6,43 @@ This backend provides:
 - Frame-based CSV recording and playback
 - PNG/PPM frame export for inspection
 - Perfect for CI/CD, testing, and AI training workflows
+
+Frames are PNG when Pillow is installed. Set VP_FRAME_FORMAT=ppm to
+always write uncompressed PPM instead, which skips zlib work when only
+frame counts or raw pixels matter (e.g. in tests).
+
+With encode_workers > 0 a SimRenderer hands each committed frame's raw
+pixels to a process pool, so encoding runs on other cores while the
+next frame is drawn.
 """
 
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from importlib.util import find_spec
+from itertools import chain
+import multiprocessing
+import os
 import time
 import csv
 from pathlib import Path
 
-try:
-    from PIL import Image
-    PILLOW_AVAILABLE = True
-except ImportError:
-    PILLOW_AVAILABLE = False
+# Optional PIL support for PNG frames; _encode_frame imports it on first use
+PILLOW_AVAILABLE = find_spec('PIL') is not None
+
+
+def _encode_frame(out_stem: str, width: int, height: int, rgb: bytes, png: bool) -> Path:
+    """Write raw RGB pixels as out_stem.png (Pillow) or out_stem.ppm; runs in pool workers."""
+    if png:
+        from PIL import Image
+        out_path = Path(out_stem + ".png")
+        Image.frombytes("RGB", (width, height), rgb).save(out_path)
+        return out_path
+    out_path = Path(out_stem + ".ppm")
+    with open(out_path, "wb") as f:
+        f.write(f"P6 {width} {height} 255\n".encode("ascii"))
+        f.write(rgb)
+    return out_path
 
 
 @dataclass
@@ -33,20 +57,36 @@ class SimRenderer:
     """
     Headless renderer that records pixels and saves frames as PNG/PPM.
     Perfect for CI/CD, CSV playback, and testing without GUI dependencies.
+    
+    encode_workers > 0 encodes frames on a process pool of that size;
+    flush_frames() (also run by reset and close) waits for them to land.
+    
+    frames_per_dir > 0 spreads frames over numbered subdirectories of
+    out_dir (000/, 001/, ...) holding that many frames each, so long
+    runs never put every frame into one huge directory.
     """
     
     def __init__(self, width=800, height=600, scale=1, title="SimRenderer",
                  out_dir="vp_sim_frames", file_prefix="vp_sim_", start_index=0,
-                 bg="#001100"):
+                 bg="#001100", encode_workers=0, frames_per_dir=0):
         self.w, self.h, self.scale = width, height, scale
         self.out_dir = Path(out_dir)
         self.out_dir.mkdir(parents=True, exist_ok=True)
         self.file_prefix = file_prefix
+        self.start_index = start_index
         self.index = start_index
         self.bg = bg
         self._space_pressed = False
         self._batch: List[Dict[str, Any]] = []
         
+        # Frame encoding pool, started on the first commit that needs it
+        self.encode_workers = encode_workers
+        self._encoder: Optional[ProcessPoolExecutor] = None
+        self._pending = []
+        
+        self.frames_per_dir = frames_per_dir
+        self._made_dirs = set()  # shard directories known to exist
+        
         # Track rendering events for testing
         self.events: List[MockEvent] = []
         self.console_output: List[str] = []
@@ -54,6 +94,31 @@ class SimRenderer:
         # Initialize frame buffer
         self._new_frame()
     
+    def reset(self, out_dir=None, bg=None):
+        """
+        Return to the freshly-constructed state so the renderer can be
+        reused: frame index back at start_index, empty event log, and a
+        cleared frame buffer (rows are refilled in place rather than
+        reallocated).
+        """
+        self.flush_frames()
+        if out_dir is not None:
+            self.out_dir = Path(out_dir)
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            self._made_dirs.clear()
+        if bg is not None:
+            self.bg = bg
+        self.index = self.start_index
+        self._space_pressed = False
+        self._batch.clear()
+        self.events.clear()
+        self.console_output.clear()
+        
+        color = self._hex_to_rgb(self.bg)
+        for row in self.buf:
+            row[:] = [color] * self.w
+        self._dirty = False
+    
     def _new_frame(self):
         """Initialize a new frame buffer."""
         self.buf = [[self._hex_to_rgb(self.bg) for _ in range(self.w)] for _ in range(self.h)]
@@ -194,29 +259,61 @@ class SimRenderer:
         self._new_frame()  # Start fresh for next frame
     
     def _save_frame(self):
-        """Save current frame buffer as PNG or PPM."""
-        filename = f"{self.file_prefix}{self.index:04d}"
+        """Save current frame buffer as PNG or PPM, inline or on the encode pool."""
+        out_stem = str(self._frame_dir() / f"{self.file_prefix}{self.index:04d}")
         
-        if PILLOW_AVAILABLE:
-            # Save as PNG using Pillow
-            from PIL import Image
-            im = Image.new("RGB", (self.w, self.h))
-            flat = [px for row in self.buf for px in row]
-            im.putdata(flat)
-            out_path = self.out_dir / f"{filename}.png"
-            im.save(out_path)
-            return out_path
-        else:
-            # Save as PPM (widely readable)
-            out_path = self.out_dir / f"{filename}.ppm"
-            with open(out_path, "wb") as f:
-                f.write(f"P6 {self.w} {self.h} 255\n".encode("ascii"))
-                for row in self.buf:
-                    f.write(bytes([c for (r, g, b) in row for c in (r, g, b)]))
-            return out_path
+        # Read per frame so pooled/reset renderers follow the current setting
+        frame_format = os.environ.get("VP_FRAME_FORMAT", "png").lower()
+        png = PILLOW_AVAILABLE and frame_format != "ppm"
+        rgb = bytes(chain.from_iterable(chain.from_iterable(self.buf)))
+        args = (out_stem, self.w, self.h, rgb, png)
+        
+        if self.encode_workers <= 0:
+            return _encode_frame(*args)
+        if self._encoder is None:
+            # Spawned, not forked: csv_play may already be running a reader
+            # thread, and forking a threaded process can copy held locks
+            self._encoder = ProcessPoolExecutor(
+                max_workers=self.encode_workers,
+                mp_context=multiprocessing.get_context("spawn"))
+        # Surface errors from finished frames, and wait for the oldest once
+        # two frames per worker are queued so raw frames cannot pile up
+        in_flight = []
+        for future in self._pending:
+            if future.done():
+                future.result()
+            else:
+                in_flight.append(future)
+        if len(in_flight) >= 2 * self.encode_workers:
+            in_flight.pop(0).result()
+        in_flight.append(self._encoder.submit(_encode_frame, *args))
+        self._pending = in_flight
+        return Path(out_stem + (".png" if png else ".ppm"))
+    
+    def _frame_dir(self) -> Path:
+        """Directory for the current frame, creating its shard on first use."""
+        if self.frames_per_dir <= 0:
+            return self.out_dir
+        shard = self.out_dir / f"{self.index // self.frames_per_dir:03d}"
+        if shard not in self._made_dirs:
+            shard.mkdir(exist_ok=True)
+            self._made_dirs.add(shard)
+        return shard
+    
+    def flush_frames(self):
+        """Wait until every committed frame is on disk; re-raises encode errors."""
+        pending, self._pending = self._pending, []
+        for future in pending:
+            future.result()
     
     def close(self):
         """Clean up simulator backend."""
+        try:
+            self.flush_frames()
+        finally:
+            if self._encoder is not None:
+                self._encoder.shutdown()
+                self._encoder = None
         self.console_output.append("🔴 CLOSE: SimRenderer closed")
         self.events.clear()
 
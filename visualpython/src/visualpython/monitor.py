@@ -9,34 +9,167 @@ import os
 import time
 import threading
 import hashlib
+import logging
+import mmap
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Callable, Optional, Dict, Any, List
-from dataclasses import dataclass
+from typing import Callable, Optional, Dict, Any, List, Tuple
 
 # Try to import watchdog for better performance
 try:
     from watchdog.observers import Observer
+    from watchdog.observers.polling import PollingObserver
     from watchdog.events import FileSystemEventHandler
     WATCHDOG_AVAILABLE = True
 except ImportError:
     WATCHDOG_AVAILABLE = False
     Observer = None
+    PollingObserver = None
     FileSystemEventHandler = None
 
+# Optional xxhash: XXH3 hashes several times faster than blake2b
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    xxhash = None
+    XXHASH_AVAILABLE = False
+
+# Per-event messages go through logging so they cost nothing unless enabled
+logger = logging.getLogger(__name__)
+
+# Poll interval used when WatchdogFileMonitor has to fall back to polling
+POLLING_FALLBACK_INTERVAL = 1.0
+
+# Directories with more entries than this are polled instead of watched natively
+POLLING_DIR_MIN_ENTRIES = 1000
+
+# Polling scans this many directories or more on a small thread pool
+PARALLEL_SCAN_MIN_DIRS = 8
+_SCAN_WORKERS = 8
+
+# Changed files are hashed on the same pool once a poll finds this many
+PARALLEL_HASH_MIN_FILES = 4
+
+
+def _new_hasher():
+    """
+    Incremental content hasher for change detection.
+
+    Collision resistance is not needed to spot an edited file, so XXH3 is
+    used when xxhash is installed; blake2b is the fallback since it is
+    faster than md5 or sha256 in software.
+    """
+    if xxhash is not None:
+        return xxhash.xxh3_64()
+    return hashlib.blake2b(digest_size=8)
+
+
+def _hash_bytes(data) -> bytes:
+    """Digest of an in-memory buffer, matching _hash_file for the same bytes."""
+    hasher = _new_hasher()
+    hasher.update(data)
+    return hasher.digest()
+
+
+# Read size for streaming hashes; keeps memory flat for large files
+_HASH_CHUNK = 65536
+
+# Files at least this large are hashed through mmap; below it read() is cheaper
+MMAP_MIN_BYTES = 131072
+
+# LiveCodeSession keeps engine snapshots for this many recent file versions
+RESULT_CACHE_SIZE = 32
+
+
+def _hash_file(path: str) -> bytes:
+    """Hash a file incrementally without holding its contents in memory."""
+    hasher = _new_hasher()
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size >= MMAP_MIN_BYTES:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                advice = getattr(mmap, 'MADV_SEQUENTIAL', None)
+                if advice is not None:
+                    mm.madvise(advice)
+                hasher.update(mm)
+            return hasher.digest()
+
+        chunk = f.read(_HASH_CHUNK)
+        while chunk:
+            hasher.update(chunk)
+            chunk = f.read(_HASH_CHUNK)
+    return hasher.digest()
+
+
+def _stat_and_hash(path: str) -> Optional[Tuple[os.stat_result, bytes]]:
+    """
+    Stat a file, then hash it; None if either fails.
+
+    The stat is taken first so a write landing during the hash leaves a
+    newer (mtime_ns, size) on disk and is picked up by the next poll.
+    """
+    try:
+        stat_result = os.stat(path)
+        return stat_result, _hash_file(path)
+    except OSError:
+        return None
+
+
+def _enable_verbose_logging():
+    """Show per-event INFO messages on stderr (installed once per process)."""
+    if not any(getattr(h, '_visualpython', False) for h in logger.handlers):
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        handler._visualpython = True
+        logger.addHandler(handler)
+    if logger.getEffectiveLevel() > logging.INFO:
+        logger.setLevel(logging.INFO)
+
+
+def _decode_source(raw: bytes) -> str:
+    """Decode file bytes once, at the point a change is handed to the engine."""
+    return raw.decode('utf-8', errors='replace')
+
+
+def _has_many_entries(directory: str, limit: int) -> bool:
+    """True if directory holds more than limit entries; stops counting early."""
+    try:
+        with os.scandir(directory) as entries:
+            for count, _ in enumerate(entries, 1):
+                if count > limit:
+                    return True
+    except OSError:
+        pass
+    return False
+
 
-@dataclass
 class FileChangeEvent:
     """Represents a file change event."""
-    filepath: str
-    event_type: str  # 'modified', 'created', 'deleted', 'moved'
-    timestamp: float
-    old_content: Optional[str] = None
-    new_content: Optional[str] = None
-    content_hash: Optional[str] = None
-
-    def __post_init__(self):
-        if self.timestamp == 0:
-            self.timestamp = time.time()
+    
+    __slots__ = ('filepath', 'event_type', 'timestamp', 'old_content',
+                 'new_content', 'content_hash')
+    
+    def __init__(self, filepath: str, event_type: str, timestamp: float = 0,
+                 old_content: Optional[str] = None, new_content: Optional[str] = None,
+                 content_hash: Optional[bytes] = None):
+        self.filepath = filepath
+        self.event_type = event_type  # 'modified', 'created', 'deleted', 'moved'
+        self.timestamp = timestamp or time.time()
+        self.old_content = old_content
+        self.new_content = new_content
+        self.content_hash = content_hash
+    
+    def __eq__(self, other):
+        if other.__class__ is not FileChangeEvent:
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"FileChangeEvent({fields})"
 
 
 class FileMonitor:
@@ -46,52 +179,73 @@ class FileMonitor:
     This is the core component that enables the revolutionary "save-to-see" workflow.
     """
     
-    def __init__(self, callback: Callable[[FileChangeEvent], None]):
+    def __init__(self, callback: Callable[[FileChangeEvent], None], verbose: bool = False,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
         self.callback = callback
+        self.verbose = verbose  # Log every change and its response time
+        # Debounce deadlines and poll pacing; tests inject simulated time
+        self._clock = clock
+        self._sleep = sleep
+        if verbose:
+            _enable_verbose_logging()
         self.monitored_files: Dict[str, Dict[str, Any]] = {}
         self.is_monitoring = False
         self.monitor_thread: Optional[threading.Thread] = None
         self.check_interval = 0.1  # Check every 100ms
         self.debounce_time = 0.2   # Wait 200ms after last change
         
-        # Statistics
+        # Statistics: running counters only, derived figures come from get_statistics()
         self.stats = {
-            'files_monitored': 0,
             'changes_detected': 0,
             'callback_executions': 0,
-            'average_response_time': 0,
             'total_response_time': 0
         }
         
+        # Immutable copy of the monitored paths, rebuilt only when files are
+        # added or removed; the polling thread reads it without copying
+        self._files_snapshot: Tuple[str, ...] = ()
+        self._scan_source: Optional[Tuple[str, ...]] = None
+        # Directory -> {file name: file info}, mirroring monitored_files for the scan
+        self._files_by_dir: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._scan_pool: Optional[ThreadPoolExecutor] = None
+        
         # Debouncing
-        self.pending_changes: Dict[str, float] = {}
-        self.debounce_thread: Optional[threading.Thread] = None
-        self.debounce_running = False
+        self._debounce_timers: Dict[str, threading.Timer] = {}
+        self._debounce_deadlines: Dict[str, float] = {}
+        self._debounce_lock = threading.Lock()
+        
+        # Callbacks run on one worker thread so a slow execution never blocks
+        # detection; at most one event per file waits, always the newest
+        self._callback_executor: Optional[ThreadPoolExecutor] = None
+        self._queued_events: Dict[str, FileChangeEvent] = {}
+        self._callback_lock = threading.Lock()
 
     def add_file(self, filepath: str) -> bool:
         """Add a file to the monitoring list."""
         try:
             filepath = os.path.abspath(filepath)
-            if not os.path.exists(filepath):
+            # One stat both checks existence and seeds the change key
+            try:
+                stat_result = os.stat(filepath)
+            except FileNotFoundError:
                 print(f"Warning: File {filepath} does not exist")
                 return False
             
-            stat_result = os.stat(filepath)
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-            content_hash = hashlib.md5(content.encode()).hexdigest()
+            content_hash = _hash_file(filepath)
             
             self.monitored_files[filepath] = {
-                'mtime': stat_result.st_mtime,
+                'mtime_ns': stat_result.st_mtime_ns,
                 'size': stat_result.st_size,
+                'stat_key': (stat_result.st_mtime_ns, stat_result.st_size),
                 'content_hash': content_hash,
-                'last_content': content,
                 'change_count': 0,
-                'last_change_time': time.time()
+                'last_change_time': time.time(),
+                'basename': os.path.basename(filepath)
             }
             
-            self.stats['files_monitored'] = len(self.monitored_files)
-            print(f"✅ Added {os.path.basename(filepath)} to monitoring")
+            self._files_snapshot = tuple(self.monitored_files)
+            print(f"✅ Added {self.monitored_files[filepath]['basename']} to monitoring")
             return True
             
         except Exception as e:
@@ -103,7 +257,7 @@ class FileMonitor:
         filepath = os.path.abspath(filepath)
         if filepath in self.monitored_files:
             del self.monitored_files[filepath]
-            self.stats['files_monitored'] = len(self.monitored_files)
+            self._files_snapshot = tuple(self.monitored_files)
             return True
         return False
 
@@ -116,22 +270,19 @@ class FileMonitor:
         self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
         self.monitor_thread.start()
         
-        # Start debounce handler
-        self.debounce_running = True
-        self.debounce_thread = threading.Thread(target=self._debounce_loop, daemon=True)
-        self.debounce_thread.start()
-        
         print(f"🔄 Started monitoring {len(self.monitored_files)} files")
 
     def stop_monitoring(self):
         """Stop monitoring files."""
         self.is_monitoring = False
-        self.debounce_running = False
         
         if self.monitor_thread and self.monitor_thread.is_alive():
             self.monitor_thread.join(timeout=1.0)
-        if self.debounce_thread and self.debounce_thread.is_alive():
-            self.debounce_thread.join(timeout=1.0)
+        if self._scan_pool is not None:
+            self._scan_pool.shutdown(wait=False)
+            self._scan_pool = None
+        self._cancel_debounce_timers()
+        self._drain_callbacks()
             
         print("⏹️  Stopped file monitoring")
 
@@ -139,143 +290,282 @@ class FileMonitor:
         """Main monitoring loop."""
         while self.is_monitoring:
             try:
-                for filepath in list(self.monitored_files.keys()):
-                    self._check_file_for_changes(filepath)
-                time.sleep(self.check_interval)
+                self._poll_once()
+                self._sleep(self.check_interval)
             except Exception as e:
-                print(f"❌ Error in monitor loop: {e}")
-                time.sleep(1)
+                logger.error("❌ Error in monitor loop: %s", e)
+                self._sleep(1)
+
+    def _poll_once(self):
+        """Scan for changed files and check each one."""
+        changed = self._scan_for_changes()
+        prefetched: Dict[str, Tuple[os.stat_result, bytes]] = {}
+        if len(changed) >= PARALLEL_HASH_MIN_FILES:
+            # hashlib releases the GIL on large buffers, so a save-all that
+            # touches many files hashes them side by side
+            results = self._get_scan_pool().map(_stat_and_hash, changed)
+            prefetched = {filepath: result for filepath, result in zip(changed, results)
+                          if result is not None}
+        for filepath in changed:
+            self._check_file_for_changes(filepath, prefetched.get(filepath))
+
+    def _get_scan_pool(self) -> ThreadPoolExecutor:
+        """Thread pool shared by directory scans and batch hashing."""
+        if self._scan_pool is None:
+            self._scan_pool = ThreadPoolExecutor(
+                max_workers=_SCAN_WORKERS, thread_name_prefix='visualpython-scan')
+        return self._scan_pool
+
+    def _scan_for_changes(self) -> List[str]:
+        """
+        Return monitored files whose (mtime_ns, size) differs from the last check.
+
+        Each parent directory is listed once with os.scandir and entries are
+        matched by name against that directory's bucket, so N files in K
+        directories cost K listings. DirEntry.stat() caches its result on the
+        entry (and on Windows comes straight from the listing). Files missing
+        from their directory are returned too so the deletion is picked up.
+        """
+        snapshot = self._files_snapshot
+        if snapshot is not self._scan_source:
+            # Rebuild the mirror only after files were added or removed
+            files_by_dir: Dict[str, Dict[str, Dict[str, Any]]] = {}
+            monitored = self.monitored_files
+            for filepath in snapshot:
+                file_info = monitored.get(filepath)
+                if file_info is not None:
+                    directory, name = os.path.split(filepath)
+                    files_by_dir.setdefault(directory, {})[name] = file_info
+            self._files_by_dir = files_by_dir
+            self._scan_source = snapshot
+
+        files_by_dir = self._files_by_dir
+        if len(files_by_dir) < PARALLEL_SCAN_MIN_DIRS:
+            changed = []
+            for directory, bucket in files_by_dir.items():
+                changed.extend(self._scan_directory(directory, bucket))
+            return changed
+
+        # os.scandir and stat release the GIL, so many directories can be
+        # listed concurrently and the poll is bounded by the kernel, not Python
+        results = self._get_scan_pool().map(self._scan_directory,
+                                      files_by_dir.keys(), files_by_dir.values())
+        return [filepath for result in results for filepath in result]
+
+    @staticmethod
+    def _scan_directory(directory: str, bucket: Dict[str, Dict[str, Any]]) -> List[str]:
+        """List one directory and return its changed or missing monitored files."""
+        changed = []
+        remaining = len(bucket)
+        seen = set()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    file_info = bucket.get(entry.name)
+                    if file_info is None:
+                        continue
+                    seen.add(entry.name)
+                    stat_result = entry.stat()
+                    if (stat_result.st_mtime_ns, stat_result.st_size) != file_info['stat_key']:
+                        changed.append(entry.path)
+                    remaining -= 1
+                    if not remaining:
+                        break
+        except OSError:
+            pass
+        if remaining:
+            changed.extend(os.path.join(directory, name)
+                           for name in bucket if name not in seen)
+        return changed
+
+    def _schedule_change(self, filepath: str):
+        """Push back the debounce deadline for a changed file."""
+        with self._debounce_lock:
+            self._debounce_deadlines[filepath] = self._clock() + self.debounce_time
+            # A pending timer re-arms itself for the later deadline when it fires,
+            # so a burst of saves costs one timer thread rather than one per save
+            if filepath not in self._debounce_timers:
+                self._start_debounce_timer(filepath, self.debounce_time)
+
+    def _start_debounce_timer(self, filepath: str, delay: float):
+        """Start a timer for filepath; the caller holds _debounce_lock."""
+        timer = threading.Timer(delay, self._fire_debounced, args=(filepath,))
+        timer.daemon = True
+        self._debounce_timers[filepath] = timer
+        timer.start()
+
+    def _fire_debounced(self, filepath: str):
+        """Timer callback: dispatch if the file has been quiet for debounce_time."""
+        with self._debounce_lock:
+            if self._debounce_timers.get(filepath) is not threading.current_thread():
+                return  # Cancelled or superseded
+            remaining = self._debounce_deadlines[filepath] - self._clock()
+            if remaining > 0:
+                self._start_debounce_timer(filepath, remaining)
+                return
+            del self._debounce_timers[filepath]
+            del self._debounce_deadlines[filepath]
+        self._process_file_change(filepath)
+
+    def _cancel_debounce_timers(self):
+        """Drop every change that is still waiting out its debounce."""
+        with self._debounce_lock:
+            for timer in self._debounce_timers.values():
+                timer.cancel()
+            self._debounce_timers.clear()
+            self._debounce_deadlines.clear()
+
+    def _check_file_for_changes(self, filepath: str,
+                                prefetched: Optional[Tuple[os.stat_result, bytes]] = None):
+        """
+        Check a file for changes.
+
+        prefetched is a (stat result, content hash) pair already taken by
+        _stat_and_hash; without it the file is stat'ed and hashed here.
+        """
+        now = time.time()
+        try:
+            if prefetched is not None:
+                stat_result, new_hash = prefetched
+            else:
+                try:
+                    stat_result, new_hash = os.stat(filepath), None
+                except FileNotFoundError:
+                    # File was deleted
+                    event = FileChangeEvent(
+                        filepath=filepath,
+                        event_type='deleted',
+                        timestamp=now
+                    )
+                    self._handle_change_event(event)
+                    self.remove_file(filepath)
+                    return
+            file_info = self.monitored_files[filepath]
+
+            # Unchanged (mtime_ns, size): nothing to read
+            stat_key = (stat_result.st_mtime_ns, stat_result.st_size)
+            if stat_key == file_info['stat_key']:
+                return
 
-    def _debounce_loop(self):
-        """Handle debounced change events."""
-        while self.debounce_running:
             try:
-                current_time = time.time()
-                ready_files = []
-                
-                for filepath, change_time in self.pending_changes.items():
-                    if current_time - change_time >= self.debounce_time:
-                        ready_files.append(filepath)
-                
-                for filepath in ready_files:
-                    del self.pending_changes[filepath]
-                    self._process_file_change(filepath)
-                
-                time.sleep(0.05)  # Check every 50ms
-            except Exception as e:
-                print(f"❌ Error in debounce loop: {e}")
-                time.sleep(0.1)
+                if new_hash is None:
+                    new_hash = _hash_file(filepath)
+
+                # Only process if content actually changed
+                if new_hash != file_info['content_hash']:
+                    self._schedule_change(filepath)
+
+                    # Update file info
+                    file_info.update({
+                        'mtime_ns': stat_result.st_mtime_ns,
+                        'size': stat_result.st_size,
+                        'stat_key': stat_key,
+                        'content_hash': new_hash,
+                        'change_count': file_info['change_count'] + 1,
+                        'last_change_time': now
+                    })
+                else:
+                    # Update metadata only
+                    file_info.update({
+                        'mtime_ns': stat_result.st_mtime_ns,
+                        'size': stat_result.st_size,
+                        'stat_key': stat_key
+                    })
 
-    def _check_file_for_changes(self, filepath: str):
-        """Check a file for changes."""
-        try:
-            if not os.path.exists(filepath):
-                # File was deleted
-                event = FileChangeEvent(
-                    filepath=filepath,
-                    event_type='deleted',
-                    timestamp=time.time(),
-                    old_content=self.monitored_files[filepath]['last_content']
-                )
-                self._handle_change_event(event)
-                self.remove_file(filepath)
-                return
+            except Exception as e:
+                logger.error("❌ Error reading file %s: %s", filepath, e)
 
-            stat_result = os.stat(filepath)
-            file_info = self.monitored_files[filepath]
-            
-            # Check if file has been modified
-            if (stat_result.st_mtime > file_info['mtime'] or
-                    stat_result.st_size != file_info['size']):
-                
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        new_content = f.read()
-                    
-                    new_hash = hashlib.md5(new_content.encode()).hexdigest()
-                    
-                    # Only process if content actually changed
-                    if new_hash != file_info['content_hash']:
-                        # Add to pending changes for debouncing
-                        self.pending_changes[filepath] = time.time()
-                        
-                        # Update file info
-                        file_info.update({
-                            'mtime': stat_result.st_mtime,
-                            'size': stat_result.st_size,
-                            'content_hash': new_hash,
-                            'last_content': new_content,
-                            'change_count': file_info['change_count'] + 1,
-                            'last_change_time': time.time()
-                        })
-                    else:
-                        # Update metadata only
-                        file_info.update({
-                            'mtime': stat_result.st_mtime,
-                            'size': stat_result.st_size
-                        })
-                        
-                except Exception as e:
-                    print(f"❌ Error reading file {filepath}: {e}")
-                    
         except Exception as e:
-            print(f"❌ Error checking file {filepath}: {e}")
+            logger.error("❌ Error checking file %s: %s", filepath, e)
 
     def _process_file_change(self, filepath: str):
         """Process a debounced file change."""
         try:
             file_info = self.monitored_files[filepath]
+
+            # Content is never cached; read it only now that the change is dispatched
+            with open(filepath, 'rb') as f:
+                new_content = _decode_source(f.read())
             
             event = FileChangeEvent(
                 filepath=filepath,
                 event_type='modified',
                 timestamp=time.time(),
                 old_content=None,  # We don't store old content for efficiency
-                new_content=file_info['last_content'],
+                new_content=new_content,
                 content_hash=file_info['content_hash']
             )
             
             self._handle_change_event(event)
             
         except Exception as e:
-            print(f"❌ Error processing file change for {filepath}: {e}")
+            logger.error("❌ Error processing file change for %s: %s", filepath, e)
 
     def _handle_change_event(self, event: FileChangeEvent):
-        """Handle a file change event."""
-        start_time = time.time()
+        """Queue a file change event for the callback thread."""
+        self.stats['changes_detected'] += 1
+        with self._callback_lock:
+            already_queued = event.filepath in self._queued_events
+            # A newer event replaces one still waiting, so stale content never runs
+            self._queued_events[event.filepath] = event
+            if already_queued:
+                return
+            if self._callback_executor is None:
+                self._callback_executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix='visualpython-callback')
+            self._callback_executor.submit(self._run_callback, event.filepath)
+
+    def _drain_callbacks(self):
+        """Wait for queued callbacks to finish and release the worker thread."""
+        with self._callback_lock:
+            executor, self._callback_executor = self._callback_executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _run_callback(self, filepath: str):
+        """Run the callback for the newest queued event of a file."""
+        with self._callback_lock:
+            event = self._queued_events.pop(filepath, None)
+        if event is None:
+            return
+        start_time = time.monotonic()
+        log_level = logging.INFO if self.verbose else logging.DEBUG
+        log_enabled = logger.isEnabledFor(log_level)
         
         try:
-            self.stats['changes_detected'] += 1
-            
             # Show change notification
-            filename = os.path.basename(event.filepath)
-            print(f"📝 File changed: {filename}")
+            if log_enabled:
+                file_info = self.monitored_files.get(event.filepath)
+                filename = file_info['basename'] if file_info else os.path.basename(event.filepath)
+                logger.log(log_level, "📝 File changed: %s", filename)
             
             # Call the callback
             self.callback(event)
             
             self.stats['callback_executions'] += 1
-            response_time = time.time() - start_time
+            response_time = time.monotonic() - start_time
             self.stats['total_response_time'] += response_time
-            self.stats['average_response_time'] = (
-                self.stats['total_response_time'] /
-                max(1, self.stats['callback_executions'])
-            )
             
-            print(f"⚡ Processed in {response_time*1000:.1f}ms")
+            if log_enabled:
+                logger.log(log_level, "⚡ Processed in %.1fms", response_time * 1000)
             
         except Exception as e:
-            print(f"❌ Error in change callback: {e}")
+            logger.error("❌ Error in change callback: %s", e)
 
     def get_statistics(self) -> Dict[str, Any]:
         """Get monitoring statistics."""
         return {
             **self.stats,
+            'files_monitored': len(self.monitored_files),
+            'average_response_time': (
+                self.stats['total_response_time'] /
+                max(1, self.stats['callback_executions'])
+            ),
             'monitored_files': list(self.monitored_files.keys()),
             'is_monitoring': self.is_monitoring,
             'check_interval_ms': self.check_interval * 1000,
             'file_change_counts': {
-                os.path.basename(filepath): info['change_count']
+                info['basename']: info['change_count']
                 for filepath, info in self.monitored_files.items()
             }
         }
@@ -286,15 +576,34 @@ class WatchdogFileMonitor(FileMonitor):
     Enhanced file monitor using the watchdog library for better performance.
     """
     
-    def __init__(self, callback: Callable[[FileChangeEvent], None]):
-        super().__init__(callback)
+    def __init__(self, callback: Callable[[FileChangeEvent], None], verbose: bool = False,
+                 **kwargs):
+        super().__init__(callback, verbose, **kwargs)
         self.observer: Optional[Observer] = None
+        self.polling_observer: Optional[PollingObserver] = None
         self.event_handlers: Dict[str, 'VisualPythonEventHandler'] = {}
 
+    def add_file(self, filepath: str) -> bool:
+        """Add a file, watching it straight away if monitoring is running."""
+        if not super().add_file(filepath):
+            return False
+        if self.observer and self.is_monitoring:
+            self._setup_watchdog_for_file(os.path.abspath(filepath))
+        return True
+
+    def remove_file(self, filepath: str) -> bool:
+        """Remove a file and stop reacting to its events."""
+        filepath = os.path.abspath(filepath)
+        handler = self.event_handlers.get(os.path.dirname(filepath))
+        if handler:
+            handler.remove_watched_file(filepath)
+        return super().remove_file(filepath)
+
     def start_monitoring(self):
         """Start monitoring using watchdog if available."""
         if not WATCHDOG_AVAILABLE:
             print("📦 Watchdog not available, using polling monitor")
+            self.check_interval = max(self.check_interval, POLLING_FALLBACK_INTERVAL)
             super().start_monitoring()
             return
             
@@ -303,33 +612,35 @@ class WatchdogFileMonitor(FileMonitor):
             
         self.is_monitoring = True
         self.observer = Observer()
+        # Started first so a failing watch raises from schedule() for just that directory
+        self.observer.start()
         
-        # Setup watchdog for each file
+        # One watch per directory, shared by every file in it
         for filepath in self.monitored_files.keys():
             self._setup_watchdog_for_file(filepath)
         
-        self.observer.start()
-        
-        # Start debounce handler
-        self.debounce_running = True
-        self.debounce_thread = threading.Thread(target=self._debounce_loop, daemon=True)
-        self.debounce_thread.start()
-        
         print(f"👀 Started watchdog monitoring for {len(self.monitored_files)} files")
 
     def stop_monitoring(self):
         """Stop watchdog monitoring."""
+        if self.monitor_thread is not None:
+            # Started in polling fallback mode
+            super().stop_monitoring()
+            return
+        
         self.is_monitoring = False
-        self.debounce_running = False
         
         if self.observer:
             self.observer.stop()
             self.observer.join()
             self.observer = None
+        if self.polling_observer:
+            self.polling_observer.stop()
+            self.polling_observer.join()
+            self.polling_observer = None
             
-        if self.debounce_thread and self.debounce_thread.is_alive():
-            self.debounce_thread.join(timeout=1.0)
-            
+        self._cancel_debounce_timers()
+        self._drain_callbacks()
         self.event_handlers.clear()
         print("⏹️  Stopped watchdog monitoring")
 
@@ -337,18 +648,32 @@ class WatchdogFileMonitor(FileMonitor):
         """Set up watchdog monitoring for a specific file."""
         try:
             file_dir = os.path.dirname(filepath)
-            filename = os.path.basename(filepath)
             
             if file_dir not in self.event_handlers:
                 handler = VisualPythonEventHandler(self, file_dir)
+                self._schedule_directory(handler, file_dir)
                 self.event_handlers[file_dir] = handler
-                self.observer.schedule(handler, file_dir, recursive=False)
             
-            self.event_handlers[file_dir].add_watched_file(filename)
+            self.event_handlers[file_dir].add_watched_file(filepath)
             
         except Exception as e:
             print(f"❌ Error setting up watchdog for {filepath}: {e}")
 
+    def _schedule_directory(self, handler: 'VisualPythonEventHandler', file_dir: str):
+        """Watch a directory natively, or by polling when that is not viable."""
+        if not _has_many_entries(file_dir, POLLING_DIR_MIN_ENTRIES):
+            try:
+                self.observer.schedule(handler, file_dir, recursive=False)
+                return
+            except OSError as e:
+                # Usually the inotify watch or instance limit has been reached
+                print(f"⚠️  Native watch failed for {file_dir} ({e}), polling instead")
+        
+        if self.polling_observer is None:
+            self.polling_observer = PollingObserver(timeout=POLLING_FALLBACK_INTERVAL)
+            self.polling_observer.start()
+        self.polling_observer.schedule(handler, file_dir, recursive=False)
+
 
 class VisualPythonEventHandler(FileSystemEventHandler):
     """Watchdog event handler for VisualPython file monitoring."""
@@ -356,23 +681,22 @@ class VisualPythonEventHandler(FileSystemEventHandler):
     def __init__(self, monitor: WatchdogFileMonitor, watch_dir: str):
         self.monitor = monitor
         self.watch_dir = watch_dir
-        self.watched_files: set = set()
+        # Replaced rather than mutated so the observer thread never sees it change mid-lookup
+        self.watched_abspaths: frozenset = frozenset()
+
+    def add_watched_file(self, filepath: str):
+        """Add an absolute file path to the watch list."""
+        self.watched_abspaths = self.watched_abspaths | {filepath}
 
-    def add_watched_file(self, filename: str):
-        """Add a file to the watch list."""
-        self.watched_files.add(filename)
+    def remove_watched_file(self, filepath: str):
+        """Remove an absolute file path from the watch list."""
+        self.watched_abspaths = self.watched_abspaths - {filepath}
 
     def on_modified(self, event):
         """Handle file modification events."""
-        if event.is_directory:
-            return
-            
-        filename = os.path.basename(event.src_path)
-        if filename in self.watched_files:
-            filepath = os.path.join(self.watch_dir, filename)
-            if filepath in self.monitor.monitored_files:
-                # Add to pending changes for debouncing
-                self.monitor.pending_changes[filepath] = time.time()
+        # Unrelated files in the directory fall out on a single set lookup
+        if event.src_path in self.watched_abspaths and not event.is_directory:
+            self.monitor._schedule_change(event.src_path)
 
 
 class LiveCodeSession:
@@ -387,17 +711,21 @@ class LiveCodeSession:
         
         self.engine = VisualPythonEngine(backend=backend, **kwargs)
         
-        # Use watchdog if available, otherwise fall back to polling
-        monitor_class = WatchdogFileMonitor if WATCHDOG_AVAILABLE else FileMonitor
-        self.monitor = monitor_class(self._on_file_change)
+        # WatchdogFileMonitor falls back to polling on its own without watchdog
+        self.monitor = WatchdogFileMonitor(self._on_file_change)
         
         self.active_files: List[str] = []
         self.session_stats = {
             'session_start_time': time.time(),
             'total_executions': 0,
             'total_execution_time': 0,
-            'files_processed': 0
+            'files_processed': 0,
+            'cache_hits': 0
         }
+        
+        # Source digest -> engine snapshot, least recently used first, so
+        # undo/redo back to a version seen before skips re-execution
+        self._result_cache: 'OrderedDict[bytes, tuple]' = OrderedDict()
 
     def add_file(self, filepath: str):
         """Add a Python file to the live session."""
@@ -406,13 +734,13 @@ class LiveCodeSession:
             
             try:
                 # Execute the file initially
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    code = f.read()
+                with open(filepath, 'rb') as f:
+                    code = _decode_source(f.read())
                 
-                result = self.engine.execute(code)
+                execution_time = self.engine.execute(code)
                 self.session_stats['files_processed'] += 1
                 self.session_stats['total_executions'] += 1
-                self.session_stats['total_execution_time'] += result.execution_time_ms
+                self.session_stats['total_execution_time'] += execution_time
                 
                 print(f"✅ Added {os.path.basename(filepath)} to live session")
                 return True
@@ -471,22 +799,39 @@ class LiveCodeSession:
     def _on_file_change(self, event: FileChangeEvent):
         """Handle file change events."""
         if event.event_type == 'modified' and event.new_content:
-            start_time = time.time()
+            start_time = time.monotonic()
+            filename = os.path.basename(event.filepath)
+            
+            key = hashlib.blake2b(event.new_content.encode(), digest_size=16).digest()
+            snapshot = self._result_cache.get(key)
+            if snapshot is not None:
+                self._result_cache.move_to_end(key)
+                self.engine.restore(snapshot)
+                self.session_stats['cache_hits'] += 1
+                total_time = (time.monotonic() - start_time) * 1000
+                print(f"🚀 {filename} restored in {total_time:.1f}ms (unchanged since last run)")
+                return
             
             try:
+                executions_before = self.engine.execution_count
                 # Execute the changed file
-                result = self.engine.execute(event.new_content)
+                execution_time = self.engine.execute(event.new_content)
+                
+                # Failed runs are not counted by the engine and never cached
+                if self.engine.execution_count > executions_before:
+                    self._result_cache[key] = self.engine.snapshot()
+                    if len(self._result_cache) > RESULT_CACHE_SIZE:
+                        self._result_cache.popitem(last=False)
                 
                 self.session_stats['total_executions'] += 1
-                self.session_stats['total_execution_time'] += result.execution_time_ms
+                self.session_stats['total_execution_time'] += execution_time
                 
-                total_time = (time.time() - start_time) * 1000
-                filename = os.path.basename(event.filepath)
+                total_time = (time.monotonic() - start_time) * 1000
                 
                 print(f"🚀 {filename} executed in {total_time:.1f}ms (no compilation!)")
                 
             except Exception as e:
-                print(f"❌ Execution error in {os.path.basename(event.filepath)}: {e}")
+                print(f"❌ Execution error in {filename}: {e}")
 
 
 def live_monitor(filepath: str, backend='tkinter', **kwargs):
@@ -11,46 +11,234 @@ Key Innovation: Code → AST → Visual Elements (no compilation!)
 import ast
 import operator
 import re
-from typing import Dict, Any, List, Optional, Union
-from collections import defaultdict
+import warnings
+from functools import lru_cache, partial
+from itertools import islice
+from typing import Callable, Deque, Dict, Any, List, Optional, Union
+from collections import Counter, defaultdict, deque
+
+from .core_numba import NUMBA_AVAILABLE, plan_loop, get_compiled_loop
+from .parser_numpy import NUMPY_AVAILABLE, plan_vector_loop, run_vector_loop, read_names_of_plan
+
+
+# Display symbols for augmented-assignment operators
+_SYMBOL_MAP = {
+    ast.Add: '+',
+    ast.Sub: '-',
+    ast.Mult: '*',
+    ast.Div: '/',
+    ast.FloorDiv: '//',
+    ast.Mod: '%',
+    ast.Pow: '**',
+}
+
+
+@lru_cache(maxsize=None)
+def _op_symbol(op_type: type) -> str:
+    """Symbol for an operator node type, '?' if it has none."""
+    return _SYMBOL_MAP.get(op_type, '?')
+
+
+# Built-ins user code may call; looked up directly instead of via eval(name)
+_BUILTIN_DISPATCH = {
+    'str': str,
+    'int': int,
+    'float': float,
+    'bool': bool,
+    'abs': abs,
+    'min': min,
+    'max': max,
+    'len': len,
+}
+
+# Range loops at least this long run through a compiled body when Numba is
+# available. Lower than the engine's threshold: loops are capped at 50
+# iterations here, and compiled bodies are cached on nodes of cached trees,
+# so live re-renders reuse them
+JIT_MIN_ITERATIONS = 16
+
+# Range loops at least this long are vectorized with NumPy when their body
+# carries no values between iterations; no compile step, so this is lower
+VECTORIZE_MIN_ITERATIONS = 8
+
+# Type names of variables the compiled and vectorized loop paths accept
+_NUMERIC_TYPES = frozenset(('int', 'float'))
+
+# Marks a variable that had no value before an assignment
+_MISSING = object()
+
+# Parsed trees kept per parser for re-rendering unchanged source
+_TREE_CACHE_SIZE = 32
+
+# Names resolve through _TrackedNames, so compiled expressions never need builtins
+_EVAL_GLOBALS = {'__builtins__': {}}
+
+# Node types a compiled expression may contain; anything else (calls,
+# subscripts, unsupported operators) keeps the node on the visitor path
+_PURE_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.BoolOp,
+    ast.Constant, ast.Name, ast.Load, ast.And, ast.Or,
+    ast.UAdd, ast.USub, ast.Not,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.LShift, ast.RShift, ast.BitOr, ast.BitXor, ast.BitAnd,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+    ast.Is, ast.IsNot, ast.In, ast.NotIn,
+)
+
+
+def _compile_pure(node: ast.expr):
+    """Compile a side-effect-free operator expression, or None if it is not one."""
+    expression = ast.Expression(body=node)
+    for sub in ast.walk(expression):
+        if not isinstance(sub, _PURE_NODES):
+            return None
+    # Hand-built trees may lack positions, which compile() requires
+    ast.fix_missing_locations(expression)
+    # An internal compile; keep SyntaxWarnings about the user's code
+    # (e.g. "is" with a literal) out of their output
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', SyntaxWarning)
+        return compile(expression, '<visualpython>', 'eval')
+
+
+def _f_string_parts(node: ast.JoinedStr) -> List[tuple]:
+    """
+    Split an f-string into (text, expr, spec) parts, cached on the node.
+
+    Literal pieces have expr None. Constant format specs are folded to a
+    str up front; a spec that contains replacement fields stays a node.
+    """
+    parts = node.__dict__.get('_vp_parts')
+    if parts is not None:
+        return parts
+    parts = []
+    for value in node.values:
+        if isinstance(value, ast.Constant):
+            parts.append((str(value.value), None, None))
+        elif isinstance(value, ast.FormattedValue):
+            spec = value.format_spec
+            if spec is not None and all(isinstance(v, ast.Constant) for v in spec.values):
+                spec = ''.join(str(v.value) for v in spec.values)
+            parts.append((None, value.value, spec))
+    node._vp_parts = parts
+    return parts
+
+
+class _TrackedNames:
+    """Mapping for eval() locals that resolves names via VariableTracker.access."""
+    
+    __slots__ = ('_access',)
+    
+    def __init__(self, tracker: 'VariableTracker'):
+        self._access = tracker.access
+    
+    def __getitem__(self, name: str) -> Any:
+        # Same as the visitor: counts the access, unknown names are None
+        return self._access(name)
 
 
 class VariableTracker:
     """Tracks variable assignments and their visual representations"""
     
-    def __init__(self):
+    # Assignments reported by get_parser_statistics
+    HISTORY_SIZE = 10
+
+    def __init__(self, history_cap: int = 256):
         self.variables: Dict[str, Any] = {}
-        self.assignments: List[Dict[str, Any]] = []
         self.access_count: Dict[str, int] = defaultdict(int)
+        # Assignment log as parallel columns rather than one dict per row;
+        # only the last history_cap assignments are kept
+        self.history_cap = history_cap
+        self._asg_names: Deque[str] = deque(maxlen=history_cap)
+        self._asg_old: Deque[Any] = deque(maxlen=history_cap)
+        self._asg_new: Deque[Any] = deque(maxlen=history_cap)
+        self._asg_types: Deque[str] = deque(maxlen=history_cap)
+        self._asg_is_new: Deque[bool] = deque(maxlen=history_cap)
+        self._assignment_total = 0
+        # Maintained on every access/assign so get_statistics is O(1)
+        self._top_name: Optional[str] = None
+        self._top_count = 0
+        self._types_cache: Dict[str, str] = {}
     
-    def assign(self, name: str, value: Any) -> Dict[str, Any]:
+    def assign(self, name: str, value: Any):
         """Record a variable assignment"""
-        old_value = self.variables.get(name)
-        self.variables[name] = value
+        variables = self.variables
+        previous = variables.get(name, _MISSING)
+        variables[name] = value
+        is_new = previous is _MISSING
+        old_value = None if is_new else previous
         
-        assignment_record = {
-            'name': name,
-            'old_value': old_value,
-            'new_value': value,
-            'type': type(value).__name__,
-            'is_new': name not in self.variables or old_value is None
-        }
+        type_name = self._types_cache[name] = type(value).__name__
         
-        self.assignments.append(assignment_record)
-        return assignment_record
+        self._asg_names.append(name)
+        self._asg_old.append(old_value)
+        self._asg_new.append(value)
+        self._asg_types.append(type_name)
+        self._asg_is_new.append(is_new)
+        self._assignment_total += 1
+
+    @property
+    def assignments(self) -> List[Dict[str, Any]]:
+        """Logged assignments as dicts, built on demand from the columns"""
+        return self.recent_assignments(len(self._asg_names))
+
+    def recent_assignments(self, count: int = HISTORY_SIZE) -> List[Dict[str, Any]]:
+        """The last ``count`` logged assignments as dicts, oldest first"""
+        start = max(0, len(self._asg_names) - count)
+        columns = [islice(column, start, None) for column in (
+            self._asg_names, self._asg_old, self._asg_new, self._asg_types, self._asg_is_new)]
+        return [
+            {'name': name, 'old_value': old, 'new_value': new, 'type': type_name, 'is_new': is_new}
+            for name, old, new, type_name, is_new in zip(*columns)
+        ]
     
     def access(self, name: str) -> Any:
         """Record variable access and return value"""
-        self.access_count[name] += 1
+        count = self.access_count[name] + 1
+        self.access_count[name] = count
+        if count > self._top_count:
+            self._top_count = count
+            self._top_name = name
         return self.variables.get(name)
+
+    def count_access(self, name: str, times: int):
+        """Record ``times`` accesses of a variable at once"""
+        count = self.access_count[name] + times
+        self.access_count[name] = count
+        if count > self._top_count:
+            self._top_count = count
+            self._top_name = name
+
+    def numeric_values(self, names) -> Optional[Dict[str, Any]]:
+        """
+        Values of the named variables if every one is an int or float.
+
+        Returns None if any is undefined or of another type (bool included).
+        Types come from the cache kept by assign(), so no value is inspected.
+        """
+        types_cache = self._types_cache
+        variables = self.variables
+        values = {}
+        for name in names:
+            if types_cache.get(name) not in _NUMERIC_TYPES:
+                return None
+            values[name] = variables[name]
+        return values
+
+    def update_variables(self, variables: Dict[str, Any]):
+        """Inherit existing variables without recording assignments"""
+        self.variables.update(variables)
+        types_cache = self._types_cache
+        for name, value in variables.items():
+            types_cache[name] = type(value).__name__
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get variable tracking statistics"""
         return {
             'total_variables': len(self.variables),
-            'total_assignments': len(self.assignments),
-            'most_accessed': max(self.access_count.items(), key=lambda x: x[1]) if self.access_count else None,
-            'variable_types': {name: type(value).__name__ for name, value in self.variables.items()}
+            'total_assignments': self._assignment_total,
+            'most_accessed': (self._top_name, self._top_count) if self._top_count else None,
+            'variable_types': dict(self._types_cache)
         }
 
 
@@ -60,6 +248,11 @@ class PythonVisualParser:
     
     This bypasses the entire compilation step and renders code as visual
     elements immediately as the AST is parsed.
+    
+    Subclasses can handle more node types ast.NodeVisitor-style by defining
+    visit_<NodeType> methods (e.g. visit_Pass, visit_Lambda). They are
+    resolved into the type-keyed dispatch tables once per parser, so they
+    cost a single dict probe like the built-in handlers.
     """
     
     def __init__(self, engine):
@@ -67,10 +260,15 @@ class PythonVisualParser:
         Initialize the visual parser
         
         Args:
-            engine: VisualPythonEngine instance for rendering
+            engine: VisualPythonEngine instance for rendering. It may also
+                provide add_visual_elements(batch), taking a list of
+                (element_type, content, x, y, color) tuples; loops then
+                hand over consecutive elements in one call.
         """
         self.engine = engine
         self.variable_tracker = VariableTracker()
+        self._tracked_names = _TrackedNames(self.variable_tracker)
+        self._tree_cache: Dict[str, ast.Module] = {}
         
         # Operator mapping for expressions
         self.operators = {
@@ -101,24 +299,78 @@ class PythonVisualParser:
             ast.In: lambda a, b: a in b,
             ast.NotIn: lambda a, b: a not in b,
         }
+        
+        # type(node) -> bound handler; one dict probe instead of an isinstance chain
+        self._stmt_dispatch = {
+            ast.Assign: self._handle_assignment,
+            ast.AugAssign: self._handle_augmented_assignment,
+            ast.Expr: self._handle_expression_statement,
+            ast.For: self._handle_for_loop,
+            ast.While: self._handle_while_loop,
+            ast.If: self._handle_if_statement,
+            ast.FunctionDef: self._handle_function_definition,
+            ast.Return: self._handle_return,
+        }
+        self._expr_dispatch = {
+            ast.Constant: self._eval_constant,
+            ast.Name: self._eval_name,
+            ast.BinOp: self._eval_pure,
+            ast.UnaryOp: self._eval_pure,
+            ast.Compare: self._eval_pure,
+            ast.BoolOp: self._eval_pure,
+            ast.List: self._eval_list,
+            ast.Tuple: self._eval_tuple,
+            ast.Dict: self._eval_dict,
+            ast.Call: self._evaluate_function_call,
+            ast.JoinedStr: self._evaluate_f_string,
+            ast.Subscript: self._eval_subscript,
+            ast.Attribute: self._eval_attribute,
+        }
+        # Visitor handlers for operator nodes that cannot be compiled
+        self._pure_fallback = {
+            ast.BinOp: self._eval_binop,
+            ast.UnaryOp: self._eval_unaryop,
+            ast.Compare: self._eval_compare,
+            ast.BoolOp: self._eval_boolop,
+        }
+        self._register_visit_methods()
+    
+    def _register_visit_methods(self):
+        """Add subclass visit_<NodeType> methods to the dispatch tables."""
+        for attr in dir(type(self)):
+            if not attr.startswith('visit_'):
+                continue
+            node_type = getattr(ast, attr[6:], None)
+            if not (isinstance(node_type, type) and issubclass(node_type, ast.AST)):
+                continue
+            if issubclass(node_type, ast.stmt):
+                self._stmt_dispatch[node_type] = getattr(self, attr)
+            elif issubclass(node_type, ast.expr):
+                self._expr_dispatch[node_type] = getattr(self, attr)
     
-    def parse_and_render(self, tree: ast.AST, variables: Dict[str, Any] = None):
+    def parse_and_render(self, tree: Union[ast.AST, str], variables: Dict[str, Any] = None):
         """
         Parse AST and render visual elements immediately
         
         This is the core innovation: direct AST → visual rendering
         
         Args:
-            tree: Python AST to parse
+            tree: Python AST to parse, or source code (parsed trees are
+                cached, so re-rendering unchanged source skips ast.parse)
             variables: Existing variables to inherit
         """
+        if isinstance(tree, str):
+            tree = self._parse(tree)
         if variables:
-            self.variable_tracker.variables.update(variables)
+            self.variable_tracker.update_variables(variables)
         
         # Process each statement in the AST
+        dispatch = self._stmt_dispatch.get
         for node in tree.body:
             try:
-                self._process_statement(node)
+                handler = dispatch(type(node))
+                if handler is not None:
+                    handler(node)
             except Exception as e:
                 # Show parsing errors visually
                 self.engine.add_visual_element(
@@ -133,50 +385,65 @@ class PythonVisualParser:
         # Update engine's variables
         self.engine.variables.update(self.variable_tracker.variables)
     
+    def _parse(self, source: str) -> ast.Module:
+        """Parse source, reusing the tree (and its compiled expressions) for repeats."""
+        tree = self._tree_cache.get(source)
+        if tree is None:
+            tree = ast.parse(source)
+            if len(self._tree_cache) >= _TREE_CACHE_SIZE:
+                self._tree_cache.pop(next(iter(self._tree_cache)))
+            self._tree_cache[source] = tree
+        return tree
+    
     def _process_statement(self, node: ast.stmt):
         """Process a single statement node"""
-        if isinstance(node, ast.Assign):
-            self._handle_assignment(node)
-        
-        elif isinstance(node, ast.AugAssign):
-            self._handle_augmented_assignment(node)
-        
-        elif isinstance(node, ast.Expr):
-            # Expression statement (like function calls)
-            if isinstance(node.value, ast.Call):
-                self._handle_function_call(node.value)
-            else:
-                # Evaluate and display expression result
-                try:
-                    result = self._evaluate_expression(node.value)
-                    if result is not None:
-                        self.engine.add_visual_element(
-                            'expression_result',
-                            f"Result: {result}",
-                            self.engine.output_x,
-                            self.engine.current_y,
-                            color='#ffff88'
-                        )
-                        self.engine.current_y += self.engine.line_height
-                except:
-                    pass  # Ignore evaluation errors for expressions
+        handler = self._stmt_dispatch.get(type(node))
+        if handler is not None:
+            handler(node)
         
-        elif isinstance(node, ast.For):
-            self._handle_for_loop(node)
-        
-        elif isinstance(node, ast.While):
-            self._handle_while_loop(node)
-        
-        elif isinstance(node, ast.If):
-            self._handle_if_statement(node)
-        
-        elif isinstance(node, ast.FunctionDef):
-            self._handle_function_definition(node)
-        
-        elif isinstance(node, ast.Return):
-            self._handle_return(node)
-        
-        # Add more statement types as needed
+        # Add more statement types to _stmt_dispatch as needed
+    
+    def _specialize_body(self, node: ast.stmt) -> List[Callable[[], None]]:
+        """
+        Return node.body as zero-argument handler calls, built once per loop.
+
+        Loops re-run their body every iteration; resolving each statement's
+        handler up front replaces a dispatch lookup per statement per
+        iteration with a direct call. Unsupported statements are dropped
+        here, as _process_statement would ignore them. The steps hold bound
+        methods, so the cache on the node is only used by the same parser.
+        """
+        cached = node.__dict__.get('_vp_body')
+        if cached is not None and cached[0] is self:
+            return cached[1]
+        dispatch = self._stmt_dispatch.get
+        steps = []
+        for stmt in node.body:
+            handler = dispatch(type(stmt))
+            if handler is not None:
+                steps.append(partial(handler, stmt))
+        node._vp_body = (self, steps)
+        return steps
+    
+    def _handle_expression_statement(self, node: ast.Expr):
+        """Expression statement (like function calls)"""
+        if isinstance(node.value, ast.Call):
+            self._handle_function_call(node.value)
+        else:
+            # Evaluate and display expression result
+            try:
+                result = self._evaluate_expression(node.value)
+                if result is not None:
+                    self.engine.add_visual_element(
+                        'expression_result',
+                        f"Result: {result}",
+                        self.engine.output_x,
+                        self.engine.current_y,
+                        color='#ffff88'
+                    )
+                    self.engine.current_y += self.engine.line_height
+            except Exception:
+                pass  # Ignore evaluation errors for expressions
     
     def _handle_assignment(self, node: ast.Assign):
         """Handle variable assignment: x = value"""
@@ -190,7 +457,7 @@ class PythonVisualParser:
                     var_name = target.id
                     
                     # Track the assignment
-                    assignment_record = self.variable_tracker.assign(var_name, value)
+                    self.variable_tracker.assign(var_name, value)
                     
                     # Create visual representation immediately
                     self.engine.add_variable_display(var_name, value)
@@ -304,17 +571,19 @@ class PythonVisualParser:
     def _handle_print_call(self, node: ast.Call):
         """Handle print() function calls with immediate visual output"""
         try:
+            evaluate = self._evaluate_expression
+            evaluate_f_string = self._evaluate_f_string
+            joined_str = ast.JoinedStr
             output_parts = []
+            append = output_parts.append
             
             for arg in node.args:
-                if isinstance(arg, ast.JoinedStr):
-                    # Handle f-strings
-                    result = self._evaluate_f_string(arg)
-                    output_parts.append(str(result))
+                if type(arg) is joined_str:
+                    # Handle f-strings; already a str
+                    append(evaluate_f_string(arg))
                 else:
                     # Regular arguments
-                    value = self._evaluate_expression(arg)
-                    output_parts.append(str(value))
+                    append(str(evaluate(arg)))
             
             # Join with spaces (default print behavior)
             output_text = ' '.join(output_parts)
@@ -335,43 +604,66 @@ class PythonVisualParser:
                 iterable = self._evaluate_expression(node.iter)
                 
                 if iterable is not None:
+                    # Bind hot engine/tracker lookups once per loop
+                    engine = self.engine
+                    add = engine.add_visual_element
+                    line_h = engine.line_height
+                    out_x = engine.output_x
+                    tracker_assign = self.variable_tracker.assign
+                    body = self._specialize_body(node)
+
                     # Show loop start
-                    self.engine.add_visual_element(
+                    add(
                         'loop_start',
                         f"For {loop_var} in {iterable}:",
-                        self.engine.output_x,
-                        self.engine.current_y,
+                        out_x,
+                        engine.current_y,
                         color='#88ff88'
                     )
-                    self.engine.current_y += self.engine.line_height
+                    engine.current_y += line_h
                     
                     # Execute loop iterations (limited for safety)
                     iteration_count = 0
                     max_iterations = 50  # Safety limit
                     
-                    for item in iterable:
-                        if iteration_count >= max_iterations:
-                            self.engine.add_output_line(f"... (truncated after {max_iterations} iterations)")
-                            break
-                        
-                        # Set loop variable
-                        self.variable_tracker.assign(loop_var, item)
-                        
-                        # Show iteration
-                        self.engine.add_visual_element(
-                            'loop_iteration',
-                            f"  {loop_var} = {item}",
-                            self.engine.output_x + 20,
-                            self.engine.current_y,
-                            color='#88ffff'
-                        )
-                        self.engine.current_y += self.engine.line_height
-                        
-                        # Execute loop body
-                        for stmt in node.body:
-                            self._process_statement(stmt)
-                        
-                        iteration_count += 1
+                    batch_add = None if body else getattr(engine, 'add_visual_elements', None)
+                    if ((NUMPY_AVAILABLE or NUMBA_AVAILABLE)
+                            and self._try_fast_loop(node, loop_var, iterable, max_iterations)):
+                        if len(iterable) > max_iterations:
+                            engine.add_output_line(f"... (truncated after {max_iterations} iterations)")
+                    elif batch_add is not None:
+                        # Nothing in the body draws, so iteration elements are
+                        # consecutive and go to the engine in one call
+                        items = list(islice(iterable, max_iterations + 1))
+                        self._emit_iterations_batched(batch_add, loop_var, items[:max_iterations])
+                        if len(items) > max_iterations:
+                            engine.add_output_line(f"... (truncated after {max_iterations} iterations)")
+                    else:
+                        for item in iterable:
+                            if iteration_count >= max_iterations:
+                                engine.add_output_line(f"... (truncated after {max_iterations} iterations)")
+                                break
+                            
+                            # Set loop variable
+                            tracker_assign(loop_var, item)
+                            
+                            # Show iteration; body statements move current_y
+                            # themselves, so it is re-read every pass
+                            y = engine.current_y
+                            add(
+                                'loop_iteration',
+                                f"  {loop_var} = {item}",
+                                out_x + 20,
+                                y,
+                                color='#88ffff'
+                            )
+                            engine.current_y = y + line_h
+                            
+                            # Execute loop body
+                            for step in body:
+                                step()
+                            
+                            iteration_count += 1
         
         except Exception as e:
             self.engine.add_visual_element(
@@ -383,46 +675,160 @@ class PythonVisualParser:
             )
             self.engine.current_y += self.engine.line_height
     
+    def _try_fast_loop(self, node: ast.For, loop_var: str, iterable: List[int],
+                       max_iterations: int) -> bool:
+        """
+        Run a pure-numeric range loop vectorized or compiled, then replay it.
+
+        NumPy handles bodies without loop-carried values; Numba handles the
+        rest. Returns False when the interpreter must run the loop instead:
+        the body cannot be planned, the loop is short, a name it reads is
+        not defined yet, or the fast run bailed out (division by zero,
+        ints too large for float64).
+        """
+        iter_node = node.iter
+        if not (isinstance(iter_node, ast.Call) and isinstance(iter_node.func, ast.Name)
+                and iter_node.func.id == 'range'):
+            return False
+        count = min(len(iterable), max_iterations)
+        items = iterable[:count]
+        tracker = self.variable_tracker
+
+        if NUMPY_AVAILABLE and count >= VECTORIZE_MIN_ITERATIONS:
+            plan = node.__dict__.get('_vp_vec_plan', False)
+            if plan is False:
+                plan = node._vp_vec_plan = plan_vector_loop(node)
+            if plan is not None:
+                targets = [target for target, _ in plan]
+                reads = read_names_of_plan(plan)
+                # Loop-invariant inputs, typed from the tracker's type cache
+                inputs = tracker.numeric_values(
+                    {name for name in reads if name != loop_var and name not in targets})
+                if inputs is not None:
+                    values = run_vector_loop(plan, loop_var, items, inputs)
+                    if values is not None:
+                        self._replay_loop(loop_var, items, targets, values, reads)
+                        return True
+
+        if NUMBA_AVAILABLE and count >= JIT_MIN_ITERATIONS:
+            plan = node.__dict__.get('_vp_parser_jit', False)
+            if plan is False:
+                plan = node._vp_parser_jit = plan_loop(node)
+                if plan is not None:
+                    # get_compiled_loop reads the plan from here
+                    node._vp_jit_plan = plan
+            if plan is None:
+                return False
+            reads = read_names_of_plan(plan)
+            # Unknown names are None to the interpreter, which then reports an error
+            if tracker.numeric_values(name for name in reads if name != loop_var) is None:
+                return False
+            variables = tracker.variables
+            start = items[0]
+            step = items[1] - start if count > 1 else 1
+            stop = start + step * count
+            # No kernel for ints or bounds float64 cannot hold exactly
+            loop, _ = get_compiled_loop(node, variables, range(start, stop, step))
+            if loop is None:
+                return False
+            values = loop.run(start, stop, step, count, variables)
+            if values is not None:
+                self._replay_loop(loop_var, items, loop.targets, values, reads)
+                return True
+        return False
+
+    def _emit_iterations_batched(self, batch_add: Callable[[List[tuple]], Any],
+                                 loop_var: str, items: List[Any]):
+        """Assign each item and hand all iteration elements to the engine at once."""
+        engine = self.engine
+        assign = self.variable_tracker.assign
+        line_h = engine.line_height
+        tick_x = engine.output_x + 20
+        y = engine.current_y
+        batch = []
+        append = batch.append
+        for item in items:
+            assign(loop_var, item)
+            append(('loop_iteration', f"  {loop_var} = {item}", tick_x, y, '#88ffff'))
+            y += line_h
+        batch_add(batch)
+        engine.current_y = y
+
+    def _replay_loop(self, loop_var: str, items: List[int], targets: List[str],
+                     values: List[Any], reads: List[str]):
+        """Draw and track a precomputed loop exactly as the interpreter would have."""
+        tracker = self.variable_tracker
+        engine = self.engine
+        add = engine.add_visual_element
+        display = engine.add_variable_display
+        assign = tracker.assign
+        line_h = engine.line_height
+        tick_x = engine.output_x + 20
+        index = 0
+        for item in items:
+            assign(loop_var, item)
+            y = engine.current_y
+            add('loop_iteration', f"  {loop_var} = {item}", tick_x, y, color='#88ffff')
+            engine.current_y = y + line_h
+            for target in targets:
+                value = values[index]
+                index += 1
+                assign(target, value)
+                display(target, value)
+
+        for name, times in Counter(reads).items():
+            tracker.count_access(name, times * len(items))
+    
     def _handle_while_loop(self, node: ast.While):
         """Handle while loops (with safety limits)"""
         try:
             iteration_count = 0
             max_iterations = 50  # Safety limit
+
+            # Bind hot engine lookups once per loop
+            engine = self.engine
+            add = engine.add_visual_element
+            line_h = engine.line_height
+            out_x = engine.output_x
+            evaluate = self._evaluate_expression
+            test = node.test
+            body = self._specialize_body(node)
             
-            self.engine.add_visual_element(
+            add(
                 'while_start',
                 "While loop:",
-                self.engine.output_x,
-                self.engine.current_y,
+                out_x,
+                engine.current_y,
                 color='#88ff88'
             )
-            self.engine.current_y += self.engine.line_height
+            engine.current_y += line_h
             
             while iteration_count < max_iterations:
                 # Evaluate condition
-                condition = self._evaluate_expression(node.test)
+                condition = evaluate(test)
                 
                 if not condition:
                     break
                 
                 # Show iteration
-                self.engine.add_visual_element(
+                y = engine.current_y
+                add(
                     'while_iteration',
                     f"  Iteration {iteration_count + 1}",
-                    self.engine.output_x + 20,
-                    self.engine.current_y,
+                    out_x + 20,
+                    y,
                     color='#88ffff'
                 )
-                self.engine.current_y += self.engine.line_height
+                engine.current_y = y + line_h
                 
                 # Execute loop body
-                for stmt in node.body:
-                    self._process_statement(stmt)
+                for step in body:
+                    step()
                 
                 iteration_count += 1
             
             if iteration_count >= max_iterations:
-                self.engine.add_output_line(f"... (while loop truncated after {max_iterations} iterations)")
+                engine.add_output_line(f"... (while loop truncated after {max_iterations} iterations)")
         
         except Exception as e:
             self.engine.add_visual_element(
@@ -508,66 +914,98 @@ class PythonVisualParser:
     
     def _evaluate_expression(self, node: ast.expr) -> Any:
         """Evaluate an expression node and return its value"""
-        if isinstance(node, ast.Constant):
-            return node.value
-        
-        elif isinstance(node, ast.Name):
-            return self.variable_tracker.access(node.id)
-        
-        elif isinstance(node, ast.BinOp):
-            left = self._evaluate_expression(node.left)
-            right = self._evaluate_expression(node.right)
-            if type(node.op) in self.operators:
-                return self.operators[type(node.op)](left, right)
-        
-        elif isinstance(node, ast.UnaryOp):
-            operand = self._evaluate_expression(node.operand)
-            if isinstance(node.op, ast.UAdd):
-                return +operand
-            elif isinstance(node.op, ast.USub):
-                return -operand
-            elif isinstance(node.op, ast.Not):
-                return not operand
-        
-        elif isinstance(node, ast.Compare):
-            left = self._evaluate_expression(node.left)
-            for op, comparator in zip(node.ops, node.comparators):
-                right = self._evaluate_expression(comparator)
-                if type(op) in self.comparisons:
-                    if not self.comparisons[type(op)](left, right):
-                        return False
-                left = right
-            return True
-        
-        elif isinstance(node, ast.List):
-            return [self._evaluate_expression(elt) for elt in node.elts]
-        
-        elif isinstance(node, ast.Tuple):
-            return tuple(self._evaluate_expression(elt) for elt in node.elts)
-        
-        elif isinstance(node, ast.Dict):
-            keys = [self._evaluate_expression(k) for k in node.keys]
-            values = [self._evaluate_expression(v) for v in node.values]
-            return dict(zip(keys, values))
-        
-        elif isinstance(node, ast.Call):
-            return self._evaluate_function_call(node)
-        
-        elif isinstance(node, ast.JoinedStr):
-            return self._evaluate_f_string(node)
-        
-        elif isinstance(node, ast.Subscript):
-            value = self._evaluate_expression(node.value)
-            slice_value = self._evaluate_expression(node.slice)
-            return value[slice_value]
-        
-        elif isinstance(node, ast.Attribute):
-            value = self._evaluate_expression(node.value)
-            return getattr(value, node.attr)
+        handler = self._expr_dispatch.get(type(node))
+        if handler is not None:
+            return handler(node)
         
         # Return None for unsupported expressions
         return None
     
+    def _eval_constant(self, node: ast.Constant) -> Any:
+        return node.value
+    
+    def _eval_name(self, node: ast.Name) -> Any:
+        return self.variable_tracker.access(node.id)
+    
+    def _eval_pure(self, node: ast.expr) -> Any:
+        """Evaluate operator expressions with CPython's own eval loop when possible."""
+        code = node.__dict__.get('_vp_code', False)
+        if code is False:
+            # Compiled once per node; None marks nodes that must be visited
+            code = node._vp_code = _compile_pure(node)
+        if code is None:
+            return self._pure_fallback[type(node)](node)
+        return eval(code, _EVAL_GLOBALS, self._tracked_names)
+    
+    def _eval_boolop(self, node: ast.BoolOp) -> Any:
+        is_and = isinstance(node.op, ast.And)
+        value = None
+        for operand in node.values:
+            value = self._evaluate_expression(operand)
+            if bool(value) != is_and:
+                break
+        return value
+    
+    def _eval_binop(self, node: ast.BinOp) -> Any:
+        left = self._evaluate_expression(node.left)
+        right = self._evaluate_expression(node.right)
+        op = self.operators.get(type(node.op))
+        if op is not None:
+            return op(left, right)
+        return None
+    
+    def _eval_unaryop(self, node: ast.UnaryOp) -> Any:
+        operand = self._evaluate_expression(node.operand)
+        if isinstance(node.op, ast.UAdd):
+            return +operand
+        elif isinstance(node.op, ast.USub):
+            return -operand
+        elif isinstance(node.op, ast.Not):
+            return not operand
+        return None
+    
+    def _eval_compare(self, node: ast.Compare) -> bool:
+        chain = node.__dict__.get('_vp_chain')
+        if chain is None:
+            # (comparison function, comparator) pairs, resolved once per node
+            comparisons = self.comparisons
+            chain = node._vp_chain = [
+                (comparisons.get(type(op)), comparator)
+                for op, comparator in zip(node.ops, node.comparators)
+            ]
+        evaluate = self._evaluate_expression
+        left = evaluate(node.left)
+        if len(chain) == 1:
+            compare, comparator = chain[0]
+            right = evaluate(comparator)
+            return compare is None or bool(compare(left, right))
+        for compare, comparator in chain:
+            right = evaluate(comparator)
+            if compare is not None and not compare(left, right):
+                return False
+            left = right
+        return True
+    
+    def _eval_list(self, node: ast.List) -> list:
+        return [self._evaluate_expression(elt) for elt in node.elts]
+    
+    def _eval_tuple(self, node: ast.Tuple) -> tuple:
+        return tuple(self._evaluate_expression(elt) for elt in node.elts)
+    
+    def _eval_dict(self, node: ast.Dict) -> dict:
+        keys = [self._evaluate_expression(k) for k in node.keys]
+        values = [self._evaluate_expression(v) for v in node.values]
+        return dict(zip(keys, values))
+    
+    def _eval_subscript(self, node: ast.Subscript) -> Any:
+        value = self._evaluate_expression(node.value)
+        slice_value = self._evaluate_expression(node.slice)
+        return value[slice_value]
+    
+    def _eval_attribute(self, node: ast.Attribute) -> Any:
+        value = self._evaluate_expression(node.value)
+        return getattr(value, node.attr)
+    
     def _evaluate_function_call(self, node: ast.Call) -> Any:
         """Evaluate function calls"""
         if isinstance(node.func, ast.Name):
@@ -578,58 +1016,38 @@ class PythonVisualParser:
                 args = [self._evaluate_expression(arg) for arg in node.args]
                 return list(range(*args))
             
-            elif func_name == 'len':
-                if node.args:
-                    obj = self._evaluate_expression(node.args[0])
-                    return len(obj)
-            
-            elif func_name in ['str', 'int', 'float', 'bool']:
-                if node.args:
-                    obj = self._evaluate_expression(node.args[0])
-                    return eval(func_name)(obj)
-            
-            elif func_name == 'abs':
-                if node.args:
-                    obj = self._evaluate_expression(node.args[0])
-                    return abs(obj)
-            
-            elif func_name in ['min', 'max']:
+            function = _BUILTIN_DISPATCH.get(func_name)
+            if function is not None:
                 args = [self._evaluate_expression(arg) for arg in node.args]
-                return eval(func_name)(args)
+                return function(*args)
         
         return None
     
     def _evaluate_f_string(self, node: ast.JoinedStr) -> str:
         """Evaluate f-string expressions"""
-        result = ""
+        evaluate = self._evaluate_expression
+        pieces = []
+        append = pieces.append
         
-        for value in node.values:
-            if isinstance(value, ast.Constant):
-                result += str(value.value)
-            elif isinstance(value, ast.FormattedValue):
-                expr_value = self._evaluate_expression(value.value)
-                
-                # Handle format spec if present
-                if value.format_spec:
-                    format_spec = self._evaluate_expression(value.format_spec)
-                    result += f"{expr_value:{format_spec}}"
-                else:
-                    result += str(expr_value)
+        for text, expr, spec in _f_string_parts(node):
+            if expr is None:
+                append(text)
+            elif spec is None:
+                value = evaluate(expr)
+                # Text fields are the common case and need no str() call
+                append(value if type(value) is str else str(value))
+            elif type(spec) is str:
+                append(format(evaluate(expr), spec))
+            else:
+                # Nested fields in the spec, e.g. f"{x:{width}}"
+                value = evaluate(expr)
+                append(format(value, self._evaluate_f_string(spec)))
         
-        return result
+        return ''.join(pieces)
     
     def _get_operator_symbol(self, op: ast.operator) -> str:
         """Get string representation of operator"""
-        symbol_map = {
-            ast.Add: '+',
-            ast.Sub: '-',
-            ast.Mult: '*',
-            ast.Div: '/',
-            ast.FloorDiv: '//',
-            ast.Mod: '%',
-            ast.Pow: '**',
-        }
-        return symbol_map.get(type(op), '?')
+        return _op_symbol(type(op))
     
     def get_parser_statistics(self) -> Dict[str, Any]:
         """Get parsing statistics"""
@@ -637,7 +1055,7 @@ class PythonVisualParser:
             'variable_stats': self.variable_tracker.get_statistics(),
             'supported_operations': len(self.operators) + len(self.comparisons),
             'variables_current': dict(self.variable_tracker.variables),
-            'assignment_history': self.variable_tracker.assignments[-10:]  # Last 10
+            'assignment_history': self.variable_tracker.recent_assignments()
         }
 
 
@@ -0,0 +1,261 @@
+"""
+Optional NumPy vectorization for parser range loops.
+
+A loop whose body only assigns numeric expressions of the loop variable
+and loop-invariant names has no state carried between iterations, so
+every iteration can be computed at once over an array of loop values.
+The parser then replays the per-iteration values as visual elements,
+so output is identical to the interpreted path.
+
+Everything here is optional: without NumPy installed ``plan_vector_loop``
+is never consulted and the parser interprets loops as before. NumPy is
+only imported when the first loop is vectorized, keeping it off the
+cold-start path of every live reload.
+"""
+
+import ast
+import operator
+from importlib.util import find_spec
+from typing import Any, Dict, List, Optional, Tuple
+
+# Optional numpy support for loop vectorization; probed here, imported lazily
+NUMPY_AVAILABLE = find_spec('numpy') is not None
+np = None
+
+
+def _load_numpy() -> bool:
+    """Import numpy on first use; False if that fails."""
+    global np, NUMPY_AVAILABLE
+    if np is None:
+        try:
+            import numpy as numpy_module
+        except ImportError:
+            NUMPY_AVAILABLE = False
+            return False
+        np = numpy_module
+    return True
+
+# Values are computed as float64; beyond this ints are no longer exact
+_INT_LIMIT = 2.0 ** 53
+
+_ARITH = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+}
+_DIVIDING = (ast.Div, ast.FloorDiv, ast.Mod)
+_UNARY = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+# Built-in name -> number of positional arguments accepted
+_CALLS = {'min': 2, 'max': 2, 'abs': 1}
+
+
+def _is_vectorizable(expr: ast.expr) -> bool:
+    """True if expr only uses numeric constants, names, arithmetic and min/max/abs."""
+    if isinstance(expr, ast.Constant):
+        return type(expr.value) in (int, float)
+    if isinstance(expr, ast.Name):
+        return True
+    if isinstance(expr, ast.BinOp):
+        return (type(expr.op) in _ARITH
+                and _is_vectorizable(expr.left) and _is_vectorizable(expr.right))
+    if isinstance(expr, ast.UnaryOp):
+        return type(expr.op) in _UNARY and _is_vectorizable(expr.operand)
+    if isinstance(expr, ast.Call):
+        return (isinstance(expr.func, ast.Name) and not expr.keywords
+                and _CALLS.get(expr.func.id) == len(expr.args)
+                and all(_is_vectorizable(arg) for arg in expr.args))
+    return False
+
+
+def read_names(expr: ast.expr) -> List[str]:
+    """Variable names expr reads, once per occurrence; called functions excluded."""
+    if isinstance(expr, ast.Name):
+        return [expr.id]
+    if isinstance(expr, ast.Call):
+        children = expr.args
+    else:
+        children = list(ast.iter_child_nodes(expr))
+    names = []
+    for child in children:
+        names.extend(read_names(child))
+    return names
+
+
+def plan_vector_loop(node: ast.For) -> Optional[List[Tuple[str, ast.expr]]]:
+    """
+    Return the body as [(target, value_expr)] if it can be vectorized.
+
+    Only single-name assignments are accepted, and no statement may read
+    a name that it or a later statement assigns: that value would come
+    from the previous iteration.
+    """
+    if not isinstance(node.target, ast.Name) or not node.body or node.orelse:
+        return None
+
+    loop_var = node.target.id
+    plan = []
+    for statement in node.body:
+        if not (isinstance(statement, ast.Assign) and len(statement.targets) == 1
+                and isinstance(statement.targets[0], ast.Name)):
+            return None
+        target = statement.targets[0].id
+        if target == loop_var or not _is_vectorizable(statement.value):
+            return None
+        plan.append((target, statement.value))
+
+    for index, (_, expr) in enumerate(plan):
+        pending = {target for target, _ in plan[index:]}
+        if pending.intersection(read_names(expr)):
+            return None
+    return plan
+
+
+def read_names_of_plan(plan: List[Tuple[str, ast.expr]]) -> List[str]:
+    """Every name read by the plan, once per occurrence, in plan order."""
+    names = []
+    for _, expr in plan:
+        names.extend(read_names(expr))
+    return names
+
+
+def _int_constant(expr: ast.expr) -> Optional[int]:
+    """Value of an int literal such as 255 or -1, else None."""
+    if isinstance(expr, ast.UnaryOp) and isinstance(expr.op, ast.USub):
+        value = _int_constant(expr.operand)
+        return None if value is None else -value
+    if isinstance(expr, ast.Constant) and type(expr.value) is int:
+        return expr.value
+    return None
+
+
+def _clamp_bounds(expr: ast.Call) -> Optional[Tuple[int, int, ast.expr]]:
+    """
+    Match min(hi, max(lo, x)) with int literal bounds, in either argument
+    order, and return (lo, hi, x).
+    """
+    if expr.func.id != 'min':
+        return None
+    for outer, inner_call in (expr.args, reversed(expr.args)):
+        upper = _int_constant(outer)
+        if (upper is None or not isinstance(inner_call, ast.Call)
+                or not isinstance(inner_call.func, ast.Name) or inner_call.func.id != 'max'):
+            continue
+        first, second = inner_call.args
+        lower = _int_constant(first)
+        if lower is not None:
+            return lower, upper, second
+        lower = _int_constant(second)
+        if lower is not None:
+            return lower, upper, first
+    return None
+
+
+class _Bail(Exception):
+    """Raised when a value would differ from the interpreter's."""
+
+
+def _evaluate(expr: ast.expr, env: Dict[str, Tuple[Any, str]]) -> Tuple[Any, str]:
+    """Return (scalar or array, kind) with kind 'i' for int and 'f' for float."""
+    if isinstance(expr, ast.Constant):
+        if type(expr.value) is float:
+            return expr.value, 'f'
+        if abs(expr.value) >= _INT_LIMIT:
+            raise _Bail()
+        return float(expr.value), 'i'
+    if isinstance(expr, ast.Name):
+        return env[expr.id]
+    if isinstance(expr, ast.UnaryOp):
+        value, kind = _evaluate(expr.operand, env)
+        return _UNARY[type(expr.op)](value), kind
+
+    if isinstance(expr, ast.Call):
+        name = expr.func.id
+        clamp = _clamp_bounds(expr)
+        if clamp is not None:
+            lower, upper, inner = clamp
+            value, kind = _evaluate(inner, env)
+            if kind == 'i' and max(abs(lower), abs(upper)) < _INT_LIMIT:
+                # min(hi, max(lo, x)) on ints is a saturating clamp
+                return np.clip(value, lower, upper), kind
+        args = [_evaluate(arg, env) for arg in expr.args]
+        if name == 'abs':
+            value, kind = args[0]
+            return np.abs(value), kind
+        (left, left_kind), (right, right_kind) = args
+        if left_kind != right_kind:
+            # min(3, 2.5) returns whichever argument wins, so the type varies
+            raise _Bail()
+        if left_kind == 'i':
+            # Equal ints are indistinguishable, so either side may win a tie
+            return (np.minimum if name == 'min' else np.maximum)(left, right), left_kind
+        # Mirrors the builtins for floats (signed zeros): the first argument
+        # wins unless the second is strictly smaller (min) or larger (max)
+        wins = right < left if name == 'min' else right > left
+        return np.where(wins, right, left), left_kind
+
+    left, left_kind = _evaluate(expr.left, env)
+    right, right_kind = _evaluate(expr.right, env)
+    if isinstance(expr.op, _DIVIDING) and np.any(right == 0):
+        # The interpreter reports ZeroDivisionError; let it
+        raise _Bail()
+    kind = 'f' if isinstance(expr.op, ast.Div) or 'f' in (left_kind, right_kind) else 'i'
+    value = _ARITH[type(expr.op)](left, right)
+    if kind == 'i' and np.any(np.abs(value) >= _INT_LIMIT):
+        raise _Bail()
+    return value, kind
+
+
+def run_vector_loop(plan: List[Tuple[str, ast.expr]], loop_var: str,
+                    items: List[int], variables: Dict[str, Any]) -> Optional[List[Any]]:
+    """
+    Compute every assigned value in execution order, or None if the
+    interpreter must run the loop (missing or non-numeric inputs, a zero
+    divisor, ints too large for float64, or non-finite floats).
+    """
+    if not items or max(abs(items[0]), abs(items[-1])) >= _INT_LIMIT:
+        return None
+    if not _load_numpy():
+        return None
+    env = {loop_var: (np.array(items, dtype=np.float64), 'i')}
+    targets = {target for target, _ in plan}
+    for name in read_names_of_plan(plan):
+        if name in env or name in targets:
+            # Targets are only read after this iteration assigned them
+            continue
+        if name not in variables:
+            return None
+        value = variables[name]
+        if type(value) is int:
+            if abs(value) >= _INT_LIMIT:
+                return None
+            env[name] = (float(value), 'i')
+        elif type(value) is float:
+            env[name] = (value, 'f')
+        else:
+            return None
+
+    count = len(items)
+    columns = []
+    try:
+        with np.errstate(all='ignore'):
+            for target, expr in plan:
+                value, kind = _evaluate(expr, env)
+                value = np.broadcast_to(value, (count,))
+                if kind == 'f' and not np.all(np.isfinite(value)):
+                    return None
+                env[target] = (value, kind)
+                column = value.tolist()
+                if kind == 'i':
+                    column = [int(v) for v in column]
+                columns.append(column)
+    except _Bail:
+        return None
+
+    # Interleave columns into iteration-major order
+    return [value for row in zip(*columns) for value in row]
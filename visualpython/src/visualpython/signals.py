@@ -8,11 +8,27 @@ and other hardware control applications.
 import csv
 import time
 import os
+from array import array
 from typing import List, Dict, Any, Optional, Union
 from dataclasses import dataclass
 from pathlib import Path
 
 
+# Coordinates are stored as signed 64-bit ints; anything past that is far off-screen
+COORD_MIN = -(1 << 63)
+COORD_MAX = (1 << 63) - 1
+
+
+def clamp_coord(value: Union[int, float]) -> int:
+    """Clamp a screen coordinate into the range of an array('q') column."""
+    value = int(value)
+    if value > COORD_MAX:
+        return COORD_MAX
+    if value < COORD_MIN:
+        return COORD_MIN
+    return value
+
+
 @dataclass
 class SignalData:
     """Represents a single signal data point for hardware export."""
@@ -43,6 +59,145 @@ class SignalData:
         }
 
 
+class SignalBuffer:
+    """
+    Column-oriented signal store used by the engine.
+    
+    Signals are kept as parallel columns (struct of arrays) instead of one
+    SignalData per operation; SignalData objects are only built when the
+    buffer is iterated.
+    """
+    
+    FIELDNAMES = ['timestamp', 'operation', 'x', 'y', 'r', 'g', 'b',
+                  'variable', 'value', 'metadata']
+    
+    def __init__(self):
+        self.timestamps = array('d')
+        self.operations: List[str] = []
+        self.xy = array('q')    # interleaved x, y
+        self.rgb = array('B')   # interleaved r, g, b
+        self.variables: List[str] = []
+        self.values: List[Union[int, float, str]] = []
+    
+    def append(self, timestamp: float, operation: str, x: int, y: int,
+               r: int, g: int, b: int, variable: str, value: Union[int, float, str]):
+        """Record one signal."""
+        # Convert before touching any column so a bad coordinate leaves them aligned
+        x, y = clamp_coord(x), clamp_coord(y)
+        self.timestamps.append(timestamp)
+        self.operations.append(operation)
+        self.xy.append(x)
+        self.xy.append(y)
+        self.rgb.append(r)
+        self.rgb.append(g)
+        self.rgb.append(b)
+        self.variables.append(variable)
+        self.values.append(value)
+    
+    def clear(self):
+        """Drop all recorded signals."""
+        del self.timestamps[:]
+        del self.operations[:]
+        del self.xy[:]
+        del self.rgb[:]
+        del self.variables[:]
+        del self.values[:]
+    
+    def copy(self) -> 'SignalBuffer':
+        """Independent copy of every column."""
+        duplicate = SignalBuffer()
+        duplicate.timestamps = self.timestamps[:]
+        duplicate.operations = self.operations[:]
+        duplicate.xy = self.xy[:]
+        duplicate.rgb = self.rgb[:]
+        duplicate.variables = self.variables[:]
+        duplicate.values = self.values[:]
+        return duplicate
+    
+    def __len__(self) -> int:
+        return len(self.operations)
+    
+    def __getitem__(self, index: int) -> SignalData:
+        """Build the SignalData view of a single signal."""
+        count = len(self.operations)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError('signal index out of range')
+        xy, rgb = self.xy, self.rgb
+        return SignalData(
+            timestamp=self.timestamps[index],
+            operation=self.operations[index],
+            x=xy[2 * index],
+            y=xy[2 * index + 1],
+            r=rgb[3 * index],
+            g=rgb[3 * index + 1],
+            b=rgb[3 * index + 2],
+            variable=self.variables[index],
+            value=self.values[index]
+        )
+    
+    def __iter__(self):
+        """Yield each signal as a SignalData view."""
+        xy, rgb = self.xy, self.rgb
+        for i, (timestamp, operation, variable, value) in enumerate(
+                zip(self.timestamps, self.operations, self.variables, self.values)):
+            yield SignalData(
+                timestamp=timestamp,
+                operation=operation,
+                x=xy[2 * i],
+                y=xy[2 * i + 1],
+                r=rgb[3 * i],
+                g=rgb[3 * i + 1],
+                b=rgb[3 * i + 2],
+                variable=variable,
+                value=value
+            )
+    
+    def rows(self):
+        """Yield CSV rows (FIELDNAMES order) straight from the columns."""
+        xy, rgb = self.xy, self.rgb
+        for i, (timestamp, operation, variable, value) in enumerate(
+                zip(self.timestamps, self.operations, self.variables, self.values)):
+            yield (timestamp, operation, xy[2 * i], xy[2 * i + 1],
+                   rgb[3 * i], rgb[3 * i + 1], rgb[3 * i + 2], variable, value, '')
+    
+    def export_csv(self, filename: str) -> bool:
+        """Export signals to CSV in the same layout as AnalogSignalExporter."""
+        if not self.operations:
+            return False
+        try:
+            with open(filename, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(self.FIELDNAMES)
+                writer.writerows(self.rows())
+            return True
+        except Exception as e:
+            print(f"❌ Error exporting CSV: {e}")
+            return False
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get statistics about the buffered signals."""
+        if not self.operations:
+            return {}
+        
+        operations = {}
+        for operation in self.operations:
+            operations[operation] = operations.get(operation, 0) + 1
+        variables = set(self.variables)
+        time_range = (self.timestamps[0], self.timestamps[-1])
+        
+        return {
+            'total_signals': len(self.operations),
+            'operations': operations,
+            'unique_variables': len(variables),
+            'variables': list(variables),
+            'time_range_seconds': time_range[1] - time_range[0],
+            'start_time': time_range[0],
+            'end_time': time_range[1]
+        }
+
+
 class AnalogSignalExporter:
     """
     Exports VisualPython signals to various formats for hardware integration.
@@ -405,39 +560,45 @@ class HardwareSignalController:
 
 # Convenience functions for easy usage
 
-def export_signals(signals: List[Any], filename: str = "signals.csv") -> bool:
+def export_signals(signals: Union[List[Any], SignalBuffer], filename: str = "signals.csv") -> bool:
     """
     Export VisualPython signals to CSV format.
     
     Args:
-        signals: List of signal data (can be raw lists or SignalData objects)
+        signals: List of signal data (can be raw lists or SignalData objects),
+            or a SignalBuffer
         filename: Output filename
         
     Returns:
         True if export successful
     """
-    exporter = AnalogSignalExporter()
-    
-    # Convert raw signals to SignalData objects if needed
-    for signal in signals:
-        if isinstance(signal, SignalData):
-            exporter.add_signal(signal)
-        elif isinstance(signal, (list, tuple)) and len(signal) >= 9:
-            # Convert from raw list format [timestamp, operation, x, y, r, g, b, variable, value]
-            signal_data = SignalData(
-                timestamp=signal[0],
-                operation=signal[1],
-                x=signal[2],
-                y=signal[3],
-                r=signal[4],
-                g=signal[5],
-                b=signal[6],
-                variable=signal[7],
-                value=signal[8]
-            )
-            exporter.add_signal(signal_data)
-    
-    success = exporter.export_csv(filename)
+    if isinstance(signals, SignalBuffer):
+        # Column-parallel fast path; no per-signal objects
+        exporter = signals
+        success = signals.export_csv(filename)
+    else:
+        exporter = AnalogSignalExporter()
+        
+        # Convert raw signals to SignalData objects if needed
+        for signal in signals:
+            if isinstance(signal, SignalData):
+                exporter.add_signal(signal)
+            elif isinstance(signal, (list, tuple)) and len(signal) >= 9:
+                # Convert from raw list format [timestamp, operation, x, y, r, g, b, variable, value]
+                signal_data = SignalData(
+                    timestamp=signal[0],
+                    operation=signal[1],
+                    x=signal[2],
+                    y=signal[3],
+                    r=signal[4],
+                    g=signal[5],
+                    b=signal[6],
+                    variable=signal[7],
+                    value=signal[8]
+                )
+                exporter.add_signal(signal_data)
+        
+        success = exporter.export_csv(filename)
     
     if success:
         stats = exporter.get_statistics()
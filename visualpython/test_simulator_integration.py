@@ -6,7 +6,6 @@ This tests the direct Python-to-pixels pipeline using the headless simulator.
 """
 
 import sys
-import os
 from pathlib import Path
 
 # Add the src directory to the path so we can import VisualPython
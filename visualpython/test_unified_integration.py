@@ -9,78 +9,66 @@ This test validates the complete headless simulator + CSV pipeline:
 - Round-trip fidelity
 - Live watching capability
 
-Run from the visualpython directory:
-    python test_unified_integration.py
+Every test works in its own ``tmp_path``, so the suite runs in parallel
+with pytest-xdist. Run from the visualpython directory:
+    pytest -n auto test_unified_integration.py
 """
 
+import io
 import os
+import subprocess
 import sys
-import tempfile
-import shutil
-import time
-import hashlib
+from operator import attrgetter
 from pathlib import Path
 
+import pytest
+
+from unittest.mock import Mock
+
 # Add visualpython to path
 current_dir = Path(__file__).parent
 sys.path.insert(0, str(current_dir / "src"))
 
-try:
-    from visualpython.core import VisualPythonEngine
-    from visualpython.backends import create_backend, RecordRenderer, csv_play
-    print("✅ Successfully imported VisualPython modules")
-except ImportError as e:
-    print(f"❌ Failed to import VisualPython modules: {e}")
-    sys.exit(1)
-
-
-class IntegrationTester:
-    """Comprehensive test suite for VisualPython Unified"""
-    
-    def __init__(self):
-        self.passed = 0
-        self.failed = 0
-        self.temp_dir = None
-    
-    def setup(self):
-        """Set up test environment"""
-        self.temp_dir = Path(tempfile.mkdtemp(prefix="vp_test_"))
-        print(f"📁 Test directory: {self.temp_dir}")
-    
-    def cleanup(self):
-        """Clean up test environment"""
-        if self.temp_dir and self.temp_dir.exists():
-            shutil.rmtree(self.temp_dir)
-            print(f"🧹 Cleaned up {self.temp_dir}")
-    
-    def run_test(self, name, test_func):
-        """Run a single test with error handling"""
-        print(f"\n🧪 Testing: {name}")
-        try:
-            test_func()
-            print(f"✅ {name} PASSED")
-            self.passed += 1
-        except Exception as e:
-            print(f"❌ {name} FAILED: {e}")
-            self.failed += 1
-            import traceback
-            traceback.print_exc()
-    
-    def test_simulator_backend_creation(self):
-        """Test creating SimRenderer backend"""
-        backend = create_backend('simulator', width=200, height=150, out_dir=str(self.temp_dir / 'frames'))
-        assert hasattr(backend, 'w') and backend.w == 200
-        assert hasattr(backend, 'h') and backend.h == 150
-        assert hasattr(backend, 'clear')
-        assert hasattr(backend, 'rect')
-        assert hasattr(backend, 'text')
-        assert hasattr(backend, 'commit')
-    
-    def test_basic_rendering(self):
-        """Test basic rendering operations"""
-        frames_dir = self.temp_dir / 'basic_frames'
-        backend = create_backend('simulator', width=200, height=150, out_dir=str(frames_dir))
-        
+import visualpython.backends as backends_module
+from visualpython.backends import acquire_backend, create_backend, RecordRenderer, csv_play, _Pacer
+from visualpython.mock_backend import SimRenderer
+
+# Frames are only counted or compared here, so skip PNG encoding
+pytestmark = pytest.mark.usefixtures("ppm_frames")
+
+
+def _sorted_entries(d):
+    """DirEntry objects of d by name; the scandir handle is closed on return"""
+    with os.scandir(d) as entries:
+        return sorted(entries, key=attrgetter("name"))
+
+
+def _frame_pixels(path):
+    """Raw RGB bytes of a saved frame, without file headers or metadata"""
+    if path.endswith(".ppm"):
+        # SimRenderer writes the whole P6 header on a single line
+        data = Path(path).read_bytes()
+        return data[data.index(b"\n") + 1:]
+    # PNG frames are only written when Pillow is installed
+    from PIL import Image
+    with Image.open(path) as im:
+        return im.convert("RGB").tobytes()
+
+
+def test_simulator_backend_creation(frames_dir):
+    """Test creating SimRenderer backend"""
+    backend = create_backend('simulator', width=200, height=150, out_dir=str(frames_dir))
+    assert hasattr(backend, 'w') and backend.w == 200
+    assert hasattr(backend, 'h') and backend.h == 150
+    assert hasattr(backend, 'clear')
+    assert hasattr(backend, 'rect')
+    assert hasattr(backend, 'text')
+    assert hasattr(backend, 'commit')
+
+
+def test_basic_rendering(frames_dir, count_frames):
+    """Test basic rendering operations"""
+    with acquire_backend(200, 150, frames_dir) as backend:
         # Draw simple scene
         backend.clear("#001100")
         backend.rect(50, 25, 100, 50, 255, 0, 0)
@@ -89,20 +77,383 @@ class IntegrationTester:
         
         backend.set_pixel(75, 75, 0, 255, 0)
         backend.commit()
+    
+    # Verify frames were created
+    frame_count = count_frames(frames_dir)
+    assert frame_count >= 2, f"Expected at least 2 frames, got {frame_count}"
+
+
+def test_csv_recording(tmp_path, frames_dir):
+    """Test CSV recording functionality"""
+    csv_path = tmp_path / 'recording.csv'
+    
+    # Create base backend
+    with acquire_backend(200, 150, frames_dir) as base_backend:
+        # Wrap with recorder
+        recorder = RecordRenderer(base_backend, str(csv_path))
         
-        # Verify frames were created
-        frame_files = list(frames_dir.glob("*.png")) + list(frames_dir.glob("*.ppm"))
-        assert len(frame_files) >= 2, f"Expected at least 2 frames, got {len(frame_files)}"
+        # Perform operations
+        recorder.clear("#002200")
+        recorder.rect(10, 10, 50, 30, 100, 150, 200)
+        recorder.text(15, 20, "RECORD", 255, 255, 255)
+        recorder.commit()
         
-        print(f"   Generated {len(frame_files)} frame files")
-    
-    def test_csv_recording(self):
-        """Test CSV recording functionality"""
-        frames_dir = self.temp_dir / 'record_frames'
-        csv_path = self.temp_dir / 'recording.csv'
+        recorder.set_pixel(80, 80, 255, 0, 255)
+        recorder.commit()
         
-        # Create base backend
-        base_backend = create_backend('simulator', width=200, height=150, out_dir=str(frames_dir))
+        # Close recorder
+        recorder.close()
+    
+    # Verify CSV was created and has content
+    assert csv_path.exists(), "CSV file not created"
+    
+    content = csv_path.read_bytes()
+    assert b"CLEAR" in content
+    assert b"RECT" in content
+    assert b"TEXT" in content
+    assert b"PIXEL" in content
+    assert b"COMMIT" in content
+    assert b"RECORD" in content
+
+
+def test_csv_recording_buffers_until_cleanup(tmp_path):
+    """Rows are written in bulk when the recorder is cleaned up, not per row"""
+    csv_path = tmp_path / 'buffered.csv'
+    recorder = RecordRenderer(Mock(), str(csv_path))
+    for x in range(100):
+        recorder.set_pixel(x, 0, 255, 0, 0)
+    recorder.commit()
+    
+    assert csv_path.read_bytes() == b"", "rows should still be buffered"
+    recorder.cleanup()
+    
+    assert csv_path.read_bytes().count(b"PIXEL") == 100
+    recorder.wrapped.cleanup.assert_called_once_with()
+
+
+def test_csv_recording_leaves_stream_open():
+    """A recorder given an open stream flushes it on close but leaves it open"""
+    stream = io.StringIO()
+    recorder = RecordRenderer(Mock(), stream)
+    recorder.rect(1, 2, 3, 4, 5, 6, 7)
+    recorder.close()
+    
+    assert not stream.closed
+    assert "RECT,1,2,3,4,5,6,7," in stream.getvalue()
+
+
+def test_csv_recording_writes_rows_in_batches():
+    """Rows are formatted a batch or a frame at a time, not per draw call"""
+    stream = io.StringIO()
+    recorder = RecordRenderer(Mock(), stream)
+    header = stream.getvalue()
+    
+    recorder.set_pixel(1, 2, 3, 4, 5)
+    recorder.text(6, 7, "a,b", 8, 9, 10)
+    assert stream.getvalue() == header, "rows should wait for the frame to end"
+    
+    recorder.commit()
+    assert stream.getvalue() == header + (
+        "0,PIXEL,1,2,,,3,4,5,\r\n"
+        '0,TEXT,6,7,,,8,9,10,"a,b"\r\n'
+        "0,COMMIT,,,,,,,,\r\n"
+    )
+    
+    for x in range(backends_module.RECORD_BATCH_ROWS):
+        recorder.set_pixel(x, 0, 0, 0, 0)
+    assert stream.getvalue().count("PIXEL") == 1 + backends_module.RECORD_BATCH_ROWS
+
+
+def test_recorded_calls_replay_without_csv():
+    """Kept draw calls replay onto another renderer like the CSV would"""
+    recorder = RecordRenderer(Mock(), io.StringIO(), keep=3)
+    recorder.clear("#002200")
+    recorder.set_pixel(1, 2, 3, 4, 5)
+    recorder.commit()
+    recorder.text(6, 7, "HI", 8, 9, 10)
+    
+    recorded = recorder.get_recorded()
+    assert recorded == [
+        (0, "SET_PIXEL", (1, 2, 3, 4, 5)),
+        (0, "COMMIT", ()),
+        (1, "TEXT", (6, 7, "HI", 8, 9, 10)),
+    ]
+    
+    replayed = Mock()
+    for _, op, args in recorded:
+        getattr(replayed, op.lower())(*args)
+    assert replayed.mock_calls == recorder.wrapped.mock_calls[1:]
+    assert RecordRenderer(Mock(), io.StringIO()).get_recorded() == []
+
+
+def test_csv_playback(frames_dir, count_frames):
+    """Test CSV playback functionality"""
+    csv_content = '''frame,op,x,y,w,h,r,g,b,text
+0,CLEAR,,,,,,0,34,0,
+0,RECT,40,20,80,60,50,100,200,
+0,TEXT,50,30,,,,255,255,255,PLAY
+0,COMMIT,,,,,,,,
+1,PIXEL,100,100,,,255,128,0,
+1,COMMIT,,,,,,,,'''
+    
+    # Play CSV straight from memory
+    with acquire_backend(200, 150, frames_dir) as backend:
+        csv_play(backend, io.StringIO(csv_content))
+    
+    # Verify frames were created
+    frame_count = count_frames(frames_dir)
+    assert frame_count >= 2, f"Expected at least 2 frames, got {frame_count}"
+
+
+def test_round_trip_fidelity(tmp_path):
+    """Test that record->playback produces identical results"""
+    # Step 1: Record a sequence
+    frames_dir1 = tmp_path / 'round_trip_1'
+    csv_path = tmp_path / 'round_trip.csv'
+    
+    with acquire_backend(150, 100, frames_dir1) as base1:
+        recorder = RecordRenderer(base1, str(csv_path))
         
-        # Wrap with recorder
-        recorder = RecordRenderer(base_backend, str(csv_path))\n        \n        # Perform operations\n        recorder.clear(\"#002200\")\n        recorder.rect(10, 10, 50, 30, 100, 150, 200)\n        recorder.text(15, 20, \"RECORD\", 255, 255, 255)\n        recorder.commit()\n        \n        recorder.set_pixel(80, 80, 255, 0, 255)\n        recorder.commit()\n        \n        # Close recorder\n        recorder.close()\n        \n        # Verify CSV was created and has content\n        assert csv_path.exists(), \"CSV file not created\"\n        \n        with open(csv_path, 'r') as f:\n            content = f.read()\n            assert \"CLEAR\" in content\n            assert \"RECT\" in content  \n            assert \"TEXT\" in content\n            assert \"PIXEL\" in content\n            assert \"COMMIT\" in content\n            assert \"RECORD\" in content\n        \n        print(f\"   CSV recording successful: {len(content)} characters\")\n    \n    def test_csv_playback(self):\n        \"\"\"Test CSV playback functionality\"\"\"\n        # Create test CSV\n        csv_path = self.temp_dir / 'test_playback.csv'\n        csv_content = '''frame,op,x,y,w,h,r,g,b,text\n0,CLEAR,,,,,,0,34,0,\n0,RECT,40,20,80,60,50,100,200,\n0,TEXT,50,30,,,,255,255,255,PLAY\n0,COMMIT,,,,,,,,\n1,PIXEL,100,100,,,255,128,0,\n1,COMMIT,,,,,,,,'''\n        \n        with open(csv_path, 'w') as f:\n            f.write(csv_content)\n        \n        # Play CSV\n        frames_dir = self.temp_dir / 'playback_frames'\n        backend = create_backend('simulator', width=200, height=150, out_dir=str(frames_dir))\n        csv_play(backend, str(csv_path))\n        \n        # Verify frames were created\n        frame_files = list(frames_dir.glob(\"*.png\")) + list(frames_dir.glob(\"*.ppm\"))\n        assert len(frame_files) >= 2, f\"Expected at least 2 frames, got {len(frame_files)}\"\n        \n        print(f\"   CSV playback successful: {len(frame_files)} frames\")\n    \n    def test_round_trip_fidelity(self):\n        \"\"\"Test that record->playback produces identical results\"\"\"\n        # Step 1: Record a sequence\n        frames_dir1 = self.temp_dir / 'round_trip_1'\n        csv_path = self.temp_dir / 'round_trip.csv'\n        \n        base1 = create_backend('simulator', width=150, height=100, out_dir=str(frames_dir1))\n        recorder = RecordRenderer(base1, str(csv_path))\n        \n        # Create deterministic sequence\n        recorder.clear(\"#000000\")\n        recorder.rect(0, 0, 50, 50, 255, 255, 255)\n        recorder.commit()\n        recorder.close()\n        \n        # Step 2: Play back the CSV\n        frames_dir2 = self.temp_dir / 'round_trip_2'\n        base2 = create_backend('simulator', width=150, height=100, out_dir=str(frames_dir2))\n        csv_play(base2, str(csv_path))\n        \n        # Step 3: Compare frame files\n        files1 = sorted(frames_dir1.glob(\"*\"))\n        files2 = sorted(frames_dir2.glob(\"*\"))\n        \n        assert len(files1) == len(files2), f\"Frame count mismatch: {len(files1)} vs {len(files2)}\"\n        \n        # Compare file sizes (exact pixel comparison would require image parsing)\n        for f1, f2 in zip(files1, files2):\n            size1 = f1.stat().st_size\n            size2 = f2.stat().st_size\n            # Allow small differences due to timestamp metadata\n            assert abs(size1 - size2) < 100, f\"Frame size mismatch: {size1} vs {size2}\"\n        \n        print(f\"   Round-trip fidelity verified: {len(files1)} frames\")\n    \n    def test_frame_batching(self):\n        \"\"\"Test that operations in same frame are batched together\"\"\"\n        csv_path = self.temp_dir / 'batch_test.csv'\n        frames_dir = self.temp_dir / 'batch_frames'\n        \n        # Create CSV with multiple ops per frame\n        csv_content = '''frame,op,x,y,w,h,r,g,b,text\n5,CLEAR,,,,,,10,10,10,\n5,RECT,10,10,30,20,255,0,0,\n5,RECT,50,10,30,20,0,255,0,\n5,TEXT,15,15,,,,255,255,255,A\n5,TEXT,55,15,,,,255,255,255,B\n5,COMMIT,,,,,,,,\n7,PIXEL,100,50,,,0,0,255,\n7,PIXEL,101,50,,,0,0,255,\n7,COMMIT,,,,,,,,'''\n        \n        with open(csv_path, 'w') as f:\n            f.write(csv_content)\n        \n        # Play and verify only 2 frames created (5 and 7)\n        backend = create_backend('simulator', width=200, height=100, out_dir=str(frames_dir))\n        csv_play(backend, str(csv_path))\n        \n        frame_files = sorted(frames_dir.glob(\"*\"))\n        assert len(frame_files) == 2, f\"Expected 2 frames, got {len(frame_files)}\"\n        \n        print(f\"   Frame batching verified: {len(frame_files)} frames from 2 commit operations\")\n    \n    def test_error_handling(self):\n        \"\"\"Test error handling in various scenarios\"\"\"\n        # Test with invalid CSV\n        invalid_csv = self.temp_dir / 'invalid.csv'\n        with open(invalid_csv, 'w') as f:\n            f.write(\"invalid,csv,content\\n1,BADOP,x,y\")\n        \n        # Should not crash\n        frames_dir = self.temp_dir / 'error_frames'\n        backend = create_backend('simulator', width=100, height=100, out_dir=str(frames_dir))\n        \n        try:\n            csv_play(backend, str(invalid_csv))\n            # Should handle gracefully\n        except Exception:\n            pass  # Expected for invalid content\n        \n        print(\"   Error handling verified\")\n    \n    def print_summary(self):\n        \"\"\"Print test results summary\"\"\"\n        total = self.passed + self.failed\n        print(f\"\\n📊 Integration Test Results\")\n        print(f\"=\"*50)\n        print(f\"✅ Passed: {self.passed}\")\n        print(f\"❌ Failed: {self.failed}\")\n        print(f\"📈 Success Rate: {(self.passed/total*100):.1f}%\" if total > 0 else \"No tests run\")\n        \n        if self.failed == 0:\n            print(\"\\n🎉 All integration tests passed!\")\n            print(\"VisualPython Unified simulator is ready for production use.\")\n        else:\n            print(f\"\\n⚠️  {self.failed} test(s) failed. Please review the errors above.\")\n        \n        return self.failed == 0\n\n\ndef main():\n    \"\"\"Run the complete integration test suite\"\"\"\n    print(\"🚀 VisualPython Unified Integration Test Suite\")\n    print(\"=\"*60)\n    \n    tester = IntegrationTester()\n    \n    try:\n        tester.setup()\n        \n        # Core functionality tests\n        tester.run_test(\"Simulator Backend Creation\", tester.test_simulator_backend_creation)\n        tester.run_test(\"Basic Rendering Operations\", tester.test_basic_rendering)\n        tester.run_test(\"CSV Recording\", tester.test_csv_recording)\n        tester.run_test(\"CSV Playback\", tester.test_csv_playback)\n        tester.run_test(\"Round-Trip Fidelity\", tester.test_round_trip_fidelity)\n        tester.run_test(\"Frame Batching\", tester.test_frame_batching)\n        tester.run_test(\"Error Handling\", tester.test_error_handling)\n        \n        # Print final results\n        success = tester.print_summary()\n        \n    finally:\n        tester.cleanup()\n    \n    return 0 if success else 1\n\n\nif __name__ == \"__main__\":\n    sys.exit(main())"
\ No newline at end of file
+        # Create deterministic sequence
+        recorder.clear("#000000")
+        recorder.rect(0, 0, 50, 50, 255, 255, 255)
+        recorder.commit()
+        recorder.close()
+    
+    # Step 2: Play back the CSV (reusing the pooled backend from step 1)
+    frames_dir2 = tmp_path / 'round_trip_2'
+    with acquire_backend(150, 100, frames_dir2) as base2:
+        csv_play(base2, str(csv_path))
+    
+    # Step 3: Compare frame files
+    files1 = _sorted_entries(frames_dir1)
+    files2 = _sorted_entries(frames_dir2)
+    
+    assert len(files1) == len(files2), f"Frame count mismatch: {len(files1)} vs {len(files2)}"
+    
+    # Compare decoded pixels exactly; file sizes could hide real differences
+    for f1, f2 in zip(files1, files2):
+        assert _frame_pixels(f1.path) == _frame_pixels(f2.path), \
+               f"Frame pixels differ: {f1.name} vs {f2.name}"
+
+
+def test_frame_batching(frames_dir, count_frames):
+    """Test that operations in same frame are batched together"""
+    # Create CSV with multiple ops per frame
+    csv_content = '''frame,op,x,y,w,h,r,g,b,text
+5,CLEAR,,,,,,10,10,10,
+5,RECT,10,10,30,20,255,0,0,
+5,RECT,50,10,30,20,0,255,0,
+5,TEXT,15,15,,,,255,255,255,A
+5,TEXT,55,15,,,,255,255,255,B
+5,COMMIT,,,,,,,,
+7,PIXEL,100,50,,,0,0,255,
+7,PIXEL,101,50,,,0,0,255,
+7,COMMIT,,,,,,,,'''
+    
+    # Play and verify only 2 frames created (5 and 7)
+    with acquire_backend(200, 100, frames_dir) as backend:
+        csv_play(backend, io.StringIO(csv_content))
+    
+    frame_count = count_frames(frames_dir)
+    assert frame_count == 2, f"Expected 2 frames, got {frame_count}"
+
+
+def test_csv_playback_streams_frames():
+    """Test each frame is committed before later rows are read"""
+    csv_content = '''frame,op,x,y,w,h,r,g,b,text
+1,CLEAR,,,,,0,0,0,
+1,RECT,0,0,4,4,255,0,0,
+2,PIXEL,1,1,,,0,255,0,
+3,PIXEL,2,2,,,0,0,255,
+'''
+    stream = io.StringIO(csv_content)
+    renderer = Mock()
+    read_at_commit = []
+    renderer.commit.side_effect = lambda: read_at_commit.append(stream.tell())
+    
+    csv_play(renderer, stream)
+    
+    assert renderer.commit.call_count == 3
+    assert read_at_commit[0] < len(csv_content)
+    assert read_at_commit == sorted(read_at_commit)
+    renderer.rect.assert_called_once_with(0, 0, 4, 4, 255, 0, 0)
+
+
+def test_csv_playback_prefetch_matches_inline():
+    """Reading rows ahead on a thread renders exactly what inline reading does"""
+    lines = ["frame,op,x,y,w,h,r,g,b,text"]
+    for frame in range(300):
+        lines.append(f"{frame},PIXEL,{frame % 50},{frame % 7},,,{frame % 256},0,0,")
+        lines.append(f"{frame},TEXT,1,2,,,,9,9,9,f{frame}")
+    csv_content = "\n".join(lines) + "\n"
+    
+    inline, prefetched = Mock(), Mock()
+    csv_play(inline, io.StringIO(csv_content))
+    csv_play(prefetched, io.StringIO(csv_content), prefetch=2)
+    
+    assert prefetched.mock_calls == inline.mock_calls
+    assert prefetched.commit.call_count == 300
+
+
+def test_csv_playback_prefetch_reports_reader_errors():
+    """An error raised while reading ahead surfaces in the caller"""
+    class Broken(io.StringIO):
+        def __next__(self):
+            raise OSError("disk went away")
+    
+    with pytest.raises(OSError, match="disk went away"):
+        csv_play(Mock(), Broken("frame,op\n1,CLEAR\n"), prefetch=4)
+
+
+@pytest.mark.parametrize("prefetch", [0, 2])
+def test_csv_playback_mmap_matches_stream(tmp_path, prefetch):
+    """Playing through a memory map renders what reading the file does"""
+    csv_path = tmp_path / 'mapped.csv'
+    rows = ["frame,op,x,y,w,h,r,g,b,text"]
+    for frame in range(40):
+        rows.append(f'{frame},TEXT,1,2,,,,9,9,"line {frame}\nnext, ü"')
+        rows.append(f"{frame},RECT,{frame},0,3,3,1,2,3,")
+    csv_path.write_text("\r\n".join(rows), encoding="utf-8", newline="")
+    
+    streamed, mapped = Mock(), Mock()
+    csv_play(streamed, str(csv_path))
+    csv_play(mapped, str(csv_path), prefetch=prefetch, use_mmap=True)
+    
+    assert mapped.mock_calls == streamed.mock_calls
+    assert mapped.commit.call_count == 40
+
+
+@pytest.mark.parametrize("use_arrow", [False, True])
+def test_csv_playback_arrow_matches_stream(tmp_path, monkeypatch, use_arrow):
+    """pyarrow parsing renders what the csv module does, or falls back to it"""
+    if use_arrow:
+        pytest.importorskip("pyarrow")
+    else:
+        # Without pyarrow, use_arrow quietly keeps the csv module
+        monkeypatch.setattr(backends_module, "PYARROW_AVAILABLE", False)
+    csv_path = tmp_path / 'arrow.csv'
+    rows = ["frame,op,x,y,w,h,r,g,b,text"]
+    for frame in range(40):
+        rows.append(f'{frame},TEXT,1,2,,,9,9,9,"line {frame}\nnext, ü"')
+        rows.append(f"{frame},RECT,{frame},0,3,3,1,2,3,")
+        rows.append(f"{frame},PIXEL,4,5,,,,,,")
+    csv_path.write_text("\n".join(rows) + "\n", encoding="utf-8", newline="")
+    
+    streamed, parsed = Mock(), Mock()
+    csv_play(streamed, str(csv_path))
+    csv_play(parsed, str(csv_path), prefetch=2, use_arrow=True)
+    
+    assert parsed.mock_calls == streamed.mock_calls
+    assert parsed.commit.call_count == 40
+
+
+def test_csv_playback_mmap_empty_file(tmp_path):
+    """An empty CSV plays nothing instead of failing to map"""
+    csv_path = tmp_path / 'empty.csv'
+    csv_path.write_bytes(b"")
+    renderer = Mock()
+    csv_play(renderer, str(csv_path), use_mmap=True)
+    assert renderer.mock_calls == []
+
+
+def test_frame_pacing_absorbs_render_time():
+    """Frames end on fixed deadlines, so slow renders do not add up"""
+    now = [0]
+    sleeps = []
+    
+    def sleep(seconds):
+        sleeps.append(round(seconds, 3))
+        now[0] += int(seconds * 1e9)
+    
+    pacer = _Pacer(0.1, clock=lambda: now[0], sleep=sleep)
+    for render_ms in (30, 80, 150, 10):
+        now[0] += render_ms * 1_000_000
+        pacer.wait()
+    
+    # The 150 ms frame overran its slot; the next one catches up
+    assert sleeps == [0.07, 0.02, 0.04]
+    assert now[0] == 400_000_000
+
+
+def test_backends_import_without_tk():
+    """Importing the backends does not load Tk until a Tk backend is made"""
+    code = ("import sys, visualpython.backends as b; "
+            "b.create_backend('console'); print('tkinter' in sys.modules)")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                            env={**os.environ, "PYTHONPATH": str(Path(__file__).parent / "src")})
+    assert result.stdout.strip().splitlines()[-1] == "False", result.stderr
+
+
+def test_pooled_backend_reset_for_reuse(tmp_path, count_frames):
+    """A released simulator backend is handed out again, reset to a blank frame 0"""
+    first_dir, second_dir = tmp_path / "first", tmp_path / "second"
+    with acquire_backend(64, 48, first_dir) as first:
+        first.rect(0, 0, 64, 48, 255, 0, 0)
+        first.commit()
+        first.rect(0, 0, 8, 8, 0, 0, 255)  # left uncommitted
+    
+    with acquire_backend(64, 48, second_dir) as second:
+        assert second is first, "same-size backend should come from the pool"
+        assert second.index == 0
+        assert second.buf[0][0] == second._hex_to_rgb("#001100")
+        second.commit()
+    
+    assert count_frames(first_dir) == 1
+    assert [p.name for p in second_dir.iterdir()] == ["vp_sim_0000.ppm"]
+
+
+def test_pooled_backend_honours_options(tmp_path):
+    """Backends are only reused for the same options, so each run gets its own"""
+    first_dir, second_dir = tmp_path / "first", tmp_path / "second"
+    with acquire_backend(32, 24, first_dir, file_prefix="first_", start_index=3) as first:
+        first.rect(0, 0, 4, 4, 255, 0, 0)
+        first.commit()
+    
+    with acquire_backend(32, 24, second_dir, file_prefix="second_", frames_per_dir=1) as second:
+        assert second is not first
+        second.commit()
+    
+    with acquire_backend(32, 24, second_dir, file_prefix="first_", start_index=3) as again:
+        assert again is first
+        assert again.index == 3
+    
+    assert [p.name for p in first_dir.iterdir()] == ["first_0003.ppm"]
+    assert [p.relative_to(second_dir).as_posix() for p in second_dir.rglob("*.ppm")] == ["000/second_0000.ppm"]
+
+
+def test_encode_workers_write_identical_frames(tmp_path):
+    """Frames encoded on the (spawned) worker pool match inline encoding byte for byte"""
+    def render(out_dir, encode_workers):
+        renderer = SimRenderer(width=32, height=24, out_dir=out_dir,
+                               encode_workers=encode_workers)
+        try:
+            for i in range(5):
+                renderer.rect(i, i, 10, 6, 40 * i, 255 - 40 * i, 128)
+                renderer.commit()
+        finally:
+            renderer.close()
+        return [(entry.name, Path(entry.path).read_bytes()) for entry in _sorted_entries(out_dir)]
+    
+    inline = render(tmp_path / "inline", 0)
+    pooled = render(tmp_path / "pooled", 2)
+    assert len(inline) == 5
+    assert pooled == inline
+
+
+def test_error_handling(frames_dir):
+    """Test error handling in various scenarios"""
+    # Test with invalid CSV
+    invalid_csv = io.StringIO("invalid,csv,content\n1,BADOP,x,y")
+    
+    # Should not crash
+    with acquire_backend(100, 100, frames_dir) as backend:
+        try:
+            csv_play(backend, invalid_csv)
+            # Should handle gracefully
+        except Exception:
+            pass  # Expected for invalid content
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__] + sys.argv[1:]))
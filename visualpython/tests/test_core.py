@@ -7,20 +7,34 @@ import tempfile
 import os
 from unittest.mock import Mock, patch
 
+import ast
+from importlib.util import find_spec
+
 from visualpython.core import VisualPythonEngine, VisualElement
-from visualpython.signals import SignalData
+from visualpython.core_numba import NUMBA_AVAILABLE, plan_loop, get_compiled_loop
+from visualpython.signals import SignalData, SignalBuffer, COORD_MAX
 
 
 class TestVisualPythonEngine(unittest.TestCase):
     """Test the core VisualPython engine."""
     
-    def setUp(self):
-        """Set up test engine with console backend."""
-        self.engine = VisualPythonEngine(backend='console')
+    @classmethod
+    def setUpClass(cls):
+        """Create one console engine for the class; tests reset it."""
+        cls._shared_engine = VisualPythonEngine(backend='console')
+        cls._console_backend = cls._shared_engine.backend
     
-    def tearDown(self):
-        """Clean up after tests."""
-        self.engine.cleanup()
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up the shared engine."""
+        cls._shared_engine.cleanup()
+    
+    def setUp(self):
+        """Hand each test the shared engine in a freshly reset state."""
+        self.engine = self._shared_engine
+        # Some tests swap in a Mock backend
+        self.engine.backend = self._console_backend
+        self.engine.reset()
     
     def test_simple_variable_assignment(self):
         """Test basic variable assignment."""
@@ -51,7 +65,7 @@ z = x + y
         self.engine.execute(code)
         
         # Check that output operation was created
-        output_ops = [op for op in self.engine.operations if op.element_type == 'output']
+        output_ops = self.engine.operations_of_type('output')
         self.assertGreater(len(output_ops), 0)
         self.assertEqual(output_ops[0].content, "Hello, VisualPython!")
     
@@ -72,6 +86,89 @@ for i in range(3):
         loop_ops = [op for op in self.engine.operations if 'loop' in op.element_type]
         self.assertGreater(len(loop_ops), 0)
     
+    def test_large_loop_downsampling(self):
+        """Test large loops emit a bounded number of ticks plus a summary."""
+        self.engine.execute("total = 0\nfor i in range(1000):\n    total = total + i")
+        
+        ticks = [op for op in self.engine.operations if op.element_type == 'loop_tick']
+        summaries = [op for op in self.engine.operations if op.element_type == 'loop_summary']
+        self.assertLessEqual(len(ticks), 256)
+        self.assertEqual(len(summaries), 1)
+        self.assertIn('1000 iterations', summaries[0].content)
+        
+        # Loop body still runs for every iteration
+        self.assertEqual(self.engine.variables['total'], sum(range(1000)))
+    
+    def test_huge_loop_coordinates_keep_columns_aligned(self):
+        """Test tick coordinates past 32 bits neither overflow nor misalign columns."""
+        self.engine.execute("for i in range(0, 10**9, 10**7):\n    print(i)")
+        
+        ticks = [op for op in self.engine.operations if op.element_type == 'loop_tick']
+        self.assertGreater(max(op.x for op in ticks), 2**31)
+        self.assertEqual(len(self.engine._op_type), len(self.engine._op_x))
+        self.assertEqual(len(self.engine._op_type), len(self.engine._op_y))
+        
+        self.engine.execute("for i in range(10**18, 10**18 + 3):\n    x = i")
+        ticks = [op for op in self.engine.operations if op.element_type == 'loop_tick']
+        self.assertEqual(ticks[-1].x, COORD_MAX)
+    
+    def test_unchanged_frame_skips_redraw(self):
+        """Test re-executing code with identical output does not redraw."""
+        backend = Mock()
+        self.engine.backend = backend
+        
+        self.engine.execute("x = 5\nprint(x)")
+        self.engine.execute("x = 5\nprint(x)")
+        self.assertEqual(backend.clear.call_count, 1)
+        
+        self.engine.execute("x = 6\nprint(x)")
+        self.assertEqual(backend.clear.call_count, 2)
+    
+    def test_redraw_on_equal_hash_or_numeric_type(self):
+        """Test values sharing a hash or comparing equal across types still redraw."""
+        backend = Mock()
+        self.engine.backend = backend
+        
+        # hash(-1) == hash(-2)
+        self.engine.execute("x = -1")
+        self.engine.execute("x = -2")
+        self.assertEqual(backend.clear.call_count, 2)
+        
+        # 1 == 1.0 == True but each formats differently
+        self.engine.execute("x = 1")
+        self.engine.execute("x = 1.0")
+        self.engine.execute("x = True")
+        self.assertEqual(backend.clear.call_count, 5)
+    
+    def test_run_frame_flushes_once(self):
+        """Test run_frame renders each snippet but updates the display once."""
+        backend = Mock()
+        self.engine.backend = backend
+        
+        times = self.engine.run_frame(["x = 1", "x = 2", "x = 3"])
+        
+        self.assertEqual(len(times), 3)
+        self.assertEqual(backend.clear.call_count, 3)
+        self.assertEqual(backend.update.call_count, 1)
+        self.assertFalse(self.engine.animation_mode)
+    
+    def test_membership_and_identity_comparisons(self):
+        """Test in/not in/is/is not comparisons evaluate like Python."""
+        self.engine.execute(
+            "a = 1 in [1, 2]\n"
+            "b = 3 not in (1, 2)\n"
+            "c = 5 in [1, 2]\n"
+            "d = a is True\n"
+            "e = c is not False"
+        )
+        
+        variables = self.engine.variables
+        self.assertIs(variables['a'], True)
+        self.assertIs(variables['b'], True)
+        self.assertIs(variables['c'], False)
+        self.assertIs(variables['d'], True)
+        self.assertIs(variables['e'], False)
+    
     def test_if_statement_execution(self):
         """Test if statement processing."""
         code = """
@@ -136,9 +233,16 @@ print(message)
         self.assertEqual(self.engine.variables['message'], expected_message)
         
         # Check print output
-        output_ops = [op for op in self.engine.operations if op.element_type == 'output']
+        output_ops = self.engine.operations_of_type('output')
         self.assertTrue(any(op.content == expected_message for op in output_ops))
     
+    def test_f_string_conversions_and_format_specs(self):
+        """Test f-string fields honour !r conversions and format specs."""
+        code = 'price = 3.14159\nname = "pi"\nwidth = 6\nlabel = f"{name!r}={price:.2f}|{price:>{width}.1f}|"'
+        self.engine.execute(code)
+        
+        self.assertEqual(self.engine.variables['label'], "'pi'=3.14|   3.1|")
+    
     def test_signal_generation(self):
         """Test signal generation for hardware export."""
         code = """
@@ -237,6 +341,89 @@ for i in range(2):
         font_keyframes = [kf for kf in self.engine.keyframes if kf.get('type') == 'font_system']
         self.assertEqual(len(font_keyframes), 1)
         self.assertEqual(font_keyframes[0]['time'], 5.0)
+    
+    def test_batched_rendering(self):
+        """Test operations are sent to the backend in one call per primitive."""
+        backend = Mock()
+        self.engine.backend = backend
+        
+        self.engine.execute("for i in range(5):\n    x = i")
+        
+        self.assertEqual(backend.render_texts.call_count, 2)  # keyframes + operations
+        self.assertEqual(backend.render_rects.call_count, 1)
+        backend.render_text.assert_not_called()
+        
+        rects = backend.render_rects.call_args[0][0]
+        self.assertEqual(len(rects), 10)  # 5 loop ticks + 5 variable bars
+    
+    def test_parse_shared_across_engines(self):
+        """Test a second engine reuses the tree parsed for the same source."""
+        from visualpython.core import _parse_cached
+        
+        code = "shared_parse_probe = 7"
+        self.engine.execute(code)
+        hits = _parse_cached.cache_info().hits
+        
+        other = VisualPythonEngine(backend='console')
+        other.execute(code)
+        other.cleanup()
+        
+        self.assertEqual(_parse_cached.cache_info().hits, hits + 1)
+        self.assertEqual(other.variables, {'shared_parse_probe': 7})
+    
+    def test_operations_of_type_matches_filtered_operations(self):
+        """Test filtering by type agrees with filtering the full operation list."""
+        self.engine.execute("x = 2\nfor i in range(3):\n    print(f'i={i}')\nprint('done')")
+        
+        for element_type in ('output', 'loop_tick', 'variable', 'missing'):
+            expected = [op for op in self.engine.operations if op.element_type == element_type]
+            self.assertEqual(self.engine.operations_of_type(element_type), expected)
+    
+    def test_reset_clears_execution_state(self):
+        """Test reset drops execution results but keeps keyframes."""
+        keyframe_count = len(self.engine.keyframes)
+        self.engine.execute("x = 1\nprint(x)")
+        self.engine.reset()
+        
+        self.assertEqual(self.engine.variables, {})
+        self.assertEqual(self.engine.operations, [])
+        self.assertEqual(self.engine.signals, [])
+        self.assertEqual(self.engine.get_statistics()['execution_count'], 0)
+        self.assertEqual(len(self.engine.keyframes), keyframe_count)
+    
+    def test_uncleaned_engines_cleaned_up_at_exit(self):
+        """Test engines are tracked until cleanup and released when collected."""
+        from visualpython.core import _live_engines, _cleanup_engines
+        
+        engine = VisualPythonEngine(backend='console')
+        engine.backend = Mock()
+        self.assertIn(engine, _live_engines)
+        
+        with patch('visualpython.core._live_engines', {engine}):
+            _cleanup_engines()
+        engine.backend.cleanup.assert_called_once_with()
+        
+        engine.cleanup()
+        self.assertNotIn(engine, _live_engines)
+    
+    def test_snapshot_restore_round_trip(self):
+        """Test restoring a snapshot brings back an earlier execution's state."""
+        self.engine.execute("x = 3\nprint(x)")
+        snapshot = self.engine.snapshot()
+        operations = self.engine.operations
+        signal_count = len(self.engine.signals)
+        
+        self.engine.execute("y = 9")
+        self.engine.restore(snapshot)
+        
+        self.assertEqual(self.engine.variables, {'x': 3})
+        self.assertEqual(self.engine.operations, operations)
+        self.assertEqual(len(self.engine.signals), signal_count)
+        
+        # The snapshot survives the next execution clearing columns in place
+        self.engine.execute("z = 1")
+        self.engine.restore(snapshot)
+        self.assertEqual(self.engine.variables, {'x': 3})
 
 
 class TestVisualElement(unittest.TestCase):
@@ -275,6 +462,160 @@ class TestVisualElement(unittest.TestCase):
         self.assertEqual(element.metadata['value'], 75)
 
 
+class TestLoopJit(unittest.TestCase):
+    """Test optional Numba compilation of pure-numeric loops."""
+    
+    def _loop(self, code):
+        return ast.parse(code).body[-1]
+    
+    def test_plan_accepts_pure_numeric_body(self):
+        """Test arithmetic-only loop bodies are planned for compilation."""
+        plan = plan_loop(self._loop("for i in range(10):\n    a = a + i * 2\n    b = -a / 3"))
+        self.assertEqual([target for target, _ in plan], ['a', 'b'])
+    
+    def test_plan_rejects_impure_body(self):
+        """Test bodies with calls, comparisons or loop-var writes are not planned."""
+        self.assertIsNone(plan_loop(self._loop("for i in range(10):\n    print(i)")))
+        self.assertIsNone(plan_loop(self._loop("for i in range(10):\n    a = i < 3")))
+        self.assertIsNone(plan_loop(self._loop("for i in range(10):\n    i = i + 1")))
+    
+    def test_compiled_loop_shared_across_parses(self):
+        """Test a re-parsed identical loop reuses the kernel compiled earlier."""
+        code = "for i in range(100):\n    total = total + i * 3"
+        first, second = self._loop(code), self._loop(code)
+        first._vp_jit_plan = plan_loop(first)
+        second._vp_jit_plan = plan_loop(second)
+        
+        with patch('visualpython.core_numba._load_numba', return_value=True), \
+                patch('visualpython.core_numba.CompiledLoop') as compiled_loop, \
+                patch.dict('visualpython.core_numba._LOOP_CACHE', clear=True):
+            loop, compile_ns = get_compiled_loop(first, {'total': 0})
+            reused, reused_ns = get_compiled_loop(second, {'total': 5})
+            self.assertEqual(compiled_loop.call_count, 1)
+            self.assertIs(reused, loop)
+            self.assertEqual(reused_ns, 0)
+            
+            # Different input types need their own kernel
+            get_compiled_loop(second, {'total': 0.5})
+            self.assertEqual(compiled_loop.call_count, 2)
+    
+    def test_compiled_loop_rejects_inexact_ints(self):
+        """Test ints and range bounds beyond float64 precision are interpreted."""
+        node = self._loop("for i in range(10):\n    a = a + i")
+        node._vp_jit_plan = plan_loop(node)
+        
+        with patch('visualpython.core_numba._load_numba', return_value=True), \
+                patch('visualpython.core_numba.CompiledLoop') as compiled_loop, \
+                patch.dict('visualpython.core_numba._LOOP_CACHE', clear=True):
+            self.assertIsNone(get_compiled_loop(node, {'a': 2**60 + 1})[0])
+            self.assertIsNone(get_compiled_loop(node, {'a': 10**400})[0])
+            self.assertIsNone(get_compiled_loop(node, {'a': 1}, range(2**63, 2**63 + 10))[0])
+            compiled_loop.assert_not_called()
+            self.assertIsNotNone(get_compiled_loop(node, {'a': 1}, range(10))[0])
+    
+    def test_compile_failure_falls_back(self):
+        """Test a loop Numba cannot compile is cached as uncompilable."""
+        node = self._loop("for i in range(10):\n    a = a + i")
+        node._vp_jit_plan = plan_loop(node)
+        
+        with patch('visualpython.core_numba._load_numba', return_value=True), \
+                patch('visualpython.core_numba.CompiledLoop', side_effect=RuntimeError) as compiled_loop, \
+                patch.dict('visualpython.core_numba._LOOP_CACHE', clear=True):
+            self.assertIsNone(get_compiled_loop(node, {'a': 1})[0])
+            self.assertIsNone(get_compiled_loop(node, {'a': 2})[0])
+            self.assertEqual(compiled_loop.call_count, 1)
+    
+    @unittest.skipUnless(find_spec('numpy'), "numpy not installed")
+    def test_loop_source_persisted_for_numba_cache(self):
+        """Test generated loop sources are written once to the cache directory."""
+        from visualpython.core_numba import _load_loop_function
+        
+        source = "def _vp_loop(start, stop, step, n):\n    return np.zeros(n), False\n"
+        with tempfile.TemporaryDirectory() as directory:
+            with patch.dict(os.environ, {'VP_JIT_CACHE_DIR': directory}):
+                func, from_file = _load_loop_function(source)
+                again, _ = _load_loop_function(source)
+            
+            self.assertTrue(from_file)
+            self.assertEqual(len(os.listdir(directory)), 1)
+            self.assertEqual(func(0, 3, 1, 3)[0].tolist(), [0.0, 0.0, 0.0])
+            self.assertEqual(again.__code__.co_filename, func.__code__.co_filename)
+    
+    @unittest.skipUnless(find_spec('numpy'), "numpy not installed")
+    def test_stale_cached_loop_source_is_rewritten(self):
+        """Test a cached loop file that does not match its source is replaced."""
+        from visualpython.core_numba import _load_loop_function
+        
+        source = "def _vp_loop(start, stop, step, n):\n    return np.ones(n), False\n"
+        with tempfile.TemporaryDirectory() as directory:
+            with patch.dict(os.environ, {'VP_JIT_CACHE_DIR': directory}):
+                _load_loop_function(source)
+                (name,) = os.listdir(directory)
+                path = os.path.join(directory, name)
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write("def _vp_loop(start, stop, step, n):\n    return None, True\n")
+                
+                func, from_file = _load_loop_function(source)
+            
+            self.assertTrue(from_file)
+            self.assertEqual(func(0, 2, 1, 2)[0].tolist(), [1.0, 1.0])
+            with open(path, encoding='utf-8') as f:
+                self.assertTrue(f.read().endswith(source))
+    
+    @unittest.skipUnless(NUMBA_AVAILABLE, "numba not installed")
+    def test_compiled_loop_matches_interpreter(self):
+        """Test compiled loops produce the same operations and variables."""
+        code = "a = 1\nb = 2.5\nfor i in range(100):\n    a = a + i\n    b = b * 1.01 - a / 7"
+        
+        compiled = VisualPythonEngine(backend='console')
+        compiled.backend = Mock()
+        compiled.execute(code)
+        
+        interpreted = VisualPythonEngine(backend='console')
+        interpreted.backend = Mock()
+        with patch('visualpython.core.NUMBA_AVAILABLE', False):
+            interpreted.execute(code)
+        
+        self.assertEqual(compiled.variables, interpreted.variables)
+        self.assertEqual(compiled.operations, interpreted.operations)
+    
+    def test_fast_loops_compiled_matches_interpreter(self):
+        """Test fast_loops skips the same iterations compiled and interpreted."""
+        class SummingLoop:
+            targets = ['total']
+            
+            def run(self, start, stop, step, n, variables):
+                total, values = variables['total'], []
+                for i in range(start, stop, step):
+                    total = total + i
+                    values.append(total)
+                return values
+        
+        from visualpython.core import _parse_cached
+        
+        code = "total = 0\nfor i in range(1000):\n    total = total + i"
+        # Loop plans are attached when a tree is first parsed
+        _parse_cached.cache_clear()
+        compiled = VisualPythonEngine(backend='console', fast_loops=True)
+        compiled.backend = Mock()
+        with patch('visualpython.core.NUMBA_AVAILABLE', True), \
+                patch('visualpython.core.plan_loop', return_value=[]), \
+                patch('visualpython.core.get_compiled_loop',
+                      return_value=(SummingLoop(), 0)) as get_loop:
+            compiled.execute(code)
+        get_loop.assert_called_once()
+        
+        interpreted = VisualPythonEngine(backend='console', fast_loops=True)
+        interpreted.backend = Mock()
+        with patch('visualpython.core.NUMBA_AVAILABLE', False):
+            interpreted.execute(code)
+        
+        self.assertEqual(compiled.variables, interpreted.variables)
+        self.assertEqual(compiled.variables['total'], 124500)
+        self.assertEqual(compiled.variables['i'], 999)
+        self.assertEqual(compiled.operations, interpreted.operations)
+
+
 class TestSignalData(unittest.TestCase):
     """Test SignalData structure."""
     
@@ -299,6 +640,32 @@ class TestSignalData(unittest.TestCase):
         self.assertEqual(signal.g, 128)
         self.assertEqual(signal.b, 0)
     
+    def test_signal_buffer_views_and_export(self):
+        """Test SignalBuffer yields SignalData views and exports CSV rows."""
+        buffer = SignalBuffer()
+        buffer.append(1.0, 'assign', 350, 80, 255, 255, 0, 'x', 42)
+        buffer.append(1.000001, 'print', 20, 105, 0, 255, 255, 'output', 'hi')
+        
+        signals = list(buffer)
+        self.assertEqual(len(buffer), 2)
+        self.assertIsInstance(signals[0], SignalData)
+        self.assertEqual((signals[0].x, signals[0].y, signals[0].r), (350, 80, 255))
+        self.assertEqual(signals[1].value, 'hi')
+        
+        # Single signals are built on demand without materializing the rest
+        self.assertEqual(buffer[0], signals[0])
+        self.assertEqual(buffer[-1].to_dict(), signals[1].to_dict())
+        with self.assertRaises(IndexError):
+            buffer[2]
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            filename = os.path.join(temp_dir, 'signals.csv')
+            self.assertTrue(buffer.export_csv(filename))
+            with open(filename, encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        self.assertEqual(lines[0], ','.join(SignalBuffer.FIELDNAMES))
+        self.assertEqual(len(lines), 3)
+    
     def test_signal_to_dict(self):
         """Test signal conversion to dictionary."""
         signal = SignalData(
@@ -319,6 +686,15 @@ class TestSignalData(unittest.TestCase):
         self.assertEqual(signal_dict['variable'], 'output')
         self.assertEqual(signal_dict['value'], 'Hello World')
         self.assertIn('timestamp', signal_dict)
+    
+    def test_signal_buffer_clamps_coordinates(self):
+        """Test out-of-range coordinates are clamped instead of raising."""
+        buffer = SignalBuffer()
+        buffer.append(0.0, 'assign', 10**20, -10**20, 0, 0, 0, 'x', 1)
+        
+        self.assertEqual(len(buffer), 1)
+        self.assertEqual(buffer[0].x, COORD_MAX)
+        self.assertEqual(buffer[0].y, -COORD_MAX - 1)
 
 
 if __name__ == '__main__':
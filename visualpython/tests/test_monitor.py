@@ -7,6 +7,8 @@ import tempfile
 import os
 import time
 import threading
+import logging
+import shutil
 from pathlib import Path
 from unittest.mock import Mock, patch
 
@@ -16,6 +18,44 @@ from visualpython.monitor import (
 )
 
 
+class _SeedFileMixin:
+    """One seed file per TestCase class, shared by tests that only read it."""
+    
+    seed_content = "x = 1\n"
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._temp_dir = tempfile.TemporaryDirectory()
+        cls.seed_filepath = os.path.join(cls._temp_dir.name, 'seed.py')
+        with open(cls.seed_filepath, 'w') as f:
+            f.write(cls.seed_content)
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls._temp_dir.cleanup()
+        super().tearDownClass()
+    
+    def _mutable_copy(self) -> str:
+        """Copy of the seed file for a test that writes to it."""
+        path = os.path.join(self._temp_dir.name, f"{self._testMethodName}.py")
+        shutil.copy(self.seed_filepath, path)
+        return path
+
+
+class _FakeClock:
+    """Monotonic clock that only moves when a test advances it."""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self) -> float:
+        return self.now
+    
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
 class TestFileChangeEvent(unittest.TestCase):
     """Test FileChangeEvent data structure."""
     
@@ -46,35 +86,25 @@ class TestFileChangeEvent(unittest.TestCase):
         self.assertLess(abs(event.timestamp - time.time()), 1.0)
 
 
-class TestFileMonitor(unittest.TestCase):
+class TestFileMonitor(_SeedFileMixin, unittest.TestCase):
     """Test the base FileMonitor class."""
     
     def setUp(self):
         """Set up test fixtures."""
         self.events_received = []
+        self._change_event = threading.Event()
         self.monitor = FileMonitor(self._on_file_change)
-        
-        # Create temporary test file
-        self.temp_file = tempfile.NamedTemporaryFile(
-            mode='w', 
-            suffix='.py', 
-            delete=False
-        )
-        self.temp_file.write("x = 1\n")
-        self.temp_file.close()
-        self.temp_filepath = self.temp_file.name
+        # Tests that write to the file replace this with a private copy
+        self.temp_filepath = self.seed_filepath
     
     def tearDown(self):
         """Clean up test fixtures."""
         self.monitor.stop_monitoring()
-        try:
-            os.unlink(self.temp_filepath)
-        except:
-            pass
     
     def _on_file_change(self, event: FileChangeEvent):
         """Test callback for file changes."""
         self.events_received.append(event)
+        self._change_event.set()
     
     def test_add_file(self):
         """Test adding files to monitor."""
@@ -102,18 +132,16 @@ class TestFileMonitor(unittest.TestCase):
     
     def test_file_change_detection(self):
         """Test file change detection."""
+        self.temp_filepath = self._mutable_copy()
         self.monitor.add_file(self.temp_filepath)
         self.monitor.start_monitoring()
         
-        # Wait for monitor to start
-        time.sleep(0.1)
-        
-        # Modify file
+        # Modify file; the size changes, so the stat check sees it at once
         with open(self.temp_filepath, 'w') as f:
             f.write("x = 42\n")
         
-        # Wait for change detection
-        time.sleep(0.3)
+        # Returns as soon as the callback has run
+        self.assertTrue(self._change_event.wait(1.0))
         
         self.monitor.stop_monitoring()
         
@@ -123,6 +151,7 @@ class TestFileMonitor(unittest.TestCase):
     
     def test_content_hash_tracking(self):
         """Test content hash change tracking."""
+        self.temp_filepath = self._mutable_copy()
         self.monitor.add_file(self.temp_filepath)
         original_info = self.monitor.monitored_files[self.temp_filepath]
         original_hash = original_info['content_hash']
@@ -138,6 +167,200 @@ class TestFileMonitor(unittest.TestCase):
         new_hash = self.monitor.monitored_files[self.temp_filepath]['content_hash']
         self.assertNotEqual(original_hash, new_hash)
     
+    def test_touch_without_content_change(self):
+        """Test that a same-content save does not queue a change."""
+        self.temp_filepath = self._mutable_copy()
+        self.monitor.add_file(self.temp_filepath)
+        info = self.monitor.monitored_files[self.temp_filepath]
+
+        # Bump mtime without changing the bytes
+        os.utime(self.temp_filepath, (time.time() + 5, time.time() + 5))
+        self.monitor._check_file_for_changes(self.temp_filepath)
+
+        self.assertEqual(self.monitor._debounce_timers, {})
+        self.assertEqual(info['change_count'], 0)
+        self.assertNotIn('last_content', info)
+
+    def test_debounce_coalesces_rapid_changes(self):
+        """Test that rapid changes to one file dispatch a single event."""
+        self.monitor.debounce_time = 0.05
+        self.monitor.add_file(self.temp_filepath)
+
+        for i in range(5):
+            self.monitor._schedule_change(self.temp_filepath)
+        self.assertEqual(len(self.monitor._debounce_timers), 1)
+
+        self.assertTrue(self._change_event.wait(1.0))
+        self.assertEqual(len(self.events_received), 1)
+        self.assertEqual(self.monitor._debounce_timers, {})
+
+    def test_deleted_file_reported_from_single_stat(self):
+        """Test a file that vanished is reported deleted and dropped."""
+        self.temp_filepath = self._mutable_copy()
+        self.monitor.add_file(self.temp_filepath)
+        os.unlink(self.temp_filepath)
+        
+        with patch('visualpython.monitor.os.path.exists') as exists:
+            self.monitor._check_file_for_changes(self.temp_filepath)
+        exists.assert_not_called()
+        
+        self.assertTrue(self._change_event.wait(1.0))
+        self.assertEqual(self.events_received[-1].event_type, 'deleted')
+        self.assertNotIn(self.temp_filepath, self.monitor.monitored_files)
+    
+    def test_debounce_in_simulated_time(self):
+        """Test debounce deadlines against an injected clock."""
+        clock = _FakeClock()
+        monitor = FileMonitor(self._on_file_change, clock=clock)
+        monitor.debounce_time = 0.05
+        monitor.add_file(self.temp_filepath)
+        delays = []
+        
+        def arm(filepath, delay):
+            # Stands in for threading.Timer; the test fires it by hand
+            delays.append(delay)
+            monitor._debounce_timers[filepath] = threading.current_thread()
+        
+        with patch.object(monitor, '_start_debounce_timer', side_effect=arm):
+            monitor._schedule_change(self.temp_filepath)
+            clock.advance(0.03)
+            monitor._schedule_change(self.temp_filepath)  # deadline moves to 0.08
+            
+            clock.advance(0.02)
+            monitor._fire_debounced(self.temp_filepath)  # still 0.03 to go: re-arms
+            self.assertEqual(self.events_received, [])
+            self.assertEqual(len(delays), 2)
+            self.assertAlmostEqual(delays[1], 0.03)
+            
+            clock.advance(0.03)
+            monitor._fire_debounced(self.temp_filepath)
+        
+        self.assertTrue(self._change_event.wait(1.0))
+        self.assertEqual(monitor._debounce_timers, {})
+        monitor.stop_monitoring()
+        self.assertEqual(len(self.events_received), 1)
+
+    def test_large_file_hash_matches_in_memory_hash(self):
+        """Test that mmap and chunked hashing agree with a one-shot hash."""
+        self.temp_filepath = self._mutable_copy()
+        from visualpython.monitor import _hash_file, _hash_bytes, MMAP_MIN_BYTES
+
+        for size in (MMAP_MIN_BYTES - 1, MMAP_MIN_BYTES * 2):
+            data = b"x = 1\n" * (size // 6 + 1)
+            with open(self.temp_filepath, 'wb') as f:
+                f.write(data)
+            self.assertEqual(
+                _hash_file(self.temp_filepath),
+                _hash_bytes(data)
+            )
+
+    def test_directory_scan_reports_changed_and_missing(self):
+        """Test that one scan per directory finds modified and deleted files."""
+        with tempfile.TemporaryDirectory() as directory:
+            paths = [os.path.join(directory, f"f{i}.py") for i in range(3)]
+            for path in paths:
+                with open(path, 'w') as f:
+                    f.write("x = 1\n")
+                self.monitor.add_file(path)
+            self.assertEqual(self.monitor._scan_for_changes(), [])
+
+            with open(paths[0], 'w') as f:
+                f.write("x = 10\n")
+            os.unlink(paths[2])
+
+            self.assertEqual(sorted(self.monitor._scan_for_changes()),
+                             [paths[0], paths[2]])
+
+    def test_parallel_directory_scan(self):
+        """Test that scanning many directories on the pool finds changes."""
+        from visualpython.monitor import PARALLEL_SCAN_MIN_DIRS
+
+        with tempfile.TemporaryDirectory() as root:
+            paths = []
+            for i in range(PARALLEL_SCAN_MIN_DIRS + 2):
+                directory = os.path.join(root, f"d{i}")
+                os.mkdir(directory)
+                path = os.path.join(directory, "main.py")
+                with open(path, 'w') as f:
+                    f.write("x = 1\n")
+                self.monitor.add_file(path)
+                paths.append(path)
+            self.assertEqual(self.monitor._scan_for_changes(), [])
+
+            with open(paths[3], 'w') as f:
+                f.write("x = 100\n")
+            self.assertEqual(self.monitor._scan_for_changes(), [paths[3]])
+            self.assertIsNotNone(self.monitor._scan_pool)
+
+    def test_poll_hashes_many_changed_files(self):
+        """Test that a poll with many changed files hashes them on the pool."""
+        from visualpython.monitor import PARALLEL_HASH_MIN_FILES, _hash_file
+
+        with tempfile.TemporaryDirectory() as directory:
+            paths = [os.path.join(directory, f"f{i}.py")
+                     for i in range(PARALLEL_HASH_MIN_FILES + 1)]
+            for path in paths:
+                with open(path, 'w') as f:
+                    f.write("x = 1\n")
+                self.monitor.add_file(path)
+
+            for i, path in enumerate(paths):
+                with open(path, 'w') as f:
+                    f.write(f"x = {i + 10}\n")
+            with patch.object(self.monitor, '_schedule_change') as schedule:
+                self.monitor._poll_once()
+
+            self.assertEqual(sorted(call.args[0] for call in schedule.call_args_list),
+                             sorted(paths))
+            self.assertIsNotNone(self.monitor._scan_pool)
+            for path in paths:
+                info = self.monitor.monitored_files[path]
+                self.assertEqual(info['content_hash'], _hash_file(path))
+                self.assertEqual(info['change_count'], 1)
+
+    def test_callback_runs_latest_queued_event(self):
+        """Test that a slow callback does not replay superseded events."""
+        started = threading.Event()
+        release = threading.Event()
+        seen = []
+
+        def slow_callback(event):
+            seen.append(event.new_content)
+            started.set()
+            release.wait(1.0)
+
+        monitor = FileMonitor(slow_callback)
+        monitor._handle_change_event(
+            FileChangeEvent(self.temp_filepath, 'modified', new_content="x = 1"))
+        started.wait(1.0)
+
+        # Both arrive while the first callback is still running
+        for content in ("x = 2", "x = 3"):
+            monitor._handle_change_event(
+                FileChangeEvent(self.temp_filepath, 'modified', new_content=content))
+        release.set()
+        monitor.stop_monitoring()
+
+        self.assertEqual(seen, ["x = 1", "x = 3"])
+        self.assertEqual(monitor.get_statistics()['changes_detected'], 3)
+
+    def test_verbose_logs_each_change(self):
+        """Test that per-change messages are logged only when verbose."""
+        event = FileChangeEvent(self.temp_filepath, 'modified', new_content="x = 2")
+
+        with self.assertLogs('visualpython.monitor', level='INFO') as logs:
+            monitor = FileMonitor(self._on_file_change, verbose=True)
+            monitor._handle_change_event(event)
+            monitor.stop_monitoring()
+        self.assertTrue(any("File changed" in line for line in logs.output))
+
+        quiet = FileMonitor(self._on_file_change)
+        with self.assertLogs('visualpython.monitor', level='INFO') as logs:
+            quiet._handle_change_event(event)
+            quiet.stop_monitoring()
+            logging.getLogger('visualpython.monitor').info("marker")
+        self.assertEqual(len(logs.output), 1)
+
     def test_statistics_tracking(self):
         """Test monitoring statistics."""
         self.monitor.add_file(self.temp_filepath)
@@ -151,6 +374,7 @@ class TestFileMonitor(unittest.TestCase):
     
     def test_debouncing_interval(self):
         """Test debouncing configuration."""
+        self.temp_filepath = self._mutable_copy()
         # Set very short debounce time for testing
         self.monitor.debounce_time = 0.05
         self.monitor.check_interval = 0.02
@@ -158,16 +382,14 @@ class TestFileMonitor(unittest.TestCase):
         self.monitor.add_file(self.temp_filepath)
         self.monitor.start_monitoring()
         
-        time.sleep(0.1)
-        
-        # Make multiple rapid changes
+        # Make multiple rapid changes (sized unlike the seed, so stat sees them)
         for i in range(3):
             with open(self.temp_filepath, 'w') as f:
-                f.write(f"x = {i}\n")
+                f.write(f"x = {i + 10}\n")
             time.sleep(0.01)  # Very short delay
         
         # Wait for debouncing
-        time.sleep(0.2)
+        self.assertTrue(self._change_event.wait(1.0))
         
         self.monitor.stop_monitoring()
         
@@ -175,33 +397,20 @@ class TestFileMonitor(unittest.TestCase):
         self.assertGreater(len(self.events_received), 0)
 
 
-class TestWatchdogFileMonitor(unittest.TestCase):
+class TestWatchdogFileMonitor(_SeedFileMixin, unittest.TestCase):
     """Test the Watchdog-based file monitor."""
     
     def setUp(self):
         """Set up test fixtures."""
         self.events_received = []
-        
-        # Create temporary test file
-        self.temp_file = tempfile.NamedTemporaryFile(
-            mode='w', 
-            suffix='.py', 
-            delete=False
-        )
-        self.temp_file.write("x = 1\n")
-        self.temp_file.close()
-        self.temp_filepath = self.temp_file.name
-    
-    def tearDown(self):
-        """Clean up test fixtures."""
-        try:
-            os.unlink(self.temp_filepath)
-        except:
-            pass
+        self._change_event = threading.Event()
+        # Tests that write to the file replace this with a private copy
+        self.temp_filepath = self.seed_filepath
     
     def _on_file_change(self, event: FileChangeEvent):
         """Test callback for file changes."""
         self.events_received.append(event)
+        self._change_event.set()
     
     def test_watchdog_monitor_creation(self):
         """Test creating watchdog monitor."""
@@ -222,19 +431,17 @@ class TestWatchdogFileMonitor(unittest.TestCase):
                      "Watchdog not available")
     def test_watchdog_file_detection(self):
         """Test file change detection with watchdog."""
+        self.temp_filepath = self._mutable_copy()
         monitor = WatchdogFileMonitor(self._on_file_change)
         monitor.add_file(self.temp_filepath)
         monitor.start_monitoring()
         
-        # Wait for monitor to start
-        time.sleep(0.2)
-        
-        # Modify file
+        # Modify file; the watch is in place once start_monitoring returns
         with open(self.temp_filepath, 'w') as f:
             f.write("x = 123\n")
         
         # Wait for watchdog detection
-        time.sleep(0.3)
+        self.assertTrue(self._change_event.wait(1.0))
         
         monitor.stop_monitoring()
         
@@ -243,31 +450,66 @@ class TestWatchdogFileMonitor(unittest.TestCase):
         self.assertGreater(len(self.events_received), 0)
 
 
-class TestLiveCodeSession(unittest.TestCase):
+    @unittest.skipIf(not hasattr(WatchdogFileMonitor, '_setup_watchdog_for_file'), 
+                     "Watchdog not available")
+    def test_watchdog_add_file_after_start(self):
+        """Test that files added while running are watched too."""
+        self.temp_filepath = self._mutable_copy()
+        from visualpython.monitor import WATCHDOG_AVAILABLE
+        if not WATCHDOG_AVAILABLE:
+            self.skipTest("Watchdog not available")
+        
+        monitor = WatchdogFileMonitor(self._on_file_change)
+        monitor.debounce_time = 0.05
+        monitor.start_monitoring()
+        try:
+            monitor.add_file(self.temp_filepath)
+            handler = monitor.event_handlers[os.path.dirname(self.temp_filepath)]
+            self.assertIn(self.temp_filepath, handler.watched_abspaths)
+            
+            with open(self.temp_filepath, 'w') as f:
+                f.write("x = 7\n")
+            self.assertTrue(self._change_event.wait(1.0))
+        finally:
+            monitor.stop_monitoring()
+        
+        self.assertGreater(len(self.events_received), 0)
+
+
+    @unittest.skipIf(not hasattr(WatchdogFileMonitor, '_setup_watchdog_for_file'), 
+                     "Watchdog not available")
+    def test_watchdog_falls_back_to_polling(self):
+        """Test that a failing native watch is moved to the polling observer."""
+        from visualpython.monitor import WATCHDOG_AVAILABLE
+        if not WATCHDOG_AVAILABLE:
+            self.skipTest("Watchdog not available")
+        
+        monitor = WatchdogFileMonitor(self._on_file_change)
+        monitor.add_file(self.temp_filepath)
+        with patch('visualpython.monitor.Observer') as observer_class:
+            observer_class.return_value.schedule.side_effect = OSError(
+                "inotify watch limit reached")
+            monitor.start_monitoring()
+        try:
+            self.assertIsNotNone(monitor.polling_observer)
+            self.assertEqual(len(monitor.polling_observer.emitters), 1)
+        finally:
+            monitor.stop_monitoring()
+
+
+class TestLiveCodeSession(_SeedFileMixin, unittest.TestCase):
     """Test the LiveCodeSession integration."""
     
-    def setUp(self):
-        """Set up test fixtures."""
-        # Create temporary test file
-        self.temp_file = tempfile.NamedTemporaryFile(
-            mode='w', 
-            suffix='.py', 
-            delete=False
-        )
-        self.temp_file.write("""
+    seed_content = """
 x = 100
 y = 200
 print(f"Values: x={x}, y={y}")
-""")
-        self.temp_file.close()
-        self.temp_filepath = self.temp_file.name
+"""
     
-    def tearDown(self):
-        """Clean up test fixtures."""
-        try:
-            os.unlink(self.temp_filepath)
-        except:
-            pass
+    def setUp(self):
+        """Set up test fixtures."""
+        # Sessions only read the file; changes are simulated with events
+        self.temp_filepath = self.seed_filepath
     
     def test_live_session_creation(self):
         """Test creating live code session."""
@@ -322,6 +564,32 @@ print("Updated values!")
         
         session.stop_session()
     
+    def test_repeated_content_restores_cached_result(self):
+        """Test that returning to an earlier version skips re-execution."""
+        session = LiveCodeSession(backend='console')
+        versions = ["x = 1\ny = x + 1\n", "x = 5\nprint(x)\n"]
+        
+        def change(content):
+            session._on_file_change(FileChangeEvent(
+                self.temp_filepath, 'modified', new_content=content))
+        
+        with patch.object(session.engine, 'execute',
+                          wraps=session.engine.execute) as execute:
+            change(versions[0])
+            first_operations = session.engine.operations
+            change(versions[1])
+            change(versions[0])
+            self.assertEqual(execute.call_count, 2)
+        
+        self.assertEqual(session.session_stats['cache_hits'], 1)
+        # Both real executions were counted, so neither errored out
+        self.assertEqual(session.session_stats['total_executions'], 2)
+        self.assertGreater(session.session_stats['total_execution_time'], 0)
+        self.assertEqual(session.engine.variables, {'x': 1, 'y': 2})
+        self.assertEqual(session.engine.operations, first_operations)
+        
+        session.stop_session()
+    
     def test_session_statistics(self):
         """Test session statistics tracking."""
         session = LiveCodeSession(backend='console')
@@ -335,27 +603,14 @@ print("Updated values!")
         session.stop_session()
 
 
-class TestLiveMonitorFunction(unittest.TestCase):
+class TestLiveMonitorFunction(_SeedFileMixin, unittest.TestCase):
     """Test the live_monitor convenience function."""
     
+    seed_content = "print('Hello from live monitor!')"
+    
     def setUp(self):
         """Set up test fixtures."""
-        # Create temporary test file
-        self.temp_file = tempfile.NamedTemporaryFile(
-            mode='w', 
-            suffix='.py', 
-            delete=False
-        )
-        self.temp_file.write("print('Hello from live monitor!')")
-        self.temp_file.close()
-        self.temp_filepath = self.temp_file.name
-    
-    def tearDown(self):
-        """Clean up test fixtures."""
-        try:
-            os.unlink(self.temp_filepath)
-        except:
-            pass
+        self.temp_filepath = self.seed_filepath
     
     def test_live_monitor_function(self):
         """Test live_monitor convenience function."""
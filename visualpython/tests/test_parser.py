@@ -0,0 +1,406 @@
+"""
+Test suite for the VisualPython AST parser.
+"""
+
+import unittest
+import ast
+import subprocess
+import sys
+import warnings
+from unittest.mock import patch
+
+from visualpython.parser import PythonVisualParser, VariableTracker, _compile_pure
+from visualpython.core_numba import NUMBA_AVAILABLE
+from visualpython.parser_numpy import NUMPY_AVAILABLE, plan_vector_loop
+
+
+class RecordingEngine:
+    """Minimal engine that records what the parser asks it to draw."""
+
+    def __init__(self):
+        self.variables = {}
+        self.elements = []
+        self.outputs = []
+        self.current_y = 50
+        self.variable_x = 50
+        self.output_x = 400
+        self.line_height = 25
+
+    def add_visual_element(self, element_type, content, x, y, color='#00ff88', metadata=None):
+        self.elements.append((element_type, content))
+
+    def add_variable_display(self, name, value):
+        self.elements.append(('variable', f"{name} = {value}"))
+
+    def add_output_line(self, text):
+        self.outputs.append(text)
+
+
+class BatchingEngine(RecordingEngine):
+    """Recording engine that also accepts batches of visual elements."""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def add_visual_elements(self, batch):
+        self.batches.append(batch)
+        for element_type, content, x, y, color in batch:
+            self.add_visual_element(element_type, content, x, y, color=color)
+
+
+class TestPythonVisualParser(unittest.TestCase):
+    """Test direct AST to visual operation parsing."""
+
+    def setUp(self):
+        """Set up a parser on a recording engine."""
+        self.engine = RecordingEngine()
+        self.parser = PythonVisualParser(self.engine)
+
+    def run_code(self, code: str):
+        self.parser.parse_and_render(ast.parse(code))
+
+    def test_assignment_and_print(self):
+        """Test assignments, arithmetic and f-string output."""
+        self.run_code('x = 42\ny = x * 2\nprint(f"x={x}, y={y}")')
+
+        self.assertEqual(self.engine.variables, {'x': 42, 'y': 84})
+        self.assertEqual(self.engine.outputs, ["x=42, y=84"])
+
+    def test_for_loop_iterations(self):
+        """Test that each loop iteration is shown and the body runs."""
+        self.run_code("total = 0\nfor i in range(3):\n    total += i\n")
+
+        self.assertEqual(self.engine.variables['total'], 3)
+        iterations = [c for t, c in self.engine.elements if t == 'loop_iteration']
+        self.assertEqual(iterations, ["  i = 0", "  i = 1", "  i = 2"])
+
+    def test_non_drawing_loop_bodies_are_batched(self):
+        """Test loops whose body draws nothing send their ticks as one batch."""
+        code = "for i in range(60):\n    pass\nx = 1\n"
+        engine = BatchingEngine()
+        PythonVisualParser(engine).parse_and_render(code)
+        self.run_code(code)
+
+        self.assertEqual(len(engine.batches), 1)
+        self.assertEqual([b[3] for b in engine.batches[0][:2]], [75, 100])
+        self.assertEqual(engine.elements, self.engine.elements)
+        self.assertEqual(engine.outputs, ["... (truncated after 50 iterations)"])
+        self.assertEqual(engine.current_y, self.engine.current_y)
+        self.assertEqual(engine.variables, {'i': 49, 'x': 1})
+
+    def test_loop_bodies_are_specialized_per_parser(self):
+        """Test that cached loop bodies are rebuilt for a different parser."""
+        tree = ast.parse("n = 0\nwhile n < 2:\n    n += 1\n    print(n)\n")
+        self.parser.parse_and_render(tree)
+        loop = tree.body[1]
+        steps = self.parser._specialize_body(loop)
+        self.assertEqual(len(steps), 2)
+
+        other_engine = RecordingEngine()
+        other = PythonVisualParser(other_engine)
+        other.parse_and_render(tree)
+
+        self.assertIsNot(other._specialize_body(loop), steps)
+        self.assertEqual(self.engine.outputs, ["1", "2"])
+        self.assertEqual(other_engine.outputs, ["1", "2"])
+
+    @unittest.skipUnless(NUMBA_AVAILABLE, "numba not installed")
+    def test_compiled_loop_matches_interpreter(self):
+        """Test compiled numeric loops draw and track the same as interpreted ones."""
+        code = "a = 1\nb = 2.5\nfor i in range(60):\n    a = a + i\n    b = b * 1.01 - a / 7\n"
+        self.parser.parse_and_render(code)
+
+        interpreted = RecordingEngine()
+        with patch('visualpython.parser.NUMBA_AVAILABLE', False):
+            PythonVisualParser(interpreted).parse_and_render(code)
+
+        self.assertEqual(self.engine.variables, interpreted.variables)
+        self.assertEqual(self.engine.elements, interpreted.elements)
+        self.assertEqual(self.engine.outputs, interpreted.outputs)
+        self.assertEqual(self.parser.variable_tracker.access_count['a'], 100)
+
+    def test_compile_pure_expression(self):
+        """Test pure expressions compile from hand-built trees without warnings."""
+        node = ast.BinOp(left=ast.Constant(value=2), op=ast.Mult(), right=ast.Constant(value=3))
+        self.assertEqual(eval(_compile_pure(node)), 6)
+
+        literal_is = ast.parse("x is 1", mode='eval').body
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            code = _compile_pure(literal_is)
+        self.assertFalse(eval(code, {'x': 2}))
+
+    def test_compiled_loop_skips_inexact_ints(self):
+        """Test loops carrying ints beyond float64 precision stay interpreted."""
+        code = ("a = 2**60 + 1\nfor i in range(40):\n    a = a + i\n"
+                "b = 1\nfor i in range(2**60, 2**60 + 40):\n    b = b + i\n")
+        with patch('visualpython.parser.NUMBA_AVAILABLE', True), \
+                patch('visualpython.core_numba._load_numba', return_value=True), \
+                patch('visualpython.core_numba.CompiledLoop') as compiled_loop, \
+                patch.dict('visualpython.core_numba._LOOP_CACHE', clear=True):
+            self.parser.parse_and_render(code)
+
+        compiled_loop.assert_not_called()
+        self.assertEqual(self.engine.variables['a'], 2**60 + 1 + sum(range(40)))
+        self.assertEqual(self.engine.variables['b'], 1 + sum(range(2**60, 2**60 + 40)))
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "numpy not installed")
+    def test_vectorized_loop_matches_interpreter(self):
+        """Test vectorized numeric loops draw and track the same as interpreted ones."""
+        code = (
+            "base = 100\nscale = 2.5\n"
+            "for i in range(-5, 60, 3):\n"
+            "    red = min(255, base + i * 20)\n"
+            "    green = max(0.0, scale * i - 7 / 2)\n"
+            "    blue = abs(red - 150) % 7 + i // 4\n"
+        )
+        self.parser.parse_and_render(code)
+        self.assertIsNotNone(self.parser._parse(code).body[2]._vp_vec_plan)
+
+        interpreted = RecordingEngine()
+        reference = PythonVisualParser(interpreted)
+        with patch('visualpython.parser.NUMPY_AVAILABLE', False):
+            reference.parse_and_render(code)
+
+        self.assertEqual(self.engine.elements, interpreted.elements)
+        for name in ('red', 'green', 'blue'):
+            self.assertEqual(type(self.engine.variables[name]), type(interpreted.variables[name]))
+        self.assertEqual(self.engine.variables, interpreted.variables)
+        self.assertEqual(self.parser.variable_tracker.access_count,
+                         reference.variable_tracker.access_count)
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "numpy not installed")
+    def test_vectorized_clamps_match_interpreter(self):
+        """Test the color-animation clamp pattern against the interpreter."""
+        code = (
+            "rect_red = 100\nrect_green = 200\n"
+            "for i in range(12):\n"
+            "    frame_red = min(255, rect_red + i * 20)\n"
+            "    frame_green = max(0, rect_green - i * 30)\n"
+            "    level = min(max(-1, i - 6), 3)\n"
+            "    wave = max(0.5, i / 4)\n"
+        )
+        self.parser.parse_and_render(code)
+
+        interpreted = RecordingEngine()
+        with patch('visualpython.parser.NUMPY_AVAILABLE', False):
+            PythonVisualParser(interpreted).parse_and_render(code)
+
+        self.assertEqual(self.engine.elements, interpreted.elements)
+        self.assertEqual(self.engine.variables, interpreted.variables)
+        self.assertIn(('variable', 'frame_red = 255'), self.engine.elements)
+        self.assertIn(('variable', 'level = -1'), self.engine.elements)
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "numpy not installed")
+    def test_vectorized_loop_defers_zero_division(self):
+        """Test loops that would divide by zero fall back to the interpreter."""
+        self.run_code("for i in range(10):\n    x = 10 // (i - 3)\n")
+
+        errors = [c for t, c in self.engine.elements if t == 'assignment_error']
+        self.assertEqual(errors, ["Assignment Error: integer division or modulo by zero"])
+
+    def test_import_does_not_load_numeric_libraries(self):
+        """Test numpy and numba are only imported once a loop needs them."""
+        probe = ("import sys, visualpython.parser; "
+                 "print(sorted(m for m in ('numpy', 'numba') if m in sys.modules))")
+        result = subprocess.run([sys.executable, '-c', probe], capture_output=True,
+                                text=True, env={'PYTHONPATH': ':'.join(sys.path)})
+        self.assertEqual(result.stdout.strip(), '[]', result.stderr)
+
+    def test_vector_plan_rejects_loop_carried_values(self):
+        """Test only bodies without values carried between iterations are planned."""
+        def plan(code):
+            return plan_vector_loop(ast.parse(code).body[0])
+
+        self.assertEqual([t for t, _ in plan("for i in range(9):\n    a = i * 2\n    b = a + 1")],
+                         ['a', 'b'])
+        self.assertIsNone(plan("for i in range(9):\n    b = a + 1\n    a = i"))
+        self.assertIsNone(plan("for i in range(9):\n    a = a + i"))
+        self.assertIsNone(plan("for i in range(9):\n    a = len(i)"))
+
+    def test_expression_types(self):
+        """Test evaluation of the supported expression node types."""
+        self.run_code(
+            "a = [1, 2, 3][1]\n"
+            "b = {'k': -4}['k']\n"
+            "c = 1 < 2 < 3\n"
+            "d = not c\n"
+            "e = b.real\n"
+        )
+
+        variables = self.engine.variables
+        self.assertEqual(variables['a'], 2)
+        self.assertEqual(variables['b'], -4)
+        self.assertIs(variables['c'], True)
+        self.assertIs(variables['d'], False)
+        self.assertEqual(variables['e'], -4)
+
+    def test_visited_comparisons(self):
+        """Test comparisons that contain calls and so are not compiled."""
+        self.run_code(
+            "w = [1, 2]\n"
+            "a = len(w) == 2\n"
+            "b = 0 < len(w) <= 1\n"
+            "c = 1 < 2 < len(w) + 1 != 4\n"
+        )
+
+        variables = self.engine.variables
+        self.assertIs(variables['a'], True)
+        self.assertIs(variables['b'], False)
+        self.assertIs(variables['c'], True)
+
+    def test_compiled_expressions_match_visitor(self):
+        """Test that compiled operator expressions keep visitor semantics."""
+        self.run_code(
+            "a = 6\n"
+            "b = a * 7 - a // 4 % 3\n"
+            "c = a > 1 and b\n"
+            "d = 0 or a < 0\n"
+            "e = missing + 1\n"
+            "f = a + len([1])\n"
+        )
+
+        variables = self.engine.variables
+        self.assertEqual(variables['b'], 41)
+        self.assertEqual(variables['c'], 41)
+        self.assertIs(variables['d'], False)
+        self.assertEqual(variables['f'], 7)
+        # Unknown names still evaluate to None rather than raising NameError
+        self.assertIn(('assignment_error',
+                       "Assignment Error: unsupported operand type(s) for +: 'NoneType' and 'int'"),
+                      self.engine.elements)
+        self.assertEqual(self.parser.variable_tracker.access_count['a'], 5)
+
+    def test_source_trees_are_cached(self):
+        """Test that re-rendering the same source reuses its parsed tree."""
+        code = "x = 1\nprint(x + 1)\n"
+        self.parser.parse_and_render(code)
+        tree = self.parser._parse(code)
+        self.parser.parse_and_render(code)
+
+        self.assertIs(self.parser._parse(code), tree)
+        self.assertEqual(self.engine.outputs, ["2", "2"])
+
+    def test_f_string_format_specs(self):
+        """Test f-strings with constant and nested format specs in a loop."""
+        self.run_code(
+            "w = 6\n"
+            "for i in range(2):\n"
+            "    print(f\"[{i * 1.5:.2f}|{i:>{w}}|{'s'}]\")\n"
+        )
+
+        self.assertEqual(self.engine.outputs, ["[0.00|     0|s]", "[1.50|     1|s]"])
+
+    def test_builtin_calls(self):
+        """Test calls to the supported built-in functions."""
+        self.run_code(
+            "w = [4, 9, 2]\n"
+            "print(len(w), min(w), max(3, 7), abs(-5), int('ff', 16), str(1.5), bool(0))\n"
+        )
+
+        self.assertEqual(self.engine.outputs, ["3 2 7 5 255 1.5 False"])
+
+    def test_expression_statement_errors(self):
+        """Test failing bare expressions are ignored but interrupts propagate."""
+        self.run_code("x = 1\nx + 'a'\nx\n")
+        self.assertIn(('expression_result', 'Result: 1'), self.engine.elements)
+        self.assertFalse([t for t, _ in self.engine.elements if t.endswith('error')])
+
+        with patch.object(self.parser, '_evaluate_expression', side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                self.run_code("x\n")
+
+    def test_subclass_visit_methods(self):
+        """Test visit_<NodeType> methods on subclasses join the dispatch tables."""
+        class ExtendedParser(PythonVisualParser):
+            def visit_Pass(self, node):
+                self.engine.add_output_line("pass")
+
+            def visit_Lambda(self, node):
+                return '<lambda>'
+
+            def visit_nothing(self, node):
+                raise AssertionError("not a node type")
+
+        parser = ExtendedParser(self.engine)
+        parser.parse_and_render("pass\nf = lambda: 1\nfor i in range(2):\n    pass\n")
+
+        self.assertEqual(self.engine.outputs, ["pass", "pass", "pass"])
+        self.assertEqual(self.engine.variables['f'], '<lambda>')
+
+    def test_unsupported_nodes_are_ignored(self):
+        """Test that unknown statements and expressions do not raise."""
+        self.run_code("import os\nx = lambda: 1\ny = 5\n")
+
+        self.assertIsNone(self.engine.variables['x'])
+        self.assertEqual(self.engine.variables['y'], 5)
+
+
+class TestVariableTracker(unittest.TestCase):
+    """Test variable assignment tracking."""
+
+    def test_assign_and_access(self):
+        """Test assignment records and access statistics."""
+        tracker = VariableTracker()
+        tracker.assign('x', 1)
+        tracker.assign('x', 2)
+        tracker.access('x')
+
+        stats = tracker.get_statistics()
+        self.assertEqual(stats['total_variables'], 1)
+        self.assertEqual(stats['total_assignments'], 2)
+        self.assertEqual(stats['most_accessed'], ('x', 1))
+        self.assertEqual(stats['variable_types'], {'x': 'int'})
+
+    def test_statistics_track_most_accessed_and_types(self):
+        """Test incrementally maintained access and type statistics."""
+        tracker = VariableTracker()
+        tracker.update_variables({'a': 1.5})
+        tracker.assign('b', 'text')
+        tracker.assign('b', [1])
+        for name in ('a', 'b', 'b', 'a', 'b'):
+            tracker.access(name)
+
+        stats = tracker.get_statistics()
+        self.assertEqual(stats['most_accessed'], ('b', 3))
+        self.assertEqual(stats['variable_types'], {'a': 'float', 'b': 'list'})
+        self.assertIsNone(VariableTracker().get_statistics()['most_accessed'])
+
+    def test_numeric_values(self):
+        """Test typed lookup of numeric loop inputs."""
+        tracker = VariableTracker()
+        tracker.update_variables({'a': 1, 'b': 2.5})
+        tracker.assign('c', True)
+        tracker.assign('d', 'text')
+
+        self.assertEqual(tracker.numeric_values(['a', 'b']), {'a': 1, 'b': 2.5})
+        self.assertIsNone(tracker.numeric_values(['a', 'c']))
+        self.assertIsNone(tracker.numeric_values(['d']))
+        self.assertIsNone(tracker.numeric_values(['missing']))
+
+    def test_assignment_log_is_bounded(self):
+        """Test the assignment log keeps only the most recent entries."""
+        tracker = VariableTracker(history_cap=5)
+        for i in range(15):
+            tracker.assign('i', i)
+
+        history = tracker.recent_assignments(3)
+        self.assertEqual([h['new_value'] for h in history], [12, 13, 14])
+        self.assertEqual(history[0], {'name': 'i', 'old_value': 11, 'new_value': 12,
+                                      'type': 'int', 'is_new': False})
+        self.assertEqual(len(tracker.assignments), 5)
+
+        tracker.assign('j', 'x')
+        self.assertEqual([h['new_value'] for h in tracker.assignments], [11, 12, 13, 14, 'x'])
+        self.assertEqual(tracker.assignments[-1]['is_new'], True)
+
+        # A variable that already exists is not new, even if it held None
+        tracker.assign('n', None)
+        tracker.assign('n', 1)
+        self.assertEqual([(h['old_value'], h['is_new']) for h in tracker.recent_assignments(2)],
+                         [(None, True), (None, False)])
+        self.assertEqual(tracker.get_statistics()['total_assignments'], 18)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -15,11 +15,11 @@ Usage:
 """
 
 import argparse
+import hashlib
 import os
 import sys
-import time
 from pathlib import Path
-from threading import Thread
+from threading import Event, Thread
 
 # Add src directory to path for imports
 current_dir = Path(__file__).parent
@@ -34,80 +34,284 @@ except ImportError as e:
     print("Make sure you're running this from the VisualPython directory")
     sys.exit(1)
 
+# Native file notifications (inotify/FSEvents/...) for --live; polling otherwise
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+    Observer = None
+    FileSystemEventHandler = object
+
+# Row batches csv play parses ahead of rendering
+CSV_PREFETCH_BATCHES = 64
+
+# Backends that only write frames to disk; nobody watches them in real time
+FILE_SINK_BACKENDS = frozenset({'simulator', 'sim'})
+
+# Default csv play pacing for backends someone is watching
+INTERACTIVE_FRAME_DELAY = 1 / 60
+
+# Events closer together than this are one save (write, close, temp-file rename)
+WATCH_COALESCE_SECONDS = 0.05
+
+
+# Defaults of the options every subcommand shares; _fast_args relies on them too
+COMMON_DEFAULTS = {
+    'width': 800,
+    'height': 600,
+    'backend': 'tkinter',
+    'out_dir': 'vp_sim_frames',
+    'frames_per_dir': 0,
+    'mirror': None,
+    'live': False,
+}
+
 
 def add_common_args(parser):
     """Add common arguments to a subparser."""
-    parser.add_argument("--width", type=int, default=800, help="Display width")
-    parser.add_argument("--height", type=int, default=600, help="Display height")
+    parser.add_argument("--width", type=int, default=COMMON_DEFAULTS['width'], help="Display width")
+    parser.add_argument("--height", type=int, default=COMMON_DEFAULTS['height'], help="Display height")
     parser.add_argument("--backend", choices=["tkinter", "simulator", "sim", "console"], 
-                       default="tkinter", help="Rendering backend")
-    parser.add_argument("--out-dir", default="vp_sim_frames", 
+                       default=COMMON_DEFAULTS['backend'], help="Rendering backend")
+    parser.add_argument("--out-dir", default=COMMON_DEFAULTS['out_dir'], 
                        help="Output directory for simulator frames")
+    parser.add_argument("--frames-per-dir", type=int, default=COMMON_DEFAULTS['frames_per_dir'],
+                       help="Split simulator frames into numbered subdirectories "
+                            "of this many frames (0: one flat directory)")
     parser.add_argument("--mirror", help="Mirror all operations to CSV file")
     parser.add_argument("--live", action="store_true", 
                        help="Watch file for changes and auto-reload")
 
 
-def watch_file(file_path, callback, interval=0.5):
+class _SingleFileHandler(FileSystemEventHandler):
+    """Flag changes to one file, ignoring everything else in its directory."""
+    
+    def __init__(self, target, changed):
+        super().__init__()
+        self.target = target
+        self.changed = changed
+    
+    def _check(self, path):
+        if os.path.abspath(path) == self.target:
+            self.changed.set()
+    
+    def on_modified(self, event):
+        if not event.is_directory:
+            self._check(event.src_path)
+    
+    def on_created(self, event):
+        if not event.is_directory:
+            self._check(event.src_path)
+    
+    def on_moved(self, event):
+        # Editors that save via a temp file and rename land here
+        if not event.is_directory:
+            self._check(event.dest_path)
+    
+    def on_closed(self, event):
+        # IN_CLOSE_WRITE on Linux: the writer has finished the file
+        if not event.is_directory:
+            self._check(event.src_path)
+
+
+def _settle(changed, quiet=WATCH_COALESCE_SECONDS):
+    """Wait until no change has been flagged for quiet seconds."""
+    while changed.wait(quiet):
+        changed.clear()
+
+
+def _content_digest(path):
+    """blake2b digest of the file's bytes, or None if it cannot be read."""
+    try:
+        return hashlib.blake2b(Path(path).read_bytes(), digest_size=16).digest()
+    except OSError:
+        return None
+
+
+class _ReloadOnEdit:
+    """
+    Reload callback that only runs when the file's content changed.
+    
+    Saving without edits, touch and checkouts of the same content bump
+    the mtime (and fire watch events); hashing the bytes is far cheaper
+    than re-executing the script for them.
+    """
+    
+    def __init__(self, path, callback):
+        self.path = path
+        self.callback = callback
+        self.digest = _content_digest(path)
+    
+    def __call__(self):
+        digest = _content_digest(self.path)
+        if digest is not None and digest == self.digest:
+            return False
+        self.digest = digest
+        print(f"🔄 File changed, reloading...")
+        self.callback()
+        return True
+
+
+def watch_file(file_path, callback, interval=0.5, stop=None):
     """
     Watch a file for changes and trigger callback when modified.
-    Simple polling-based approach that works everywhere.
+    Uses watchdog's native observer when available, falling back to
+    polling the file's mtime. The callback always runs on this thread,
+    and only when the file's content differs from the last run.
+    Returns once the optional stop Event is set, so the watcher can run
+    on a background thread.
     """
-    file_path = Path(file_path)
-    last_mtime = 0
+    target = os.path.abspath(file_path)
+    if stop is None:
+        stop = Event()
+    reload = _ReloadOnEdit(target, callback)
     
     print(f"👀 Watching {file_path} for changes... (Ctrl+C to stop)")
     
-    while True:
+    observer = None
+    if WATCHDOG_AVAILABLE:
+        changed = Event()
+        observer = Observer()
+        observer.schedule(_SingleFileHandler(target, changed),
+                          os.path.dirname(target), recursive=False)
+        try:
+            observer.start()
+        except Exception as e:
+            print(f"⚠️  Native watching unavailable ({e}), polling instead")
+            observer = None
+    
+    if observer is None:
+        _poll_file(Path(target), reload, interval, stop)
+        return
+    
+    try:
+        while not stop.is_set():
+            # Bursts of events for one save collapse into a single reload
+            if changed.wait(interval):
+                changed.clear()
+                _settle(changed)
+                # Callbacks report their own errors; only file access
+                # errors (e.g. a save still holding a lock) land here
+                try:
+                    reload()
+                except OSError as e:
+                    print(f"⚠️  Watch error: {e}")
+    except KeyboardInterrupt:
+        print("\n✅ Stopped watching")
+    finally:
+        observer.stop()
+        observer.join()
+
+
+def _mtime_ns(file_path):
+    """Integer mtime of file_path from a single stat, or None if it is missing."""
+    try:
+        return os.stat(file_path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _poll_file(file_path, reload, interval, stop):
+    """Polling-based watch loop used when watchdog is not available."""
+    last_mtime_ns = _mtime_ns(file_path)
+    
+    while not stop.is_set():
         try:
-            if file_path.exists():
-                mtime = file_path.stat().st_mtime
-                if mtime != last_mtime:
-                    last_mtime = mtime
-                    print(f"🔄 File changed, reloading...")
-                    callback()
-            time.sleep(interval)
+            mtime_ns = _mtime_ns(file_path)
+            if mtime_ns is not None and mtime_ns != last_mtime_ns:
+                last_mtime_ns = mtime_ns
+                reload()
+            stop.wait(interval)
         except KeyboardInterrupt:
             print("\n✅ Stopped watching")
             break
-        except Exception as e:
+        except OSError as e:
+            # Transient access errors; anything else is a bug and propagates
             print(f"⚠️  Watch error: {e}")
-            time.sleep(interval)
+            stop.wait(interval)
+
+
+def _tk_root(backend):
+    """The Tk root behind backend, looking through a RecordRenderer, or None."""
+    return getattr(getattr(backend, 'wrapped', backend), 'root', None)
+
+
+def read_source(path):
+    """
+    Read a script as UTF-8 through one descriptor: open, fstat, read.
+    
+    Raises FileNotFoundError for a missing file, so no separate exists()
+    check (and no race between checking and opening) is needed.
+    """
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        size = os.fstat(fd).st_size
+        # A short read means end of file; asking for one extra byte catches growth
+        data = os.read(fd, size + 1)
+        if len(data) > size:
+            chunks = [data]
+            chunk = os.read(fd, 65536)
+            while chunk:
+                chunks.append(chunk)
+                chunk = os.read(fd, 65536)
+            data = b"".join(chunks)
+    finally:
+        os.close(fd)
+    return data.decode('utf-8')
 
 
 def run_command(args):
     """Execute a Python file once with visual output."""
-    if not os.path.exists(args.file):
+    try:
+        initial_code = read_source(args.file)
+    except FileNotFoundError:
         print(f"❌ Error: File {args.file} not found")
         return 1
     
     print(f"🔥 Running {args.file} with VisualPython...")
     
-    def execute_once():
+    def new_engine():
+        # Create engine with optional CSV recording
+        engine = VisualPythonEngine(
+            backend=args.backend,
+            width=args.width,
+            height=args.height,
+            out_dir=getattr(args, 'out_dir', 'vp_sim_frames'),
+            frames_per_dir=getattr(args, 'frames_per_dir', 0)
+        )
+        
+        # Wrap with recorder if mirror is specified
+        if hasattr(args, 'mirror') and args.mirror:
+            engine.backend = RecordRenderer(engine.backend, args.mirror)
+        return engine
+    
+    def execute_once(code=None, engine=None):
+        # A given engine is reused and left open; otherwise one is made and closed
+        reused = engine is not None
         try:
-            # Create engine with optional CSV recording
-            engine = VisualPythonEngine(
-                backend=args.backend,
-                width=args.width,
-                height=args.height,
-                out_dir=getattr(args, 'out_dir', 'vp_sim_frames')
-            )
+            if reused:
+                engine.reset()
+            else:
+                engine = new_engine()
             
-            # Wrap with recorder if mirror is specified
-            if hasattr(args, 'mirror') and args.mirror:
-                engine.backend = RecordRenderer(engine.backend, args.mirror)
-            
-            with open(args.file, 'r', encoding='utf-8') as f:
-                code = f.read()
+            if code is None:
+                # Reloads read the file afresh
+                code = read_source(args.file)
             
             execution_time = engine.execute(code)
             
             print(f"✅ Executed in {execution_time:.2f}ms")
             
+            if reused:
+                return 0
+            
             # Keep window open for interactive backends (only on first run)
-            if not args.live and hasattr(engine.backend, 'root'):
+            root = _tk_root(engine.backend)
+            if not args.live and root is not None:
                 try:
-                    engine.backend.root.mainloop()
+                    root.mainloop()
                 except KeyboardInterrupt:
                     print("\n👋 Goodbye!")
             
@@ -119,13 +323,52 @@ def run_command(args):
             return 1
     
     if args.live:
-        # Initial execution
-        execute_once()
-        # Watch for changes
-        watch_file(args.file, execute_once)
+        try:
+            engine = new_engine()
+        except Exception as e:
+            print(f"❌ Error executing {args.file}: {e}")
+            return 1
+        # One engine serves every reload: its backend, window, frame
+        # buffers and mirror file are set up once and reset in between
+        execute_once(initial_code, engine)
+        root = _tk_root(engine.backend)
+        if root is None:
+            # Watch for changes
+            try:
+                watch_file(args.file, lambda: execute_once(None, engine))
+            finally:
+                engine.cleanup()
+            return 0
+        
+        # Tk needs the main thread for its mainloop, so watch on a daemon
+        # thread and have root.after() run each reload on the GUI thread
+        stop = Event()
+        watcher = Thread(target=watch_file, name='visualpython-watch', daemon=True,
+                         args=(args.file, lambda: root.after(0, execute_once, None, engine)),
+                         kwargs={'stop': stop})
+        watcher.start()
+        try:
+            root.mainloop()
+        except KeyboardInterrupt:
+            print("\n👋 Goodbye!")
+        finally:
+            stop.set()
+            engine.cleanup()
         return 0
     else:
-        return execute_once()
+        return execute_once(initial_code)
+
+
+def _frame_delay(args):
+    """
+    --frame-delay if given; otherwise no pacing for file-sink backends
+    and INTERACTIVE_FRAME_DELAY for the rest.
+    """
+    if args.frame_delay is not None:
+        return args.frame_delay
+    if args.backend in FILE_SINK_BACKENDS:
+        return 0.0
+    return INTERACTIVE_FRAME_DELAY
 
 
 def csv_play_command(args):
@@ -143,11 +386,21 @@ def csv_play_command(args):
                 args.backend,
                 width=args.width,
                 height=args.height,
-                out_dir=args.out_dir
+                out_dir=args.out_dir,
+                frames_per_dir=args.frames_per_dir,
+                encode_workers=args.encode_workers
             )
             
             # Play the CSV
-            csv_play(backend, args.csvfile, frame_delay=args.frame_delay)
+            # Rows are parsed on a reader thread while frames render
+            try:
+                csv_play(backend, args.csvfile, frame_delay=_frame_delay(args),
+                         prefetch=CSV_PREFETCH_BATCHES,
+                         use_mmap=getattr(args, 'mmap', False),
+                         use_arrow=getattr(args, 'arrow', False))
+            finally:
+                # Waits for frames still being encoded
+                backend.cleanup()
             
             print("✅ CSV playback complete")
             return 0
@@ -168,7 +421,9 @@ def csv_play_command(args):
 
 def csv_record_command(args):
     """Record a script execution to CSV."""
-    if not os.path.exists(args.script):
+    try:
+        code = read_source(args.script)
+    except FileNotFoundError:
         print(f"❌ Error: Script {args.script} not found")
         return 1
     
@@ -180,15 +435,13 @@ def csv_record_command(args):
             backend=args.backend,
             width=args.width,
             height=args.height,
-            out_dir=args.out_dir
+            out_dir=args.out_dir,
+            frames_per_dir=args.frames_per_dir
         )
         
         # Wrap with recorder
         engine.backend = RecordRenderer(engine.backend, args.csv_out)
         
-        with open(args.script, 'r', encoding='utf-8') as f:
-            code = f.read()
-        
         execution_time = engine.execute(code)
         
         print(f"✅ Recorded in {execution_time:.2f}ms")
@@ -203,15 +456,33 @@ def csv_record_command(args):
         return 1
 
 
-def main():
-    """Main CLI entry point."""
+def _fast_args(argv):
+    """
+    Arguments for the flagless shapes ``run FILE`` and ``csv play FILE``
+    without building the argparse tree, or None for anything else.
+    """
+    if len(argv) == 2 and argv[0] == 'run' and not argv[1].startswith('-'):
+        return argparse.Namespace(command='run', file=argv[1], func=run_command,
+                                  **COMMON_DEFAULTS)
+    if (len(argv) == 3 and argv[0] == 'csv' and argv[1] == 'play'
+            and not argv[2].startswith('-')):
+        return argparse.Namespace(command='csv', csv_command='play', csvfile=argv[2],
+                                  frame_delay=None, mmap=False, arrow=False, encode_workers=0,
+                                  func=csv_play_command,
+                                  **COMMON_DEFAULTS)
+    return None
+
+
+def _build_parser():
+    """Return (parser, csv subcommand parser) for the full CLI."""
     parser = argparse.ArgumentParser(
         description="VisualPython Unified - Direct visual execution with simulator support",
         epilog="Examples:\n"
                "  python visualpython_unified.py run script.py --backend sim\n"
                "  python visualpython_unified.py csv play data.csv --backend sim\n"
                "  python visualpython_unified.py csv record script.py --csv-out demo.csv\n"
-               "  python visualpython_unified.py run script.py --mirror recording.csv",
+               "  python visualpython_unified.py run script.py --mirror recording.csv\n"
+               "  python visualpython_unified.py run script.py --live    # Watch file for changes",
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
     
@@ -230,8 +501,16 @@ def main():
     # CSV play
     play_parser = csv_subparsers.add_parser('play', help='Play a CSV file frame by frame')
     play_parser.add_argument('csvfile', help='CSV file to play')
-    play_parser.add_argument('--frame-delay', type=float, default=0.0,
-                            help='Delay between frames in seconds')
+    play_parser.add_argument('--frame-delay', type=float, default=None,
+                            help='Delay between frames in seconds '
+                                 '(default: none for sim, 1/60 otherwise)')
+    play_parser.add_argument('--mmap', action='store_true',
+                            help='Read the CSV through a memory map')
+    play_parser.add_argument('--arrow', action='store_true',
+                            help='Parse the CSV with pyarrow when installed')
+    play_parser.add_argument('--encode-workers', type=int, default=0,
+                            help='Encode simulator frames on this many worker processes '
+                                 '(default: 0, encode inline)')
     add_common_args(play_parser)
     play_parser.set_defaults(func=csv_play_command)
     
@@ -242,9 +521,22 @@ def main():
                               help='Output CSV file')
     add_common_args(record_parser)
     record_parser.set_defaults(func=csv_record_command)
+    return parser, csv_parser
+
+
+def main(argv=None):
+    """Main CLI entry point; argv defaults to sys.argv[1:]."""
+    if argv is None:
+        argv = sys.argv[1:]
+    
+    # The common shapes skip argparse; everything else, including every
+    # flag and error, goes through it
+    args = _fast_args(argv)
+    if args is not None:
+        return _dispatch(args)
     
-    # Parse arguments
-    args = parser.parse_args()
+    parser, csv_parser = _build_parser()
+    args = parser.parse_args(argv)
     
     if not args.command:
         parser.print_help()
@@ -256,6 +548,11 @@ def main():
             csv_parser.print_help()
             return 1
     
+    return _dispatch(args)
+
+
+def _dispatch(args):
+    """Run the command selected by parsed args."""
     try:
         return args.func(args)
     except KeyboardInterrupt: